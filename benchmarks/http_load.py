@@ -0,0 +1,151 @@
+"""Нагрузочный тест HTTP-эндпоинтов без внешних зависимостей.
+
+Держит ``--concurrency`` keep-alive соединений и отправляет по ним
+``--requests`` GET-запросов, перебирая переданные URL по кругу. Печатает
+пропускную способность и перцентили задержки, с ``--json`` — в JSON.
+
+Пример::
+
+    python benchmarks/http_load.py -c 200 -n 20000 \\
+        http://127.0.0.1:8000/api/v1/movies/<uuid>/
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    if length is None:
+        await reader.read()
+        keep_alive = False
+    else:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def worker(urls, budget, latencies, statuses):
+    reader = writer = None
+    try:
+        while budget():
+            url = next(urls)
+            parts = urlsplit(url)
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, parts.port or 80
+                )
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            request = (
+                f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                "Connection: keep-alive\r\n\r\n"
+            )
+            started = time.perf_counter()
+            try:
+                writer.write(request.encode())
+                await writer.drain()
+                status, keep_alive = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                statuses["error"] = statuses.get("error", 0) + 1
+                writer.close()
+                writer = None
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run(urls, concurrency, total):
+    remaining = total
+    latencies = []
+    statuses = {}
+
+    def budget():
+        nonlocal remaining
+        if remaining <= 0:
+            return False
+        remaining -= 1
+        return True
+
+    cycle = itertools.cycle(urls)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            worker(cycle, budget, latencies, statuses)
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": (
+            round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0
+        ),
+        "statuses": {str(key): value for key, value in statuses.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    parser.add_argument("-n", "--requests", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.warmup:
+        asyncio.run(run(args.urls, args.concurrency, args.warmup))
+    result = asyncio.run(run(args.urls, args.concurrency, args.requests))
+    if args.json:
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+        return
+    print(
+        f"{result['requests']} requests, c={result['concurrency']}, "
+        f"{result['seconds']}s: {result['rps']} req/s, "
+        f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+        f"statuses {result['statuses']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
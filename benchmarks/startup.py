@@ -0,0 +1,161 @@
+"""Замер холодного старта процесса Django.
+
+Для каждого профиля настроек (``DJANGO_SETTINGS_PROFILE``) запускает
+``--runs`` раз ``python manage.py <command>`` в новом процессе и печатает
+медиану и минимум времени и медиану процессорного времени. Перед замером
+выполняется прогревочный запуск, чтобы байт-код уже был скомпилирован.
+
+С ``--profile`` вместо замера выполняется один запуск с ``-X importtime``
+и ``DJANGO_STARTUP_PROFILE=True``: печатаются пакеты и модули с
+наибольшим собственным временем импорта и время компонентов настроек.
+
+Пример::
+
+    python benchmarks/startup.py --runs 10 full lean
+    python benchmarks/startup.py --profile --top 15 lean
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+MANAGE = Path(__file__).resolve().parent.parent / "manage.py"
+LINE = re.compile(r"(import|settings) time:\s+(\d+) \|\s+(?:\d+ \|)?( *)(\S+)")
+
+
+def run(profile, command, extra_env=None, python_options=()):
+    env = {**os.environ, "DJANGO_SETTINGS_PROFILE": profile}
+    # Как при обычном запуске: без записи байт-кода каждый замер включал бы
+    # компиляцию изменённых модулей.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.update(extra_env or {})
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *python_options, str(MANAGE), *command],
+        cwd=MANAGE.parent,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = after.ru_utime - usage.ru_utime + after.ru_stime - usage.ru_stime
+    if process.returncode:
+        sys.stderr.write(process.stderr)
+        raise SystemExit(f"{profile}: manage.py exited {process.returncode}")
+    return elapsed, cpu, process.stderr
+
+
+def package(module):
+    """``django.contrib.admin.options`` -> ``django.contrib.admin``,
+    ``django.db.models.base`` -> ``django.db``, ``psycopg.pq`` ->
+    ``psycopg``."""
+    parts = module.split(".")
+    if parts[0] != "django":
+        return parts[0]
+    return ".".join(parts[:3] if parts[1:2] == ["contrib"] else parts[:2])
+
+
+def parse_profile(stderr):
+    modules = Counter()
+    settings = {}
+    for match in LINE.finditer(stderr):
+        kind, microseconds, _, name = match.groups()
+        if kind == "settings":
+            settings[name] = int(microseconds) / 1000
+        else:
+            modules[name] += int(microseconds) / 1000
+    packages = Counter()
+    for module, milliseconds in modules.items():
+        packages[package(module)] += milliseconds
+    return modules, packages, settings
+
+
+def measure(profile, command, runs):
+    run(profile, command)
+    timings = [run(profile, command)[:2] for _ in range(runs)]
+    elapsed = [seconds * 1000 for seconds, _ in timings]
+    return {
+        "profile": profile,
+        "command": " ".join(command),
+        "runs": runs,
+        "median_ms": round(statistics.median(elapsed), 1),
+        "min_ms": round(min(elapsed), 1),
+        "cpu_ms": round(
+            statistics.median(cpu * 1000 for _, cpu in timings), 1
+        ),
+    }
+
+
+def profile_startup(profile, command, top):
+    *_, stderr = run(
+        profile,
+        command,
+        {"DJANGO_STARTUP_PROFILE": "True"},
+        ("-X", "importtime"),
+    )
+    modules, packages, settings = parse_profile(stderr)
+
+    def rounded(pairs):
+        return [[name, round(value, 1)] for name, value in pairs]
+
+    return {
+        "profile": profile,
+        "command": " ".join(command),
+        "modules": len(modules),
+        "import_ms": round(sum(modules.values()), 1),
+        "packages": rounded(packages.most_common(top)),
+        "slowest_modules": rounded(modules.most_common(top)),
+        "settings": rounded(settings.items()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("profiles", nargs="*", default=["full", "lean"])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--command", default="check")
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    command = shlex.split(args.command)
+    for profile in args.profiles:
+        if args.profile:
+            result = profile_startup(profile, command, args.top)
+        else:
+            result = measure(profile, command, args.runs)
+        if args.json:
+            json.dump(result, sys.stdout)
+            sys.stdout.write("\n")
+        elif args.profile:
+            print(
+                f"{profile}: {result['modules']} modules, "
+                f"{result['import_ms']} ms importing"
+            )
+            for title in ("packages", "slowest_modules", "settings"):
+                print(f"  {title.replace('_', ' ')}:")
+                for name, milliseconds in result[title]:
+                    print(f"    {milliseconds:8.1f} ms  {name}")
+        else:
+            print(
+                f"{profile}: manage.py {result['command']} x{result['runs']}"
+                f", median {result['median_ms']} ms, min {result['min_ms']} ms"
+                f", cpu {result['cpu_ms']} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
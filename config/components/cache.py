@@ -0,0 +1,18 @@
+import os
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+        "KEY_PREFIX": os.environ.get("CACHE_KEY_PREFIX", "movies"),
+    }
+}
+
+# Справочники (жанры, счётчики фильтров) в памяти процесса поверх общего
+# кеша: через сколько секунд сверять версию и сколько ключей хранить.
+REFERENCE_CACHE_LOCAL_TTL = int(
+    os.environ.get("REFERENCE_CACHE_LOCAL_TTL", 30)
+)
+REFERENCE_CACHE_LOCAL_MAXSIZE = 128
@@ -1,13 +1,78 @@
+import copy
 import os
 
+DB_POOL = os.environ.get("DB_POOL", False) == "True"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": (
+            "config.db.postgresql_pool"
+            if DB_POOL
+            else "django.db.backends.postgresql"
+        ),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST", "127.0.0.1"),
         "PORT": os.environ.get("DB_PORT", 5432),
-        "OPTIONS": {"options": "-c search_path=public,content"},
+        # Время жизни соединения в секундах: 0 — новое соединение на каждый
+        # запрос, "None" — без ограничения. С пулом должно быть 0.
+        "CONN_MAX_AGE": (
+            None
+            if os.environ.get("DB_CONN_MAX_AGE") == "None"
+            else int(os.environ.get("DB_CONN_MAX_AGE", 0))
+        ),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DB_CONN_HEALTH_CHECKS", False) == "True"
+        ),
+        # Серверные курсоры (QuerySet.iterator()) несовместимы с PgBouncer
+        # в режиме transaction pooling.
+        "DISABLE_SERVER_SIDE_CURSORS": (
+            os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS", False) == "True"
+        ),
+        "OPTIONS": {
+            "options": "-c search_path=public,content",
+            "server_side_binding": (
+                os.environ.get("DB_SERVER_SIDE_BINDING", False) == "True"
+            ),
+        },
     }
 }
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+    }
+
+# Реплики только для чтения: "host" или "host:port" через запятую, прочие
+# параметры как у default. Чтения моделей movies в HTTP-запросах уходят на
+# реплики (movies/db/replicas.py), запись и миграции — на default.
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = copy.deepcopy(DATABASES["default"])
+    DATABASES[alias].update(
+        HOST=host,
+        PORT=port or DATABASES["default"]["PORT"],
+        TEST={"MIRROR": "default"},
+    )
+    # Недоступная реплика не должна надолго задерживать запрос.
+    DATABASES[alias]["OPTIONS"]["connect_timeout"] = 2
+    DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["movies.db.replicas.ReplicaRouter"]
+
+# Реплика, отстающая больше REPLICA_MAX_LAG секунд, не используется;
+# отставание перепроверяется раз в REPLICA_LAG_CHECK_INTERVAL секунд.
+# После записи чтения идут на мастер REPLICA_PIN_SECONDS секунд.
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(
+    os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 5)
+)
+REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 10))
@@ -0,0 +1,15 @@
+# Профиль для воркеров и команд: только ORM и приложения, без которых не
+# работают модели movies. Admin, пользователи, сессии, сообщения, статика и
+# шаблоны не загружаются, а URL-конфигурация пустая, поэтому системные
+# проверки команд не импортируют представления. Миграции, createsuperuser
+# и collectstatic — в полном профиле.
+INSTALLED_APPS = [
+    "django.contrib.postgres",
+    "movies.apps.MoviesConfig",
+]
+
+MIDDLEWARE = []
+
+TEMPLATES = []
+
+ROOT_URLCONF = "config.lean_urls"
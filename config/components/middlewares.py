@@ -1,9 +1,21 @@
+import os
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    # Чтение с реплик; без DB_REPLICA_HOSTS отключается само.
+    "movies.db.replicas.ReplicaRoutingMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+
+# Статистика SQL-запросов и времени ответа по эндпоинтам (movies/metrics)
+# с выдачей на /metrics/ в формате Prometheus. Выключена по умолчанию:
+# тогда промежуточное ПО не подключается и ничего не стоит.
+QUERY_METRICS = os.environ.get("QUERY_METRICS", False) == "True"
+
+if QUERY_METRICS:
+    MIDDLEWARE.insert(0, "movies.metrics.middleware.QueryMetricsMiddleware")
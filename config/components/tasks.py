@@ -0,0 +1,16 @@
+import os
+from pathlib import Path
+
+# Фоновые задачи (movies/taskqueue.py): каталог загруженных и выгруженных
+# файлов, общий для админки и воркеров.
+TASK_FILES_ROOT = os.environ.get("TASK_FILES_ROOT") or str(
+    Path(__file__).resolve().parent.parent.parent / "task_files"
+)
+
+# Как часто воркер отмечает выполняемую задачу и через сколько секунд без
+# отметки задача считается брошенной и возвращается в очередь.
+TASK_HEARTBEAT_INTERVAL = int(os.environ.get("TASK_HEARTBEAT_INTERVAL", 5))
+TASK_STALE_AFTER = int(os.environ.get("TASK_STALE_AFTER", 60))
+
+# Сколько дней хранятся завершённые задачи и их файлы.
+TASK_KEEP_DAYS = int(os.environ.get("TASK_KEEP_DAYS", 30))
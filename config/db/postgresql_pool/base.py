@@ -0,0 +1,89 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL-бэкенд с пулом соединений psycopg_pool.
+
+    Перенос ``OPTIONS["pool"]`` из Django 5.1: соединение берётся из пула
+    при открытии и возвращается в пул при закрытии, поэтому установка
+    соединения и передача ``options`` не повторяются на каждый запрос.
+    ``OPTIONS["pool"]`` — ``True`` или словарь аргументов
+    ``psycopg_pool.ConnectionPool`` (``min_size``, ``max_size``, ...).
+    """
+
+    _connection_pools = {}
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+
+        if self.alias not in self._connection_pools:
+            if self.settings_dict["CONN_MAX_AGE"] != 0:
+                raise ImproperlyConfigured(
+                    "Pooling doesn't support persistent connections."
+                )
+            from psycopg_pool import ConnectionPool
+
+            if pool_options is True:
+                pool_options = {}
+            connect_kwargs = self.get_connection_params()
+            # Пул открывает соединения в autocommit, Django переключает
+            # режим сам при выдаче соединения.
+            connect_kwargs["autocommit"] = True
+            pool = ConnectionPool(
+                kwargs=connect_kwargs,
+                open=False,
+                check=(
+                    ConnectionPool.check_connection
+                    if self.settings_dict["CONN_HEALTH_CHECKS"]
+                    else None
+                ),
+                **pool_options,
+            )
+            # Открывается только пул из словаря: пул потока, проигравшего
+            # гонку, остаётся закрытым и не держит соединений.
+            pool = self._connection_pools.setdefault(self.alias, pool)
+            pool.open()
+        return self._connection_pools[self.alias]
+
+    def close_pool(self):
+        pool = self._connection_pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = self.pool.getconn()
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(isolation_level)
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {isolation_level} "
+                    "specified. Use one of the psycopg.IsolationLevel values."
+                )
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.putconn(self.connection)
+            # Соединение вернулось в пул и больше не принадлежит Django.
+            self.connection = None
@@ -0,0 +1,2 @@
+# URL-конфигурация профиля lean: процесс не обслуживает HTTP.
+urlpatterns = []
@@ -2,9 +2,11 @@ import os
 from pathlib import Path
 
 from dotenv import load_dotenv
-from split_settings.tools import include
 
-load_dotenv()
+from config.startup import include, timed
+
+with timed(".env"):
+    load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -12,7 +14,15 @@ SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
 
 DEBUG = os.environ.get("DEBUG", False) == "True"
 
-ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS").split(",")
+# Без переменной — только локальные адреса: командам и воркерам, которые
+# не обслуживают HTTP, задавать её не нужно.
+ALLOWED_HOSTS = os.environ.get(
+    "DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1"
+).split(",")
+
+# Профиль настроек: "full" — веб-приложение, "lean" — воркеры и команды
+# (ETL, импорт, пересчёты) без admin, сессий, сообщений и шаблонов.
+SETTINGS_PROFILE = os.environ.get("DJANGO_SETTINGS_PROFILE", "full")
 
 # Приложения: config/components/applications.py
 include(
@@ -40,6 +50,18 @@ include(
 )
 
 
+# Кеш: config/components/cache.py
+include(
+    "components/cache.py",
+)
+
+
+# Фоновые задачи: config/components/tasks.py
+include(
+    "components/tasks.py",
+)
+
+
 # Валидация паролей: config/components/password_validation.py
 include(
     "components/password_validation.py",
@@ -57,3 +79,10 @@ STATIC_URL = "static/"
 
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Облегчённый профиль: config/components/lean.py
+if SETTINGS_PROFILE == "lean":
+    include(
+        "components/lean.py",
+    )
@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from split_settings.tools import include as include_settings
+
+# Профиль старта: время загрузки .env и каждого компонента настроек
+# печатается в stderr в том же формате, что у python -X importtime, и
+# benchmarks/startup.py разбирает их вместе.
+PROFILE = os.environ.get("DJANGO_STARTUP_PROFILE", False) == "True"
+
+
+@contextmanager
+def timed(label: str):
+    if not PROFILE:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        microseconds = round((time.perf_counter() - started) * 1_000_000)
+        sys.stderr.write(f"settings time: {microseconds:>10} | {label}\n")
+
+
+def include(*components: str, scope: Optional[dict] = None) -> None:
+    """``split_settings.tools.include``, в профиле — с замером каждого
+    компонента."""
+    scope = scope or sys._getframe(1).f_globals
+    for component in components:
+        with timed(component):
+            include_settings(component, scope=scope)
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from movies.metrics.views import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/", include("movies.api.urls")),
 ]
+
+if settings.QUERY_METRICS:
+    urlpatterns.append(path("metrics/", metrics, name="metrics"))
@@ -0,0 +1,233 @@
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext_lazy as _
+
+from . import bulk
+from .dedup import dedupe_persons
+from .models import Genre, Person, PersonFilmwork
+from .reference import genre_choices
+from .task_admin import message_task_queued
+from .taskqueue import enqueue, selection
+
+
+class FilmworkActionForm(helpers.ActionForm):
+    """Параметры массовых действий, выводятся рядом со списком действий."""
+
+    genre = forms.ModelChoiceField(
+        Genre.objects.all(), required=False, label=_("genre")
+    )
+    replace_genres = forms.BooleanField(
+        required=False, label=_("replace_genres")
+    )
+    person = forms.ModelChoiceField(
+        Person.objects.all(),
+        required=False,
+        label=_("person"),
+        widget=AutocompleteSelect(
+            PersonFilmwork._meta.get_field("person"), admin.site
+        ),
+    )
+    role = forms.ChoiceField(
+        choices=[("", "---------"), *PersonFilmwork.Role.choices],
+        required=False,
+        label=_("role"),
+    )
+    rating = forms.FloatField(
+        required=False,
+        label=_("rating"),
+        validators=[MinValueValidator(0), MaxValueValidator(10)],
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["genre"].choices = [("", "---------"), *genre_choices()]
+
+
+def _cleaned_data(modeladmin, request, *required):
+    """Параметры действия из формы или ``None`` с сообщением об ошибке."""
+    form = modeladmin.action_form(request.POST)
+    form.fields["action"].choices = modeladmin.get_action_choices(request)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            modeladmin.message_user(request, errors[0], messages.ERROR)
+        return None
+    missing = [
+        str(form.fields[name].label)
+        for name in required
+        if form.cleaned_data[name] in (None, "")
+    ]
+    if missing:
+        modeladmin.message_user(
+            request,
+            _("bulk_action_required_fields") % {"fields": ", ".join(missing)},
+            messages.ERROR,
+        )
+        return None
+    return form.cleaned_data
+
+
+def _run(modeladmin, request, queryset, operation, task_name, **params):
+    """Выборку до ``bulk_task_threshold`` фильмов обрабатывает сразу,
+    большую — ставит в очередь задачей ``task_name``."""
+    ids = queryset.order_by("pk").values_list("pk", flat=True)
+    limit = modeladmin.bulk_task_threshold
+    if len(ids[: limit + 1]) > limit:
+        task = enqueue(
+            task_name,
+            created_by=request.user.get_username(),
+            selection=selection(queryset),
+            chunk_size=modeladmin.bulk_chunk_size,
+            **params,
+        )
+        message_task_queued(modeladmin, request, task)
+        return
+    result = bulk.run_in_chunks(
+        queryset, operation, chunk_size=modeladmin.bulk_chunk_size
+    )
+    modeladmin.message_user(
+        request,
+        _("bulk_action_done")
+        % {
+            "film_works": result.film_works,
+            "rows": result.rows,
+            "chunks": result.chunks,
+            "seconds": f"{result.seconds:.1f}",
+        },
+        messages.SUCCESS,
+    )
+
+
+@admin.action(permissions=["delete"], description=_("bulk_delete"))
+def bulk_delete(modeladmin, request, queryset):
+    """Удаляет выбранные фильмы одним запросом на пачку, без обхода
+    связанных объектов и сигналов на каждую строку."""
+    if request.POST.get("post"):
+        _run(
+            modeladmin,
+            request,
+            queryset,
+            bulk.delete_film_works,
+            "delete_film_works",
+        )
+        return None
+
+    opts = modeladmin.model._meta
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        "title": _("bulk_delete"),
+        "opts": opts,
+        "message": _("bulk_delete_confirmation")
+        % {"count": queryset.count(), "name": opts.verbose_name_plural},
+        "related": sorted(
+            {
+                str(relation.related_model._meta.verbose_name_plural)
+                for relation in opts.related_objects
+            }
+        ),
+        "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        "select_across": request.POST.get("select_across", "0"),
+        "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        "media": modeladmin.media,
+    }
+    return TemplateResponse(
+        request,
+        "admin/movies/filmwork/bulk_delete_confirmation.html",
+        context,
+    )
+
+
+@admin.action(permissions=["change"], description=_("bulk_set_genre"))
+def bulk_set_genre(modeladmin, request, queryset):
+    data = _cleaned_data(modeladmin, request, "genre")
+    if data is not None:
+        operation = bulk.set_genre(data["genre"].pk, data["replace_genres"])
+        _run(
+            modeladmin,
+            request,
+            queryset,
+            operation,
+            "set_genre",
+            genre_id=data["genre"].pk,
+            replace=data["replace_genres"],
+        )
+
+
+@admin.action(
+    permissions=["change"], description=_("bulk_reassign_person_role")
+)
+def bulk_reassign_person_role(modeladmin, request, queryset):
+    data = _cleaned_data(modeladmin, request, "person", "role")
+    if data is not None:
+        operation = bulk.reassign_person_role(data["person"].pk, data["role"])
+        _run(
+            modeladmin,
+            request,
+            queryset,
+            operation,
+            "reassign_person_role",
+            person_id=data["person"].pk,
+            role=data["role"],
+        )
+
+
+@admin.action(permissions=["change"], description=_("bulk_set_rating"))
+def bulk_set_rating(modeladmin, request, queryset):
+    data = _cleaned_data(modeladmin, request, "rating")
+    if data is not None:
+        _run(
+            modeladmin,
+            request,
+            queryset,
+            bulk.set_rating(data["rating"]),
+            "set_rating",
+            rating=data["rating"],
+        )
+
+
+class BulkActionsMixin:
+    """Массовые действия над фильмами вместо стандартного удаления.
+
+    Стандартное ``delete_selected`` загружает объекты, обходит каскады
+    и вызывает сигналы построчно; здесь каждая пачка из
+    ``bulk_chunk_size`` фильмов — один-два SQL-запроса в своей
+    транзакции. Больше ``bulk_task_threshold`` фильмов обрабатывает
+    фоновая задача, чтобы запрос не ждал до таймаута прокси.
+    """
+
+    action_form = FilmworkActionForm
+    actions = (
+        bulk_delete,
+        bulk_set_genre,
+        bulk_reassign_person_role,
+        bulk_set_rating,
+    )
+    bulk_chunk_size = 1000
+    bulk_task_threshold = 5000
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+
+@admin.action(permissions=["delete"], description=_("merge_duplicates"))
+def merge_duplicate_persons(modeladmin, request, queryset):
+    """Ищет дубликаты среди выбранных персон и сливает их."""
+    stats = dedupe_persons(queryset, merge=True)
+    modeladmin.message_user(
+        request,
+        _("merge_duplicates_done")
+        % {
+            "persons": stats.persons,
+            "clusters": stats.clusters,
+            "merged": stats.merged,
+            "moved": stats.links_moved,
+            "deleted": stats.links_deleted,
+            "seconds": f"{stats.seconds:.1f}",
+        },
+        messages.SUCCESS,
+    )
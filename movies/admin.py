@@ -1,38 +1,165 @@
 from django.contrib import admin
-
-from .models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
+from django.db.models import F
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from .actions import BulkActionsMixin, merge_duplicate_persons
+from .export_admin import ExportMixin, export_csv, export_jsonl
+from .filmography import FilmographyMixin
+from .filters import CreationDateListFilter, TypeListFilter
+from .import_admin import ImportMixin
+from .leaderboards import LeaderboardsMixin
+from .models import (
+    FILMWORK_SEARCH_VECTOR,
+    Filmwork,
+    Genre,
+    GenreFilmwork,
+    Person,
+    PersonFilmwork,
+    Task,
+)
+from .pagination import EstimatedCountPaginator, KeysetChangeList
+from .reference import genre_choices
+from .search import IndexedSearchMixin
+from .task_admin import TaskAdminMixin
+from .widgets import PreloadedAutocompleteSelect, PreloadedRelatedForm
 
 
 @admin.register(Genre)
-class GenreAdmin(admin.ModelAdmin):
+class GenreAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "modified",
     )
 
-    search_fields = ("name", "description", "id")
+    search_fields = ("name", "description")
+
+
+class PreloadedAutocompleteInline(admin.TabularInline):
+    """Инлайн, страница которого не зависит от размера связанных таблиц.
+
+    Вместо ``<select>`` со всеми строками справочника используется
+    autocomplete (отдаёт варианты постранично), а подписи уже выбранных
+    значений берутся из строк, загруженных через ``select_related``.
+    """
+
+    form = PreloadedRelatedForm
+    extra = 0
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related(*self.autocomplete_fields)
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs["widget"] = PreloadedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get("using")
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 class GenreFilmworkInline(admin.TabularInline):
+    """Жанров немного, поэтому вместо autocomplete — обычный ``<select>``,
+    варианты которого берутся из кеша справочника без запроса к базе."""
+
     model = GenreFilmwork
+    extra = 0
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == "genre":
+            formfield.choices = [("", "---------"), *genre_choices()]
+        return formfield
+
+
+class LatestFilmsFormSet(BaseInlineFormSet):
+    """Только первые ``limit`` строк: у плодовитой персоны их тысячи."""
+
+    limit = 20
+
+    def get_queryset(self):
+        if not hasattr(self, "_latest"):
+            self._latest = list(super().get_queryset()[: self.limit])
+        return self._latest
+
+
+class FilmographyInline(admin.TabularInline):
+    """Последние фильмы персоны только для просмотра; полный список —
+    на странице фильмографии."""
+
+    model = PersonFilmwork
+    formset = LatestFilmsFormSet
+    fields = readonly_fields = ("film_work_link", "role", "creation_date")
+    verbose_name_plural = _("filmography")
+    extra = 0
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("film_work")
+            .order_by(
+                F("film_work__creation_date").desc(nulls_last=True),
+                "film_work_id",
+            )
+        )
+
+    @admin.display(description=_("film_work"))
+    def film_work_link(self, obj):
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse("admin:movies_filmwork_change", args=[obj.film_work_id]),
+            obj.film_work.title,
+        )
+
+    @admin.display(description=_("creation_date"))
+    def creation_date(self, obj):
+        return obj.film_work.creation_date
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(FilmographyMixin, IndexedSearchMixin, admin.ModelAdmin):
+    inlines = (FilmographyInline,)
+
     list_display = (
         "full_name",
         "modified",
     )
 
-    search_fields = ("full_name", "id")
+    search_fields = ("full_name",)
+    actions = (merge_duplicate_persons,)
 
 
-class PersonFilmworkInline(admin.TabularInline):
+class PersonFilmworkInline(PreloadedAutocompleteInline):
     model = PersonFilmwork
+    autocomplete_fields = ("person",)
 
 
 @admin.register(Filmwork)
-class FilmworkAdmin(admin.ModelAdmin):
+class FilmworkAdmin(
+    LeaderboardsMixin,
+    ImportMixin,
+    ExportMixin,
+    BulkActionsMixin,
+    IndexedSearchMixin,
+    admin.ModelAdmin,
+):
     inlines = (GenreFilmworkInline, PersonFilmworkInline)
 
     list_display = (
@@ -42,6 +169,57 @@ class FilmworkAdmin(admin.ModelAdmin):
         "rating",
     )
 
-    list_filter = ("type", "creation_date")
+    list_filter = (TypeListFilter, CreationDateListFilter)
+
+    actions = (*BulkActionsMixin.actions, export_csv, export_jsonl)
+
+    search_fields = ("title", "description")
+    search_mode = "fulltext"
+    search_vector = FILMWORK_SEARCH_VECTOR
 
-    search_fields = ("title", "description", "id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+@admin.register(Task)
+class TaskAdmin(TaskAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "title",
+        "status",
+        "progress_bar",
+        "attempts",
+        "created_by",
+        "created",
+        "finished",
+    )
+    list_filter = ("status", "name")
+    ordering = ("-created",)
+
+    fields = readonly_fields = (
+        "title",
+        "status",
+        "progress_bar",
+        "arguments",
+        "result_data",
+        "result_file",
+        "error_text",
+        "attempts",
+        "max_attempts",
+        "run_after",
+        "worker",
+        "created_by",
+        "created",
+        "started",
+        "finished",
+        "heartbeat",
+    )
+
+    maintenance_tasks = (
+        "export_search_index",
+        "refresh_film_cards",
+        "rebuild_rating_stats",
+        "build_similar_films",
+    )
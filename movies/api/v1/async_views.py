@@ -0,0 +1,65 @@
+from django.http import Http404, JsonResponse
+from django.views import View
+
+from movies.cards import card_values
+from movies.models import Filmwork, FilmworkCard, Person, PersonFilmwork
+
+from .views import MoviesApiMixin
+
+PERSONS_LIMIT = 50
+
+
+class AsyncMovieDetailApi(MoviesApiMixin, View):
+    """Карточка фильма через асинхронный ORM.
+
+    Те же запросы, что и у ``MoviesDetailApi``, но без кеша: эндпоинт
+    нужен для ASGI-развёртывания и сравнения с WSGI (docs/asgi.md).
+    """
+
+    async def get(self, request, pk):
+        try:
+            movie = await card_values().aget(pk=pk)
+        except FilmworkCard.DoesNotExist:
+            try:
+                movie = await self.get_queryset().aget(pk=pk)
+            except Filmwork.DoesNotExist:
+                raise Http404
+        return JsonResponse(movie)
+
+
+class AsyncPersonListApi(View):
+    http_method_names = ["get"]
+
+    async def get(self, request):
+        queryset = Person.objects.order_by("full_name").values(
+            "id", "full_name"
+        )
+        query = request.GET.get("query", "").strip()
+        if query:
+            queryset = queryset.filter(full_name__icontains=query)
+        persons = [person async for person in queryset[:PERSONS_LIMIT]]
+        return JsonResponse({"results": persons})
+
+
+class AsyncPersonDetailApi(View):
+    http_method_names = ["get"]
+
+    async def get(self, request, pk):
+        try:
+            person = await Person.objects.values("id", "full_name").aget(pk=pk)
+        except Person.DoesNotExist:
+            raise Http404
+        films = (
+            PersonFilmwork.objects.filter(person_id=pk)
+            .order_by("-film_work__creation_date", "film_work_id")
+            .values("role", "film_work_id", "film_work__title")
+        )
+        person["films"] = [
+            {
+                "id": film["film_work_id"],
+                "title": film["film_work__title"],
+                "role": film["role"],
+            }
+            async for film in films.aiterator()
+        ]
+        return JsonResponse(person)
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+
+CACHE_TIMEOUT = 60 * 5
+PREFIX = "api:v1"
+LIST_GENERATION_KEY = f"{PREFIX}:list_generation"
+DETAIL_GENERATION_KEY = f"{PREFIX}:detail_generation"
+
+
+def _generation(key: str) -> int:
+    return cache.get_or_set(key, 1, None)
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def list_key(page: str) -> str:
+    return f"{PREFIX}:movies:{_generation(LIST_GENERATION_KEY)}:{page}"
+
+
+def detail_key(pk) -> str:
+    return f"{PREFIX}:movie:{_generation(DETAIL_GENERATION_KEY)}:{pk}"
+
+
+def invalidate_film_work(pk) -> None:
+    """Сбрасывает карточку фильма и все страницы списка."""
+    cache.delete(detail_key(pk))
+    _bump(LIST_GENERATION_KEY)
+
+
+def invalidate_all() -> None:
+    """Сбрасывает весь кеш API, например после переименования персоны."""
+    _bump(DETAIL_GENERATION_KEY)
+    _bump(LIST_GENERATION_KEY)
@@ -0,0 +1,20 @@
+from django.urls import path
+
+from . import async_views, views
+
+urlpatterns = [
+    path("movies/", views.MoviesListApi.as_view()),
+    path("movies/<uuid:pk>/", views.MoviesDetailApi.as_view()),
+    path("movies/<uuid:pk>/similar/", views.SimilarMoviesApi.as_view()),
+    path("genres/", views.GenresApi.as_view()),
+    path("persons/<uuid:pk>/films/", views.PersonFilmographyApi.as_view()),
+    path(
+        "async/movies/<uuid:pk>/",
+        async_views.AsyncMovieDetailApi.as_view(),
+    ),
+    path("async/persons/", async_views.AsyncPersonListApi.as_view()),
+    path(
+        "async/persons/<uuid:pk>/",
+        async_views.AsyncPersonDetailApi.as_view(),
+    ),
+]
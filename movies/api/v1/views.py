@@ -0,0 +1,144 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.views import View
+from django.views.generic.detail import BaseDetailView
+from django.views.generic.list import BaseListView
+
+from movies.cards import card_values
+from movies.filmography import ROLE_LABELS, filmography
+from movies.models import Filmwork, FilmworkCard, Person, SimilarFilmwork
+from movies.reference import GENRES
+
+from . import cache as api_cache
+
+
+class MoviesApiMixin:
+    model = Filmwork
+    http_method_names = ["get"]
+
+    def get_queryset(self):
+        return Filmwork.objects.order_by("-modified", "-id").cards()
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(context, **response_kwargs)
+
+
+class PaginatedApiMixin:
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse(context, **response_kwargs)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        paginator, page, queryset, is_paginated = self.paginate_queryset(
+            self.object_list, self.paginate_by
+        )
+        return {
+            "count": paginator.count,
+            "total_pages": paginator.num_pages,
+            "prev": (
+                page.previous_page_number() if page.has_previous() else None
+            ),
+            "next": page.next_page_number() if page.has_next() else None,
+            "results": list(queryset),
+        }
+
+
+class MoviesListApi(MoviesApiMixin, PaginatedApiMixin, BaseListView):
+    paginate_by = 50
+
+    def get(self, request, *args, **kwargs):
+        page = request.GET.get(self.page_kwarg, "1")
+        if not page.isdigit():
+            return super().get(request, *args, **kwargs)
+
+        key = api_cache.list_key(page)
+        context = cache.get(key)
+        if context is None:
+            self.object_list = self.get_queryset()
+            context = self.get_context_data()
+            cache.set(key, context, api_cache.CACHE_TIMEOUT)
+        return self.render_to_response(context)
+
+
+class MoviesDetailApi(MoviesApiMixin, BaseDetailView):
+    def get(self, request, *args, **kwargs):
+        key = api_cache.detail_key(kwargs[self.pk_url_kwarg])
+        context = cache.get(key)
+        if context is None:
+            self.object = self.get_object()
+            context = self.get_context_data()
+            cache.set(key, context, api_cache.CACHE_TIMEOUT)
+        return self.render_to_response(context)
+
+    def get_object(self, queryset=None):
+        """Карточка из ``film_work_card`` одним запросом по ключу.
+
+        Пока карточка не построена, фильм собирается по таблицам связей.
+        """
+        try:
+            return card_values().get(pk=self.kwargs[self.pk_url_kwarg])
+        except FilmworkCard.DoesNotExist:
+            return super().get_object(queryset)
+
+    def get_context_data(self, **kwargs):
+        return self.object
+
+
+class GenresApi(View):
+    """Справочник жанров из двухуровневого кеша, без запроса к базе."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": pk, "name": name} for pk, name in GENRES.get()
+                ]
+            }
+        )
+
+
+class PersonFilmographyApi(PaginatedApiMixin, BaseListView):
+    """Фильмы персоны по дате выхода, ``?role=`` — отбор по роли."""
+
+    http_method_names = ["get"]
+    paginate_by = 50
+
+    def get_queryset(self):
+        role = self.request.GET.get("role")
+        if role is not None and role not in ROLE_LABELS:
+            raise Http404
+        if not Person.objects.filter(pk=self.kwargs["pk"]).exists():
+            raise Http404
+        return filmography(self.kwargs["pk"], role)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["results"] = [
+            {"id": row.pop("film_work_id"), **row}
+            for row in context["results"]
+        ]
+        return context
+
+
+class SimilarMoviesApi(View):
+    """Похожие фильмы из ``similar_film_work`` по убыванию оценки."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, pk):
+        similar = list(
+            SimilarFilmwork.objects.filter(film_work_id=pk)
+            .order_by("-score")
+            .values("similar_id", "score", title=F("similar__title"))
+        )
+        if not similar and not Filmwork.objects.filter(pk=pk).exists():
+            raise Http404
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": row.pop("similar_id"), **row} for row in similar
+                ]
+            }
+        )
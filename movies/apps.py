@@ -6,3 +6,6 @@ class MoviesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "movies"
     verbose_name = _("movies")
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,210 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from django.db import connections, models, transaction
+from django.db.models.functions import Now
+
+from .api.v1 import cache as api_cache
+from .cards import refresh_cards
+from .db.replicas import fence_writes
+from .db.utils import table_name
+from .db.uuid7 import UUID7_SQL
+from .models import Filmwork, GenreFilmwork, PersonFilmwork
+from .reference import invalidate_filter_counts
+from .rating_stats import (
+    collect_rating_stats,
+    film_work_keys,
+    refresh_rating_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkResult:
+    film_works: int = 0
+    rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+
+def run_in_chunks(
+    queryset,
+    operation: Callable[[list, str], int],
+    chunk_size: int = 1000,
+    progress: Optional[Callable[[BulkResult], None]] = None,
+) -> BulkResult:
+    """Применяет ``operation`` к ``id`` фильмов из ``queryset`` пачками.
+
+    Объекты не загружаются: из выборки читаются только ``id`` по ключу,
+    каждая пачка обрабатывается в своей транзакции. Сигналы не
+    срабатывают, поэтому сводки рейтингов пересчитываются, а кеш API и
+    счётчики фильтров сбрасываются в конце.
+    """
+    ids = queryset.order_by("pk").values_list("pk", flat=True)
+
+    def chunks():
+        last_pk = None
+        while True:
+            page = ids if last_pk is None else ids.filter(pk__gt=last_pk)
+            chunk = list(page[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1]
+            yield chunk
+
+    return _apply(chunks(), operation, queryset.db, progress)
+
+
+def _apply(
+    chunks: Iterable[list],
+    operation: Callable[[list, str], int],
+    using: str,
+    progress: Optional[Callable[[BulkResult], None]],
+) -> BulkResult:
+    result = BulkResult()
+    started = time.perf_counter()
+    try:
+        with collect_rating_stats(using):
+            for chunk in chunks:
+                with transaction.atomic(using=using):
+                    result.rows += operation(chunk, using)
+                result.film_works += len(chunk)
+                result.chunks += 1
+                result.seconds = time.perf_counter() - started
+                logger.info(
+                    "%s: %d film works, %d rows, %.1fs",
+                    getattr(operation, "__name__", operation),
+                    result.film_works,
+                    result.rows,
+                    result.seconds,
+                )
+                if progress is not None:
+                    progress(result)
+    finally:
+        # Записанные пачки остаются и при ошибке или отмене задачи.
+        if result.chunks:
+            fence_writes()
+            api_cache.invalidate_all()
+            invalidate_filter_counts()
+    return result
+
+
+def touch_film_works(film_work_ids: list, using: str) -> None:
+    """Обновляет ``modified`` и карточки фильмов, чьи связи изменились,
+    чтобы изменения увидели выгрузка в поисковый индекс и API."""
+    Filmwork.objects.using(using).filter(pk__in=film_work_ids).update(
+        modified=Now()
+    )
+    refresh_cards(film_work_ids, using)
+
+
+def delete_film_works(film_work_ids: list, using: str) -> int:
+    """Удаляет фильмы и все ссылающиеся на них строки одним запросом.
+
+    Связанные таблицы берутся из ``Filmwork._meta.related_objects``:
+    для каждой — ``DELETE`` в CTE, а внешние ключи проверяются в конце
+    запроса, когда удалены и фильмы, и ссылки на них. Сводки рейтингов
+    их жанров, персон и годов пересчитываются после удаления.
+    """
+    keys = film_work_keys(film_work_ids, using)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    ctes = ["ids AS (SELECT unnest(%s::uuid[]) AS id)"]
+    for index, relation in enumerate(Filmwork._meta.related_objects):
+        if getattr(relation, "on_delete", None) is not models.CASCADE:
+            raise ValueError(
+                f"{relation.related_model.__name__}.{relation.field.name} "
+                "is not ON DELETE CASCADE."
+            )
+        ctes.append(
+            f"related_{index} AS (DELETE FROM "
+            f"{table_name(relation.related_model, using)} "
+            f"WHERE {quote(relation.field.column)} IN (SELECT id FROM ids))"
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH {', '.join(ctes)} DELETE FROM "
+            f"{table_name(Filmwork, using)} WHERE id IN (SELECT id FROM ids)",
+            [film_work_ids],
+        )
+        deleted = cursor.rowcount
+    refresh_rating_stats(**keys, using=using)
+    return deleted
+
+
+def set_genre(genre_id, replace: bool = False) -> Callable[[list, str], int]:
+    """Добавляет жанр выбранным фильмам, с ``replace`` — вместо всех
+    остальных их жанров."""
+
+    def set_genre(film_work_ids: list, using: str) -> int:
+        links = table_name(GenreFilmwork, using)
+        genre_ids = {genre_id}
+        if replace:
+            genre_ids |= film_work_keys(film_work_ids, using)["genre_ids"]
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "WITH ids AS (SELECT unnest(%(ids)s::uuid[]) AS id), "
+                f"removed AS (DELETE FROM {links} WHERE %(replace)s "
+                "AND film_work_id IN (SELECT id FROM ids) "
+                "AND genre_id <> %(genre)s) "
+                f"INSERT INTO {links} (id, film_work_id, genre_id, created) "
+                f"SELECT {UUID7_SQL}, id, %(genre)s, now() FROM ids "
+                "ON CONFLICT (film_work_id, genre_id) DO NOTHING",
+                {"ids": film_work_ids, "genre": genre_id, "replace": replace},
+            )
+            rows = cursor.rowcount
+        touch_film_works(film_work_ids, using)
+        refresh_rating_stats(genre_ids=genre_ids, using=using)
+        return rows
+
+    return set_genre
+
+
+def reassign_person_role(person_id, role: str) -> Callable[[list, str], int]:
+    """Переводит персону в выбранных фильмах на роль ``role``.
+
+    Затрагиваются только фильмы, где персона уже есть; все её прежние
+    роли в них заменяются одной новой без нарушения
+    ``film_work_person_role_idx``.
+    """
+
+    def reassign_person_role(film_work_ids: list, using: str) -> int:
+        links = table_name(PersonFilmwork, using)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"WITH removed AS (DELETE FROM {links} "
+                "WHERE film_work_id = ANY(%(ids)s::uuid[]) "
+                "AND person_id = %(person)s AND role <> %(role)s "
+                "RETURNING film_work_id), "
+                "moved AS (SELECT DISTINCT film_work_id FROM removed), "
+                f"inserted AS (INSERT INTO {links} "
+                "(id, film_work_id, person_id, role, created) "
+                f"SELECT {UUID7_SQL}, film_work_id, %(person)s, "
+                "%(role)s, now() FROM moved "
+                "ON CONFLICT (film_work_id, person_id, role) DO NOTHING) "
+                "SELECT film_work_id FROM moved",
+                {"ids": film_work_ids, "person": person_id, "role": role},
+            )
+            changed = [row[0] for row in cursor.fetchall()]
+        if changed:
+            touch_film_works(changed, using)
+        return len(changed)
+
+    return reassign_person_role
+
+
+def set_rating(rating: Optional[float]) -> Callable[[list, str], int]:
+    def set_rating(film_work_ids: list, using: str) -> int:
+        rows = (
+            Filmwork.objects.using(using)
+            .filter(pk__in=film_work_ids)
+            .update(rating=rating, modified=Now())
+        )
+        refresh_cards(film_work_ids, using)
+        refresh_rating_stats(film_work_ids, using=using)
+        return rows
+
+    return set_rating
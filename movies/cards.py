@@ -0,0 +1,124 @@
+import threading
+from functools import partial
+from typing import Iterable, Iterator, Optional
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from movies.db.utils import table_name
+from movies.models import Filmwork, FilmworkCard, FilmworkQuerySet
+
+CARD_FIELDS = (
+    *FilmworkQuerySet.CARD_FIELDS[1:],
+    "genres",
+    "actors",
+    "writers",
+    "directors",
+)
+
+_pending = threading.local()
+
+
+def card_values():
+    """Карточки в том же виде, что и ``Filmwork.objects.cards()``."""
+    return FilmworkCard.objects.values(*CARD_FIELDS, id=F("film_work_id"))
+
+
+def refresh_cards(
+    film_work_ids: Optional[Iterable] = None, using: str = "default"
+) -> int:
+    """Пересобирает карточки фильмов одним ``INSERT ... SELECT``.
+
+    Данные не проходят через Python: выборка ``Filmwork.objects.cards()``
+    сразу вставляется в ``film_work_card`` с ``ON CONFLICT DO UPDATE``.
+    Строки, которые не изменились, не перезаписываются. Возвращает число
+    вставленных и обновлённых карточек.
+    """
+    queryset = Filmwork.objects.using(using).order_by()
+    if film_work_ids is not None:
+        film_work_ids = list(film_work_ids)
+        if not film_work_ids:
+            return 0
+        queryset = queryset.filter(pk__in=film_work_ids)
+    queryset = queryset.cards().annotate(refreshed=Now())
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    query = queryset.query
+    columns = [
+        FilmworkCard._meta.get_field(
+            "film_work" if name == "id" else name
+        ).column
+        for name in (*query.values_select, *query.annotation_select)
+    ]
+    pk_column = FilmworkCard._meta.pk.column
+    updated = [quote(column) for column in columns if column != pk_column]
+    compared = [column for column in updated if column != quote("refreshed")]
+    assignments = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in updated
+    )
+    current = ", ".join(f"card.{column}" for column in compared)
+    excluded = ", ".join(f"EXCLUDED.{column}" for column in compared)
+    sql, params = query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table_name(FilmworkCard, using)} AS card "
+            f"({', '.join(quote(column) for column in columns)}) {sql} "
+            f"ON CONFLICT ({quote(pk_column)}) DO UPDATE SET {assignments} "
+            f"WHERE ({current}) IS DISTINCT FROM ({excluded})",
+            params,
+        )
+        return cursor.rowcount
+
+
+def refresh_all_cards(
+    chunk_size: int = 1000, using: str = "default"
+) -> Iterator[tuple[int, int]]:
+    """Обновляет все карточки пачками по ключу фильма.
+
+    Каждая пачка — отдельная короткая транзакция, поэтому чтение карточек
+    не блокируется, а таблица ни в какой момент не пустеет. Отдаёт число
+    просмотренных фильмов и обновлённых карточек по каждой пачке.
+    """
+    queryset = (
+        Filmwork.objects.using(using)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        film_work_ids = list(page[:chunk_size])
+        if not film_work_ids:
+            return
+        last_pk = film_work_ids[-1]
+        with transaction.atomic(using=using):
+            refreshed = refresh_cards(film_work_ids, using)
+        yield len(film_work_ids), refreshed
+
+
+def schedule_refresh(film_work_ids: Iterable, using: str = "default") -> None:
+    """Обновляет карточки после фиксации текущей транзакции.
+
+    Идентификаторы копятся до коммита, и все изменения транзакции
+    обновляются одним запросом. После отката накопленные идентификаторы
+    остаются и обновятся вместе со следующими: обновление идемпотентно.
+    """
+    pending = _pending_ids(using)
+    pending.update(film_work_ids)
+    transaction.on_commit(partial(_flush, using), using=using)
+
+
+def _pending_ids(using: str) -> set:
+    if not hasattr(_pending, "ids"):
+        _pending.ids = {}
+    return _pending.ids.setdefault(using, set())
+
+
+def _flush(using: str) -> None:
+    pending = _pending_ids(using)
+    if pending:
+        film_work_ids = list(pending)
+        pending.clear()
+        refresh_cards(film_work_ids, using)
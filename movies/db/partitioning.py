@@ -0,0 +1,390 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import NotSupportedError, OperationalError, connections
+from django.db import transaction
+from django.db.migrations.operations.base import Operation
+
+# Число hash-секций по умолчанию для partition_link_tables.
+LINK_TABLE_PARTITIONS = {"personfilmwork": 16, "genrefilmwork": 4}
+
+_INDEX_DEF = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ (.*)$")
+
+
+def split_table(db_table: str) -> tuple[str, str]:
+    """``'content"."film_work'`` -> ("content", "film_work")."""
+    schema, _, name = db_table.rpartition('"."')
+    return schema, name
+
+
+def partitions_of(db_table: str, connection) -> list[str]:
+    """Имена секций таблицы (без схемы), пустой список — не секционирована."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [quote(db_table)],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+@dataclass
+class TableRebuild:
+    """Пересоздаёт таблицу модели без остановки записи.
+
+    Рядом создаётся теневая таблица ``<name>_new`` — секционированная по
+    hash от ``column`` или обычная при ``partitions=None`` — с теми же
+    ограничениями и индексами. Триггер повторяет в ней все изменения
+    исходной, существующие строки переносятся пачками по первичному ключу,
+    затем таблицы меняются местами в короткой транзакции. Исходная
+    таблица остаётся как ``<name>_old`` до ``drop_old()``.
+
+    В секционированной таблице первичный ключ и уникальные ограничения
+    обязаны содержать ключ секционирования, поэтому он добавляется в
+    первичный ключ: в базе ``(id, film_work_id)``, для Django ключом
+    остаётся ``id``.
+    """
+
+    model: type
+    partitions: Optional[int] = None
+    column: str = "film_work_id"
+    using: str = "default"
+
+    def __post_init__(self):
+        self.connection = connections[self.using]
+        quote = self.connection.ops.quote_name
+        schema, self.name = split_table(self.model._meta.db_table)
+        self.prefix = f"{quote(schema)}." if schema else ""
+        self.table = self.qualified(self.name)
+        self.shadow = self.qualified(f"{self.name}_new")
+        self.old = self.qualified(f"{self.name}_old")
+        self.function = self.qualified(f"{self.name}_mirror")
+        self.pk = quote(self.model._meta.pk.column)
+
+    def qualified(self, name: str) -> str:
+        return self.prefix + self.connection.ops.quote_name(name)
+
+    def _fetch(self, sql: str, params=None) -> list[tuple]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _execute(self, *statements: str) -> None:
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def exists(self, table: str) -> bool:
+        return self._fetch("SELECT to_regclass(%s)", [table])[0][0] is not None
+
+    def is_partitioned(self) -> bool:
+        return self._fetch(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass",
+            [self.table],
+        )[0][0]
+
+    def constraints(self, table: str) -> list[tuple[str, str, str, list]]:
+        """(имя, тип, определение, колонки) ограничений таблицы."""
+        return self._fetch(
+            "SELECT con.conname, con.contype, pg_get_constraintdef(con.oid), "
+            "ARRAY(SELECT attname FROM unnest(con.conkey) WITH ORDINALITY "
+            "AS k(attnum, position) JOIN pg_attribute a "
+            "ON a.attrelid = con.conrelid AND a.attnum = k.attnum "
+            "ORDER BY k.position) "
+            "FROM pg_constraint con WHERE con.conrelid = %s::regclass "
+            "ORDER BY con.conname",
+            [table],
+        )
+
+    def indexes(self, table: str) -> list[tuple[str, str]]:
+        """(имя, определение) индексов, не связанных с ограничениями."""
+        return self._fetch(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) "
+            "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT EXISTS ("
+            "SELECT 1 FROM pg_constraint con "
+            "WHERE con.conrelid = i.indrelid AND con.conindid = i.indexrelid"
+            ") ORDER BY c.relname",
+            [table],
+        )
+
+    def prepare(self) -> None:
+        """Создаёт теневую таблицу и триггер; повторный вызов ничего не
+        делает, поэтому прерванный перенос можно продолжить."""
+        if self.exists(self.old):
+            raise RuntimeError(
+                f"{self.old} is left from a previous rebuild, drop it first."
+            )
+        if self.exists(self.shadow):
+            return
+        quote = self.connection.ops.quote_name
+        column = quote(self.column)
+        statements = [
+            f"CREATE TABLE {self.shadow} (LIKE {self.table} "
+            "INCLUDING DEFAULTS)"
+            + (f" PARTITION BY HASH ({column})" if self.partitions else "")
+        ]
+        for remainder in range(self.partitions or 0):
+            statements.append(
+                f"CREATE TABLE {self.qualified(f'{self.name}_p{remainder}')} "
+                f"PARTITION OF {self.shadow} FOR VALUES WITH "
+                f"(MODULUS {self.partitions}, REMAINDER {remainder})"
+            )
+        for name, kind, definition, columns in self.constraints(self.table):
+            if kind == "p":
+                columns = [self.model._meta.pk.column]
+            if kind in "pu":
+                if self.partitions and self.column not in columns:
+                    columns = [*columns, self.column]
+                definition = (
+                    "PRIMARY KEY" if kind == "p" else "UNIQUE"
+                ) + f" ({', '.join(map(quote, columns))})"
+                name = f"{name}_new"
+            statements.append(
+                f"ALTER TABLE {self.shadow} ADD CONSTRAINT {quote(name)} "
+                f"{definition}"
+            )
+        for name, definition in self.indexes(self.table):
+            unique, rest = _INDEX_DEF.match(definition).groups()
+            statements.append(
+                f"CREATE {unique or ''}INDEX {quote(f'{name}_new')} "
+                f"ON {self.shadow} {rest}"
+            )
+        statements += [
+            f"CREATE FUNCTION {self.function}() RETURNS trigger "
+            "LANGUAGE plpgsql AS $$ BEGIN "
+            "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+            f"DELETE FROM {self.shadow} WHERE {self.pk} = OLD.{self.pk}; "
+            "END IF; "
+            "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+            f"INSERT INTO {self.shadow} SELECT NEW.* ON CONFLICT DO NOTHING; "
+            "END IF; RETURN NULL; END $$",
+            f"CREATE TRIGGER {quote(f'{self.name}_mirror')} "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {self.table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {self.function}()",
+        ]
+        with transaction.atomic(using=self.using):
+            self._execute(*statements)
+
+    def backfill(self, chunk_size: int = 10_000) -> Iterator[int]:
+        """Копирует строки пачками по ключу, отдаёт число строк в пачке.
+
+        Строки пачки блокируются ``FOR SHARE``: параллельное изменение
+        либо ждёт конца пачки и затем применяется триггером к копии, либо
+        завершается раньше, и пачка уже читает новую версию строки.
+        """
+        last = None
+        while True:
+            with transaction.atomic(using=self.using):
+                ids = [
+                    row[0]
+                    for row in self._fetch(
+                        f"SELECT {self.pk} FROM {self.table} "
+                        + (f"WHERE {self.pk} > %s " if last else "")
+                        + f"ORDER BY {self.pk} LIMIT %s FOR SHARE",
+                        [last, chunk_size] if last else [chunk_size],
+                    )
+                ]
+                if not ids:
+                    return
+                with self.connection.cursor() as cursor:
+                    cursor.execute(
+                        f"INSERT INTO {self.shadow} SELECT * "
+                        f"FROM {self.table} WHERE {self.pk} = ANY(%s) "
+                        "ON CONFLICT DO NOTHING",
+                        [ids],
+                    )
+            last = ids[-1]
+            yield len(ids)
+
+    def swap(self, lock_timeout: str = "5s", attempts: int = 10) -> None:
+        """Меняет таблицы местами под ``ACCESS EXCLUSIVE``; если блокировку
+        не удалось получить за ``lock_timeout``, попытка повторяется."""
+        quote = self.connection.ops.quote_name
+        old_constraints = [
+            name
+            for name, kind, _, _ in self.constraints(self.table)
+            if kind in "pu"
+        ]
+        old_indexes = [name for name, _ in self.indexes(self.table)]
+        statements = [
+            f"LOCK TABLE {self.table} IN ACCESS EXCLUSIVE MODE",
+            f"DROP TRIGGER {quote(f'{self.name}_mirror')} ON {self.table}",
+            f"DROP FUNCTION {self.function}()",
+            f"ALTER TABLE {self.table} RENAME TO {quote(f'{self.name}_old')}",
+            *(
+                f"ALTER TABLE {self.old} RENAME CONSTRAINT {quote(name)} "
+                f"TO {quote(f'{name}_old')}"
+                for name in old_constraints
+            ),
+            *(
+                f"ALTER INDEX {self.qualified(name)} "
+                f"RENAME TO {quote(f'{name}_old')}"
+                for name in old_indexes
+            ),
+            f"ALTER TABLE {self.shadow} RENAME TO {quote(self.name)}",
+            *(
+                f"ALTER TABLE {self.table} RENAME CONSTRAINT "
+                f"{quote(f'{name}_new')} TO {quote(name)}"
+                for name in old_constraints
+            ),
+            *(
+                f"ALTER INDEX {self.qualified(f'{name}_new')} "
+                f"RENAME TO {quote(name)}"
+                for name in old_indexes
+            ),
+        ]
+        for attempt in range(1, attempts + 1):
+            try:
+                with transaction.atomic(using=self.using):
+                    self._execute(
+                        f"SET LOCAL lock_timeout = '{lock_timeout}'",
+                        *statements,
+                    )
+                break
+            except OperationalError:
+                if attempt == attempts:
+                    raise
+                time.sleep(attempt)
+        self._execute(f"ANALYZE {self.table}")
+
+    def drop_old(self) -> None:
+        self._execute(f"DROP TABLE IF EXISTS {self.old}")
+
+    def run(self, chunk_size: int = 10_000) -> int:
+        self.prepare()
+        rows = sum(self.backfill(chunk_size))
+        self.swap()
+        return rows
+
+
+class PartitionByHash(Operation):
+    """Секционирует таблицу модели по hash от ``column`` через
+    ``TableRebuild``; обратная операция возвращает обычную таблицу.
+
+    Если таблица уже секционирована командой ``partition_link_tables``,
+    операция ничего не делает. Требует ``atomic = False`` у миграции.
+    """
+
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(self, model_name, column, partitions, chunk_size=10_000):
+        self.model_name = model_name
+        self.column = column
+        self.partitions = partitions
+        self.chunk_size = chunk_size
+
+    def deconstruct(self):
+        kwargs = {
+            "model_name": self.model_name,
+            "column": self.column,
+            "partitions": self.partitions,
+        }
+        if self.chunk_size != 10_000:
+            kwargs["chunk_size"] = self.chunk_size
+        return self.__class__.__qualname__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _rebuild(self, app_label, schema_editor, state, partitions):
+        if schema_editor.atomic_migration:
+            raise NotSupportedError(
+                f"{self.__class__.__name__} cannot be executed inside "
+                "a transaction."
+            )
+        model = state.apps.get_model(app_label, self.model_name)
+        alias = schema_editor.connection.alias
+        if not self.allow_migrate_model(alias, model):
+            return
+        rebuild = TableRebuild(model, partitions, self.column, alias)
+        if rebuild.is_partitioned() == bool(partitions):
+            return
+        rebuild.run(self.chunk_size)
+        rebuild.drop_old()
+
+    def database_forwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        self._rebuild(app_label, schema_editor, to_state, self.partitions)
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        self._rebuild(app_label, schema_editor, to_state, None)
+
+    def describe(self):
+        return (
+            f"Hash-partition {self.model_name} by {self.column} into "
+            f"{self.partitions} partitions"
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return f"partition_{self.model_name.lower()}"
+
+
+class AddPartitionedIndexConcurrently(AddIndexConcurrently):
+    """``AddIndexConcurrently``, который работает и с секционированными
+    таблицами.
+
+    ``CREATE INDEX CONCURRENTLY`` для них не поддерживается, поэтому
+    индекс создаётся на родителе ``ON ONLY`` (мгновенно, без данных),
+    затем конкурентно на каждой секции и присоединяется к родительскому.
+    Для обычной таблицы поведение не меняется.
+    """
+
+    def database_forwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        db_table = model._meta.db_table
+        partitions = partitions_of(db_table, schema_editor.connection)
+        if not partitions:
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        quote = schema_editor.quote_name
+        schema, _ = split_table(db_table)
+        prefix = f"{quote(schema)}." if schema else ""
+
+        parent = self.index.create_sql(model, schema_editor)
+        parent.parts["table"] = f"ONLY {parent.parts['table']}"
+        schema_editor.execute(parent)
+        for partition in partitions:
+            name = f"{partition}_{self.index.name}"[:63]
+            statement = self.index.create_sql(
+                model, schema_editor, concurrently=True
+            )
+            statement.rename_table_references(
+                db_table, f'{schema}"."{partition}' if schema else partition
+            )
+            statement.parts["name"] = quote(name)
+            schema_editor.execute(statement)
+            schema_editor.execute(
+                f"ALTER INDEX {prefix}{quote(self.index.name)} "
+                f"ATTACH PARTITION {prefix}{quote(name)}"
+            )
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        self._ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if not partitions_of(model._meta.db_table, schema_editor.connection):
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        # DROP INDEX CONCURRENTLY не удаляет секционированный индекс.
+        schema_editor.remove_index(model, self.index)
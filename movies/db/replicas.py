@@ -0,0 +1,199 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+APP_LABEL = "movies"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+PIN_COOKIE = "db_primary"
+WRITE_FENCE_KEY = "replicas:write_fence"
+
+# Отставание реплики в секундах. Если всё полученное WAL уже применено,
+# отставания нет, даже когда последняя транзакция была давно; на мастере
+# (второй алиас на ту же базу) тоже 0. NULL — реплика не в потоковой
+# репликации и ещё ничего не применила.
+LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replica_aliases() -> list[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+class LagMonitor:
+    """Отставание реплик, которое перепроверяется не чаще раза в
+    ``REPLICA_LAG_CHECK_INTERVAL`` секунд на процесс.
+
+    Недоступная реплика считается бесконечно отстающей до следующей
+    проверки.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}
+
+    def lag(self, alias: str) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._checked.get(alias)
+        if (
+            entry is not None
+            and now - entry[0] < settings.REPLICA_LAG_CHECK_INTERVAL
+        ):
+            return entry[1]
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = cursor.fetchone()[0]
+        except DatabaseError:
+            lag = None
+        lag = None if lag is None else float(lag)
+        with self._lock:
+            self._checked[alias] = (now, lag)
+        return lag
+
+    def available(self) -> list[str]:
+        """Реплики, отстающие не больше ``REPLICA_MAX_LAG`` секунд."""
+        return [
+            alias
+            for alias in replica_aliases()
+            if (lag := self.lag(alias)) is not None
+            and lag <= settings.REPLICA_MAX_LAG
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._checked.clear()
+
+
+MONITOR = LagMonitor()
+
+
+def fence_writes() -> None:
+    """Отправляет чтения всех процессов на мастер на
+    ``REPLICA_PIN_SECONDS`` секунд: иначе кеши API и справочников могли бы
+    заполниться данными с реплики, ещё не получившей запись. Запись вне
+    HTTP-запроса (задачи, команды) вызывает его перед сбросом кешей."""
+    cache.set(WRITE_FENCE_KEY, True, settings.REPLICA_PIN_SECONDS)
+
+
+@dataclass
+class RoutingState:
+    """Маршрутизация в пределах одного HTTP-запроса."""
+
+    pinned: bool = False
+    wrote: bool = False
+    alias: Optional[str] = None
+
+    def mark_write(self) -> None:
+        if self.wrote:
+            return
+        self.pinned = self.wrote = True
+        fence_writes()
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar(
+    "replica_routing", default=None
+)
+
+
+class ReplicaRouter:
+    """Чтения моделей ``movies`` внутри HTTP-запроса — на реплику,
+    запись — на ``default``.
+
+    Вне запроса (команды, shell, воркеры) маршрутизация не меняется.
+    Запрос читает с мастера, если он изменяющий (POST и т. п.), если
+    открыта транзакция на ``default``, если у сессии есть кука недавней
+    записи или если кто-то писал в последние ``REPLICA_PIN_SECONDS``
+    секунд. Реплика выбирается одна на запрос среди отстающих не больше
+    ``REPLICA_MAX_LAG``; подходящих нет — чтение идёт на мастер.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or model._meta.app_label != APP_LABEL:
+            return None
+        if state.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            available = MONITOR.available()
+            state.alias = (
+                random.choice(available) if available else DEFAULT_DB_ALIAS
+            )
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        # Не помечает запрос как пишущий: admin открывает транзакцию через
+        # db_for_write и на GET формы изменения.
+        if model._meta.app_label != APP_LABEL:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Включает ``ReplicaRouter`` на время запроса и ставит куку
+    ``PIN_COOKIE`` после записи, чтобы следующие запросы той же сессии
+    видели свои изменения. Без реплик в настройках не подключается."""
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(
+            pinned=PIN_COOKIE in request.COOKIES
+            or cache.get(WRITE_FENCE_KEY) is not None
+        )
+        if request.method not in SAFE_METHODS:
+            state.mark_write()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        if response.streaming and not response.is_async:
+            # Выгрузки читают базу уже после выхода из промежуточного ПО.
+            response.streaming_content = self.bind(
+                response.streaming_content, state
+            )
+        return response
+
+    @staticmethod
+    def bind(content, state: RoutingState):
+        previous = _state.get()
+        _state.set(state)
+        try:
+            yield from content
+        finally:
+            _state.set(previous)
@@ -0,0 +1,14 @@
+from django.db import connections
+
+
+def table_name(model, using: str = "default") -> str:
+    """Экранированное имя таблицы модели вместе со схемой.
+
+    Для ``db_table = 'content"."film_work'`` вернёт
+    ``"content"."film_work"``.
+    """
+    return connections[using].ops.quote_name(model._meta.db_table)
+
+
+def column_names(model) -> list[str]:
+    return [field.column for field in model._meta.concrete_fields]
@@ -0,0 +1,47 @@
+import random
+import threading
+import time
+import uuid
+
+# UUIDv7 на стороне PostgreSQL для массовых INSERT ... SELECT: в случайный
+# UUIDv4 записываются 48 бит миллисекунд, а версия 4 (0100) превращается
+# в 7 (0111) установкой двух битов.
+UUID7_SQL = (
+    "encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) placing "
+    "substring(int8send((extract(epoch FROM clock_timestamp()) * 1000)"
+    "::bigint) FROM 3) FROM 1 FOR 6), 52, 1), 53, 1), 'hex')::uuid"
+)
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """UUID версии 7 (RFC 9562): миллисекунды Unix-времени, 12-битный
+    счётчик и 62 случайных бита.
+
+    Счётчик делает значения монотонными в пределах процесса, даже если
+    в одну миллисекунду создано много строк или часы сдвинулись назад,
+    поэтому новые ключи всегда попадают в правую страницу индекса.
+    """
+    global _last_ms, _counter
+    with _lock:
+        now = time.time_ns() // 1_000_000
+        if now > _last_ms:
+            _last_ms, _counter = now, 0
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms, _counter = _last_ms + 1, 0
+        milliseconds, counter = _last_ms, _counter
+    # random перезапускает генератор после fork, поэтому у воркеров
+    # разные последовательности.
+    random_bits = random.getrandbits(62)
+    return uuid.UUID(
+        int=milliseconds << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits
+    )
@@ -0,0 +1,284 @@
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from itertools import combinations, groupby
+from typing import Callable, Iterator, Optional
+
+from django.db import connections, transaction
+from django.db.models import Count, Func, TextField, Value
+from django.db.models.functions import Lower, Reverse, Trim
+
+from .api.v1 import cache as api_cache
+from .bulk import touch_film_works
+from .db.replicas import fence_writes
+from .db.utils import table_name
+from .models import Person, PersonFilmwork, PersonRatingStats
+from .rating_stats import refresh_rating_stats
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(name: str) -> str:
+    """Имя без регистра, диакритики и знаков препинания."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", name.lower()).split())
+
+
+def trigrams(name: str) -> frozenset:
+    """Триграммы как у ``pg_trgm``: слово дополняется двумя пробелами
+    слева и одним справа."""
+    result = set()
+    for word in name.split():
+        padded = f"  {word} "
+        result.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return frozenset(result)
+
+
+def similarity(left: frozenset, right: frozenset) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, left, right) -> None:
+        self.parent[self.find(left)] = self.find(right)
+
+    def groups(self) -> list[list]:
+        groups = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+@dataclass
+class DedupStats:
+    persons: int = 0
+    blocks: int = 0
+    comparisons: int = 0
+    oversized_blocks: int = 0
+    clusters: int = 0
+    merged: int = 0
+    links_moved: int = 0
+    links_deleted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def persons_per_second(self) -> float:
+        return self.persons / self.seconds if self.seconds else 0.0
+
+
+def block_key():
+    """Ключ блока — последнее слово имени (обычно фамилия) в нижнем
+    регистре. Считается в SQL, чтобы база отдала персон уже
+    сгруппированными, а в памяти был только текущий блок."""
+    return Func(
+        Lower(Reverse(Trim("full_name"))),
+        Value(" "),
+        Value(1),
+        function="split_part",
+        output_field=TextField(),
+    )
+
+
+def _cluster_block(rows, threshold, max_block_size, stats) -> list[list]:
+    """Кластеры похожих имён внутри блока.
+
+    Полностью совпадающие после нормализации имена объединяются за
+    линейное время. Попарное сравнение триграмм идёт в подблоках по
+    первой букве; подблок больше ``max_block_size`` сравнивается только
+    по точному совпадению, чтобы работа не стала квадратичной.
+    """
+    clusters = UnionFind()
+    exact = {}
+    for person_id, name in rows:
+        if name in exact:
+            clusters.union(person_id, exact[name])
+        else:
+            exact[name] = person_id
+
+    distinct = sorted(exact.items(), key=lambda item: item[0])
+    for _, group in groupby(distinct, key=lambda item: item[0][:1]):
+        group = [
+            (name, person_id, trigrams(name)) for name, person_id in group
+        ]
+        if len(group) > max_block_size:
+            stats.oversized_blocks += 1
+            continue
+        for left, right in combinations(group, 2):
+            stats.comparisons += 1
+            if similarity(left[2], right[2]) >= threshold:
+                clusters.union(left[1], right[1])
+    return clusters.groups()
+
+
+def find_clusters(
+    queryset,
+    threshold: float = 0.6,
+    max_block_size: int = 1000,
+    stats: Optional[DedupStats] = None,
+    chunk_size: int = 5000,
+) -> Iterator[list]:
+    """Отдаёт группы ``id`` персон, которые похожи на дубликаты."""
+    stats = stats if stats is not None else DedupStats()
+    rows = (
+        queryset.annotate(block=block_key())
+        .order_by("block", "pk")
+        .values_list("block", "pk", "full_name")
+        .iterator(chunk_size=chunk_size)
+    )
+    for _, block in groupby(rows, key=lambda row: row[0]):
+        block = [(pk, normalize_name(name)) for _, pk, name in block]
+        stats.persons += len(block)
+        stats.blocks += 1
+        if len(block) > 1:
+            yield from _cluster_block(block, threshold, max_block_size, stats)
+
+
+def merge_persons(mapping: dict, using: str = "default") -> tuple[int, int]:
+    """Переносит связи дубликатов на основную персону и удаляет дубликаты.
+
+    ``mapping`` — ``{id дубликата: id основной персоны}``. Одним запросом:
+    связь переписывается, если у основной персоны ещё нет такой роли в
+    фильме (из нескольких дубликатов берётся самая ранняя), остальные
+    связи дубликатов удаляются, так что ``film_work_person_role_idx`` не
+    нарушается. Возвращает число перенесённых и удалённых связей.
+    """
+    if not mapping:
+        return 0, 0
+    links = table_name(PersonFilmwork, using)
+    persons = table_name(Person, using)
+    stats = table_name(PersonRatingStats, using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "WITH mapping AS (SELECT * FROM "
+            "unnest(%s::uuid[], %s::uuid[]) AS m(old_id, new_id)), "
+            "candidates AS (SELECT DISTINCT ON "
+            "(link.film_work_id, m.new_id, link.role) link.id, m.new_id "
+            f"FROM {links} link JOIN mapping m ON link.person_id = m.old_id "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {links} existing "
+            "WHERE existing.film_work_id = link.film_work_id "
+            "AND existing.person_id = m.new_id "
+            "AND existing.role = link.role) "
+            "ORDER BY link.film_work_id, m.new_id, link.role, link.created), "
+            f"moved AS (UPDATE {links} link SET person_id = c.new_id "
+            "FROM candidates c WHERE link.id = c.id "
+            "RETURNING link.film_work_id), "
+            f"deleted AS (DELETE FROM {links} link USING mapping m "
+            "WHERE link.person_id = m.old_id "
+            "AND link.id NOT IN (SELECT id FROM candidates) "
+            "RETURNING link.film_work_id), "
+            f"removed AS (DELETE FROM {persons} person USING mapping m "
+            "WHERE person.id = m.old_id), "
+            f"removed_stats AS (DELETE FROM {stats} stats USING mapping m "
+            "WHERE stats.person_id = m.old_id) "
+            "SELECT 'moved', film_work_id FROM moved "
+            "UNION ALL SELECT 'deleted', film_work_id FROM deleted",
+            [list(mapping), list(mapping.values())],
+        )
+        rows = cursor.fetchall()
+    film_work_ids = list({film_work_id for _, film_work_id in rows})
+    if film_work_ids:
+        touch_film_works(film_work_ids, using)
+        refresh_rating_stats(person_ids=set(mapping.values()), using=using)
+    moved = sum(1 for kind, _ in rows if kind == "moved")
+    return moved, len(rows) - moved
+
+
+def _canonical(clusters: list[list], using: str) -> dict:
+    """Для каждого кластера выбирает основную персону — с наибольшим
+    числом фильмов, при равенстве самую раннюю — и возвращает
+    ``{id дубликата: id основной}``."""
+    ids = [pk for cluster in clusters for pk in cluster]
+    links = dict(
+        PersonFilmwork.objects.using(using)
+        .filter(person_id__in=ids)
+        .order_by()
+        .values_list("person_id")
+        .annotate(Count("id"))
+    )
+    created = dict(
+        Person.objects.using(using)
+        .filter(pk__in=ids)
+        .values_list("pk", "created")
+    )
+    mapping = {}
+    for cluster in clusters:
+        cluster = [pk for pk in cluster if pk in created]
+        if len(cluster) < 2:
+            continue
+        main = min(
+            cluster, key=lambda pk: (-links.get(pk, 0), created[pk], str(pk))
+        )
+        mapping.update({pk: main for pk in cluster if pk != main})
+    return mapping
+
+
+def dedupe_persons(
+    queryset=None,
+    threshold: float = 0.6,
+    max_block_size: int = 1000,
+    merge: bool = False,
+    batch_size: int = 500,
+    on_clusters: Optional[Callable[[list], None]] = None,
+) -> DedupStats:
+    """Ищет дубликаты среди персон ``queryset`` и, с ``merge``, сливает их.
+
+    Кластеры сливаются пачками по ``batch_size`` в отдельных транзакциях,
+    поэтому память ограничена текущим блоком и пачкой кластеров.
+    """
+    queryset = queryset if queryset is not None else Person.objects.all()
+    using = queryset.db
+    stats = DedupStats()
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        if on_clusters is not None:
+            on_clusters(batch)
+        if merge:
+            with transaction.atomic(using=using):
+                mapping = _canonical(batch, using)
+                moved, deleted = merge_persons(mapping, using)
+            stats.merged += len(mapping)
+            stats.links_moved += moved
+            stats.links_deleted += deleted
+        stats.seconds = time.perf_counter() - started
+        logger.info(
+            "dedupe: %d persons, %d clusters, %d merged, %.0f persons/s",
+            stats.persons,
+            stats.clusters,
+            stats.merged,
+            stats.persons_per_second,
+        )
+        batch.clear()
+
+    for cluster in find_clusters(queryset, threshold, max_block_size, stats):
+        stats.clusters += 1
+        batch.append(cluster)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if merge and stats.merged:
+        fence_writes()
+        api_cache.invalidate_all()
+    stats.seconds = time.perf_counter() - started
+    return stats
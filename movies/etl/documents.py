@@ -0,0 +1,61 @@
+from collections import defaultdict
+from typing import Iterable
+
+from movies.models import Filmwork, GenreFilmwork, PersonFilmwork
+
+ROLES = PersonFilmwork.Role.values
+
+FILMWORK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "creation_date",
+    "rating",
+    "type",
+    "modified",
+)
+
+
+def build_documents(film_work_ids: Iterable) -> list[dict]:
+    """Собирает денормализованные документы для пачки кинопроизведений.
+
+    На пачку уходит ровно три запроса: сами фильмы, их жанры и персоны.
+    """
+    film_work_ids = list(film_work_ids)
+    if not film_work_ids:
+        return []
+
+    genres = defaultdict(list)
+    for film_work_id, name in (
+        GenreFilmwork.objects.filter(film_work_id__in=film_work_ids)
+        .order_by("genre__name")
+        .values_list("film_work_id", "genre__name")
+    ):
+        genres[film_work_id].append(name)
+
+    persons = defaultdict(lambda: defaultdict(list))
+    for film_work_id, role, person_id, full_name in (
+        PersonFilmwork.objects.filter(
+            film_work_id__in=film_work_ids, role__in=ROLES
+        )
+        .order_by("person__full_name")
+        .values_list("film_work_id", "role", "person_id", "person__full_name")
+    ):
+        persons[film_work_id][role].append(
+            {"id": str(person_id), "name": full_name}
+        )
+
+    documents = []
+    for film in (
+        Filmwork.objects.filter(pk__in=film_work_ids)
+        .order_by()
+        .values(*FILMWORK_FIELDS)
+    ):
+        document = {**film, "id": str(film["id"])}
+        document["genres"] = genres[film["id"]]
+        for role in ROLES:
+            people = persons[film["id"]][role]
+            document[f"{role}s"] = people
+            document[f"{role}s_names"] = [person["name"] for person in people]
+        documents.append(document)
+    return documents
@@ -0,0 +1,146 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from django.db import connections
+from django.db.models import Q
+
+from movies.db.utils import table_name
+from movies.models import (
+    Filmwork,
+    Genre,
+    GenreFilmwork,
+    Person,
+    PersonFilmwork,
+)
+from movies.utils import chunked
+
+from .documents import build_documents
+from .state import State
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Producer:
+    """Источник изменений с отметкой ``modified``.
+
+    Для персон и жанров изменения разворачиваются через таблицы связей
+    в идентификаторы затронутых кинопроизведений.
+    """
+
+    name: str
+    model: type
+    link_model: Optional[type] = None
+    link_field: str = ""
+
+    @property
+    def state_key(self) -> str:
+        return f"search_index.{self.name}"
+
+    def changed(
+        self, mark: Optional[dict], batch_size: int
+    ) -> Iterator[tuple[list, dict]]:
+        """Отдаёт пачки изменённых ``id`` вместе с новой отметкой.
+
+        Пагинация по ключу (``modified``, ``id``) опирается на индекс
+        ``*_modified_id_idx`` и не деградирует на глубоких страницах.
+        """
+        queryset = self.model.objects.order_by("modified", "id").values_list(
+            "id", "modified"
+        )
+        while True:
+            page = queryset
+            if mark:
+                modified = datetime.fromisoformat(mark["modified"])
+                after = Q(modified__gt=modified)
+                if mark.get("id"):
+                    after |= Q(modified=modified, id__gt=mark["id"])
+                page = page.filter(after)
+            rows = list(page[:batch_size])
+            if not rows:
+                return
+            last_id, last_modified = rows[-1]
+            mark = {"modified": last_modified.isoformat(), "id": str(last_id)}
+            yield [row[0] for row in rows], mark
+
+    def film_work_ids(self, ids: list, batch_size: int) -> Iterator[list]:
+        if self.link_model is None:
+            yield ids
+            return
+        film_work_ids = (
+            self.link_model.objects.filter(**{f"{self.link_field}__in": ids})
+            .order_by()
+            .values_list("film_work_id", flat=True)
+            .distinct()
+        )
+        yield from chunked(
+            film_work_ids.iterator(chunk_size=batch_size), batch_size
+        )
+
+
+PRODUCERS = (
+    Producer("film_work", Filmwork),
+    Producer("person", Person, PersonFilmwork, "person_id"),
+    Producer("genre", Genre, GenreFilmwork, "genre_id"),
+)
+
+
+def high_water_marks(using: str = "default") -> dict[str, datetime]:
+    """Одним запросом возвращает ``max(modified)`` каждого источника."""
+    columns = ", ".join(
+        f"(SELECT max(modified) FROM {table_name(producer.model, using)})"
+        for producer in PRODUCERS
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"SELECT {columns}")
+        row = cursor.fetchone()
+    return {
+        producer.name: modified
+        for producer, modified in zip(PRODUCERS, row)
+        if modified is not None
+    }
+
+
+def export_changes(
+    sink,
+    state: State,
+    batch_size: int = 500,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Iterator[tuple[str, int]]:
+    """Выгружает в ``sink`` документы, изменившиеся с прошлого запуска.
+
+    Отметка источника сохраняется только после записи пачки, поэтому при
+    падении документы будут выгружены повторно, но не потеряны.
+    ``progress`` получает источник и число его выгруженных документов
+    после каждой пачки.
+    """
+    marks = high_water_marks()
+    if state.get_state(PRODUCERS[0].state_key) is None:
+        # Полная выгрузка и так содержит все фильмы: разворачивать
+        # персоны и жанры не нужно, достаточно запомнить их отметки.
+        for producer in PRODUCERS[1:]:
+            if producer.name in marks:
+                modified = marks[producer.name].isoformat()
+                state.set_state(producer.state_key, {"modified": modified})
+
+    for producer in PRODUCERS:
+        mark = state.get_state(producer.state_key)
+        latest = marks.get(producer.name)
+        if latest is None or (
+            mark and datetime.fromisoformat(mark["modified"]) >= latest
+        ):
+            continue
+
+        exported = 0
+        for ids, mark in producer.changed(mark, batch_size):
+            for film_work_ids in producer.film_work_ids(ids, batch_size):
+                documents = build_documents(film_work_ids)
+                sink.write(documents)
+                exported += len(documents)
+            state.set_state(producer.state_key, mark)
+            logger.debug("%s: %d documents", producer.name, exported)
+            if progress is not None:
+                progress(producer.name, exported)
+        yield producer.name, exported
@@ -0,0 +1,41 @@
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class JsonLinesSink:
+    """Дописывает документы в файл в формате NDJSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def lines(self, document: dict) -> list[dict]:
+        return [document]
+
+    def write(self, documents: list[dict]) -> None:
+        if not documents:
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            for document in documents:
+                for line in self.lines(document):
+                    file.write(
+                        json.dumps(
+                            line, cls=DjangoJSONEncoder, ensure_ascii=False
+                        )
+                    )
+                    file.write("\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class BulkSink(JsonLinesSink):
+    """Пишет тело запроса ``_bulk`` Elasticsearch/OpenSearch."""
+
+    def __init__(self, path: str, index: str):
+        super().__init__(path)
+        self.index = index
+
+    def lines(self, document: dict) -> list[dict]:
+        action = {"index": {"_index": self.index, "_id": document["id"]}}
+        return [action, document]
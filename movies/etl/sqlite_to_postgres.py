@@ -0,0 +1,170 @@
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.db import connections, transaction
+
+from movies.db.utils import column_names, table_name
+from movies.models import (
+    Filmwork,
+    Genre,
+    GenreFilmwork,
+    Person,
+    PersonFilmwork,
+)
+
+from .state import State
+
+logger = logging.getLogger(__name__)
+
+# Колонки источника, которые называются иначе, чем в схеме content.
+SOURCE_COLUMNS = {"created": "created_at", "modified": "updated_at"}
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    model: type
+    source_table: str
+
+    @property
+    def columns(self) -> list[str]:
+        return column_names(self.model)
+
+    @property
+    def source_columns(self) -> list[str]:
+        return [SOURCE_COLUMNS.get(column, column) for column in self.columns]
+
+    @property
+    def state_key(self) -> str:
+        return f"sqlite_to_postgres.{self.source_table}"
+
+
+# Порядок важен: таблицы связей загружаются после тех, на которые ссылаются.
+TABLES = (
+    TableSpec(Genre, "genre"),
+    TableSpec(Person, "person"),
+    TableSpec(Filmwork, "film_work"),
+    TableSpec(GenreFilmwork, "genre_film_work"),
+    TableSpec(PersonFilmwork, "person_film_work"),
+)
+
+
+@dataclass
+class TableStats:
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class SQLiteExtractor:
+    """Читает таблицу источника пачками по ключу ``id``.
+
+    Пагинация по ключу, а не через OFFSET, поэтому каждая пачка стоит
+    одинаково, а продолжить можно с любого сохранённого ``id``.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, chunk_size: int):
+        self.connection = connection
+        self.chunk_size = chunk_size
+
+    def extract(self, spec: TableSpec, after_id: str) -> Iterator[list]:
+        query = (
+            f"SELECT {', '.join(spec.source_columns)} "
+            f"FROM {spec.source_table} WHERE id > ? ORDER BY id LIMIT ?"
+        )
+        id_index = spec.columns.index("id")
+        while True:
+            rows = self.connection.execute(
+                query, (after_id, self.chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1][id_index]
+
+
+class PostgresCopyLoader:
+    """Пишет пачки в PostgreSQL через ``COPY`` во временную таблицу.
+
+    Из временной таблицы строки переносятся с ``ON CONFLICT DO NOTHING``,
+    поэтому повторная загрузка пачки после падения безопасна.
+    """
+
+    def __init__(self, using: str = "default"):
+        self.using = using
+        self.connection = connections[using]
+
+    @staticmethod
+    def _stage_name(spec: TableSpec) -> str:
+        return f"stage_{spec.model._meta.model_name}"
+
+    def prepare(self, spec: TableSpec) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self._stage_name(spec)} "
+                f"(LIKE {table_name(spec.model, self.using)} "
+                "INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+
+    def load(self, spec: TableSpec, rows: list) -> None:
+        stage = self._stage_name(spec)
+        columns = ", ".join(spec.columns)
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                with cursor.copy(
+                    f"COPY {stage} ({columns}) FROM STDIN"
+                ) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                cursor.execute(
+                    f"INSERT INTO {table_name(spec.model, self.using)} "
+                    f"({columns}) SELECT {columns} FROM {stage} "
+                    "ON CONFLICT DO NOTHING"
+                )
+
+
+def load_tables(
+    sqlite_path: str,
+    state: State,
+    chunk_size: int = 5000,
+    tables: tuple[TableSpec, ...] = TABLES,
+    using: str = "default",
+) -> Iterator[TableStats]:
+    """Переносит таблицы и отдаёт статистику по каждой из них.
+
+    Чекпоинт (последний загруженный ``id``) сохраняется после каждой
+    пачки, так что после падения загрузка продолжается с места остановки.
+    """
+    sqlite_connection = sqlite3.connect(sqlite_path)
+    extractor = SQLiteExtractor(sqlite_connection, chunk_size)
+    loader = PostgresCopyLoader(using)
+    try:
+        for spec in tables:
+            loader.prepare(spec)
+            stats = TableStats(spec.source_table)
+            id_index = spec.columns.index("id")
+            started = time.perf_counter()
+            chunks = extractor.extract(
+                spec, state.get_state(spec.state_key, "")
+            )
+            for rows in chunks:
+                loader.load(spec, rows)
+                state.set_state(spec.state_key, rows[-1][id_index])
+                stats.rows += len(rows)
+                stats.seconds = time.perf_counter() - started
+                logger.debug(
+                    "%s: %d rows, %.0f rows/s",
+                    stats.table,
+                    stats.rows,
+                    stats.rows_per_second,
+                )
+            stats.seconds = time.perf_counter() - started
+            yield stats
+    finally:
+        sqlite_connection.close()
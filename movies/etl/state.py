@@ -0,0 +1,48 @@
+import json
+import os
+from typing import Any
+
+
+class JsonFileStorage:
+    """Хранилище состояния в JSON-файле.
+
+    Запись атомарная: файл сначала пишется во временный, затем
+    переименовывается, поэтому падение процесса не портит чекпоинт.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def save_state(self, state: dict[str, Any]) -> None:
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def retrieve_state(self) -> dict[str, Any]:
+        try:
+            with open(self.file_path, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+class State:
+    """Ключ-значение поверх хранилища состояния."""
+
+    def __init__(self, storage: JsonFileStorage):
+        self.storage = storage
+        self._state = storage.retrieve_state()
+
+    def set_state(self, key: str, value: Any) -> None:
+        self._state[key] = value
+        self.storage.save_state(self._state)
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        return self._state.get(key, default)
+
+    def reset(self) -> None:
+        self._state = {}
+        self.storage.save_state(self._state)
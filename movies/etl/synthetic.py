@@ -0,0 +1,284 @@
+import hashlib
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator
+
+from django.db import connections
+
+from movies.db.utils import table_name
+from movies.models import Filmwork, PersonFilmwork
+
+from .sqlite_to_postgres import TABLES, PostgresCopyLoader, TableStats
+
+SPECS = {spec.model._meta.model_name: spec for spec in TABLES}
+
+# Жанры в порядке убывания популярности.
+GENRES = (
+    "Drama",
+    "Comedy",
+    "Action",
+    "Thriller",
+    "Romance",
+    "Crime",
+    "Adventure",
+    "Horror",
+    "Documentary",
+    "Family",
+    "Animation",
+    "Fantasy",
+    "Sci-Fi",
+    "Mystery",
+    "Biography",
+    "History",
+    "Music",
+    "War",
+    "Sport",
+    "Western",
+    "Musical",
+    "Film-Noir",
+)
+
+FIRST_NAMES = (
+    "James John Robert Michael William David Richard Joseph Thomas "
+    "Charles Mary Patricia Jennifer Linda Elizabeth Barbara Susan Jessica "
+    "Sarah Karen Anna Olga Ivan Sergey Elena Pierre Marie Hans Yuki Akira"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez "
+    "Martinez Hernandez Lopez Wilson Anderson Taylor Thomas Moore Jackson "
+    "Martin Lee Ivanov Petrov Sidorova Dubois Muller Tanaka Kurosawa"
+).split()
+TITLE_WORDS = (
+    "star love night war dark last city lost blood king queen secret "
+    "dream shadow river house world fire ice storm road empire heart "
+    "ghost winter summer island moon sun silent golden broken wild"
+).split()
+DESCRIPTION_WORDS = (
+    "a an the young old detective family journey against mysterious "
+    "town must find discover love war friends enemy past future secret "
+    "struggle survive escape truth small big story life death home"
+).split()
+
+ROLE_WEIGHTS = {
+    PersonFilmwork.Role.ACTOR: 80,
+    PersonFilmwork.Role.WRITER: 12,
+    PersonFilmwork.Role.DIRECTOR: 8,
+}
+TYPE_WEIGHTS = {
+    Filmwork.Filmtype.MOVIE: 85,
+    Filmwork.Filmtype.TV_SHOW: 15,
+}
+
+
+def _skewed_index(rng: random.Random, size: int, skew: float) -> int:
+    """Индекс от 0 до ``size``; малые индексы выпадают чаще.
+
+    При ``skew`` = 1 распределение равномерное, чем больше ``skew``, тем
+    сильнее перекос к началу, как у популярности актёров и жанров.
+    """
+    return int(size * rng.random() ** skew)
+
+
+@dataclass
+class SyntheticDataGenerator:
+    """Детерминированный генератор данных схемы content.
+
+    Одинаковые ``seed`` и размеры дают одинаковые строки, включая ``id``,
+    поэтому повторный запуск не создаёт дублей: загрузка идёт с
+    ``ON CONFLICT DO NOTHING``.
+    """
+
+    seed: int = 42
+    film_works: int = 1_000_000
+    persons: int = 3_000_000
+    persons_per_film_work: int = 10
+    genres_per_film_work: int = 2
+    # Перекос популярности персон и жанров, см. _skewed_index.
+    person_skew: float = 1.5
+    genre_skew: float = 2.0
+
+    def __post_init__(self):
+        self.now = datetime.now(timezone.utc)
+
+    def make_id(self, kind: str, key) -> uuid.UUID:
+        digest = hashlib.md5(f"{self.seed}:{kind}:{key}".encode()).digest()
+        return uuid.UUID(bytes=digest, version=4)
+
+    def _timestamps(self, rng: random.Random) -> tuple[datetime, datetime]:
+        created = self.now - timedelta(seconds=rng.randrange(3 * 365 * 86400))
+        modified = created
+        if rng.random() < 0.3:
+            age = int((self.now - created).total_seconds())
+            modified += timedelta(seconds=rng.randrange(age + 1))
+        return created, modified
+
+    def genre_rows(self) -> list[dict]:
+        rng = random.Random(f"{self.seed}:genre")
+        rows = []
+        for index, name in enumerate(GENRES):
+            created, modified = self._timestamps(rng)
+            rows.append(
+                {
+                    "id": self.make_id("genre", index),
+                    "name": name,
+                    "description": None,
+                    "created": created,
+                    "modified": modified,
+                }
+            )
+        return rows
+
+    def person_rows(self, chunk_size: int) -> Iterator[list[dict]]:
+        rng = random.Random(f"{self.seed}:person")
+        for start in range(0, self.persons, chunk_size):
+            rows = []
+            for index in range(start, min(start + chunk_size, self.persons)):
+                created, modified = self._timestamps(rng)
+                rows.append(
+                    {
+                        "id": self.make_id("person", index),
+                        "full_name": (
+                            f"{rng.choice(FIRST_NAMES)} "
+                            f"{rng.choice(LAST_NAMES)}"
+                        ),
+                        "created": created,
+                        "modified": modified,
+                    }
+                )
+            yield rows
+
+    def film_work_rows(
+        self, chunk_size: int
+    ) -> Iterator[tuple[list[dict], list[dict], list[dict]]]:
+        """Пачки фильмов вместе с их связями с жанрами и персонами."""
+        rng = random.Random(f"{self.seed}:film_work")
+        types = list(TYPE_WEIGHTS)
+        type_weights = list(TYPE_WEIGHTS.values())
+        roles = list(ROLE_WEIGHTS)
+        role_weights = list(ROLE_WEIGHTS.values())
+        genre_count = len(GENRES)
+        for start in range(0, self.film_works, chunk_size):
+            film_works, genre_links, person_links = [], [], []
+            for index in range(
+                start, min(start + chunk_size, self.film_works)
+            ):
+                film_work_id = self.make_id("film_work", index)
+                created, modified = self._timestamps(rng)
+                year = 2024 - _skewed_index(rng, 105, 2.0)
+                rating = min(10.0, max(0.0, rng.gauss(6.5, 1.5)))
+                film_works.append(
+                    {
+                        "id": film_work_id,
+                        "title": " ".join(
+                            rng.choices(TITLE_WORDS, k=rng.randint(1, 4))
+                        ).title(),
+                        "description": " ".join(
+                            rng.choices(DESCRIPTION_WORDS, k=20)
+                        ).capitalize(),
+                        "creation_date": (
+                            date(year, rng.randint(1, 12), rng.randint(1, 28))
+                            if rng.random() < 0.95
+                            else None
+                        ),
+                        "file_path": None,
+                        "rating": (
+                            round(rating, 1) if rng.random() < 0.9 else None
+                        ),
+                        "type": rng.choices(types, type_weights)[0],
+                        "created": created,
+                        "modified": modified,
+                    }
+                )
+
+                genres = {
+                    _skewed_index(rng, genre_count, self.genre_skew)
+                    for _ in range(rng.randint(1, self.genres_per_film_work))
+                }
+                for genre in genres:
+                    genre_links.append(
+                        {
+                            "id": self.make_id(
+                                "genre_film_work", f"{index}:{genre}"
+                            ),
+                            "film_work_id": film_work_id,
+                            "genre_id": self.make_id("genre", genre),
+                            "created": created,
+                        }
+                    )
+
+                links = set()
+                for _ in range(
+                    max(
+                        1,
+                        round(rng.expovariate(1 / self.persons_per_film_work)),
+                    )
+                ):
+                    person = _skewed_index(rng, self.persons, self.person_skew)
+                    role = rng.choices(roles, role_weights)[0]
+                    links.add((person, role))
+                for person, role in links:
+                    person_links.append(
+                        {
+                            "id": self.make_id(
+                                "person_film_work", f"{index}:{person}:{role}"
+                            ),
+                            "film_work_id": film_work_id,
+                            "person_id": self.make_id("person", person),
+                            "role": role,
+                            "created": created,
+                        }
+                    )
+            yield film_works, genre_links, person_links
+
+
+def generate(
+    generator: SyntheticDataGenerator,
+    chunk_size: int = 10_000,
+    using: str = "default",
+) -> Iterator[TableStats]:
+    """Загружает сгенерированные строки через ``COPY``.
+
+    Загрузка идёт мимо ORM и сигналов, поэтому после неё нужно
+    пересобрать карточки командой ``refresh_film_cards``. В конце
+    выполняется ``ANALYZE``, чтобы оценки числа строк были актуальны.
+    """
+    loader = PostgresCopyLoader(using)
+    stats = {
+        name: TableStats(spec.source_table) for name, spec in SPECS.items()
+    }
+
+    def load(name, rows):
+        spec = SPECS[name]
+        started = time.perf_counter()
+        loader.load(
+            spec, [[row[column] for column in spec.columns] for row in rows]
+        )
+        stats[name].rows += len(rows)
+        stats[name].seconds += time.perf_counter() - started
+
+    for spec in SPECS.values():
+        loader.prepare(spec)
+
+    load("genre", generator.genre_rows())
+    yield stats["genre"]
+
+    for rows in generator.person_rows(chunk_size):
+        load("person", rows)
+    yield stats["person"]
+
+    for film_works, genre_links, person_links in generator.film_work_rows(
+        chunk_size
+    ):
+        load("filmwork", film_works)
+        load("genrefilmwork", genre_links)
+        load("personfilmwork", person_links)
+    yield stats["filmwork"]
+    yield stats["genrefilmwork"]
+    yield stats["personfilmwork"]
+
+    with connections[using].cursor() as cursor:
+        for spec in SPECS.values():
+            cursor.execute(f"ANALYZE {table_name(spec.model, using)}")
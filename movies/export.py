@@ -0,0 +1,68 @@
+import csv
+import json
+from typing import Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .etl.documents import FILMWORK_FIELDS, ROLES, build_documents
+from .utils import chunked
+
+CSV_COLUMNS = (
+    *FILMWORK_FIELDS,
+    "genres",
+    *(f"{role}s_names" for role in ROLES),
+)
+CSV_LIST_SEPARATOR = "; "
+
+
+def iter_documents(queryset, chunk_size: int = 2000) -> Iterator[dict]:
+    """Документы фильмов из ``queryset`` в его порядке.
+
+    ``id`` читаются серверным курсором, поэтому в памяти только текущая
+    пачка; на пачку ``build_documents`` делает три запроса.
+    """
+    ids = queryset.values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+    for chunk in chunked(ids, chunk_size):
+        documents = {
+            document["id"]: document for document in build_documents(chunk)
+        }
+        for pk in chunk:
+            document = documents.get(str(pk))
+            # Фильм мог быть удалён, пока шла выгрузка.
+            if document is not None:
+                yield document
+
+
+class _Echo:
+    """Буфер для ``csv.writer``, который сразу возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(documents) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for document in documents:
+        yield writer.writerow(
+            [
+                (
+                    CSV_LIST_SEPARATOR.join(value)
+                    if isinstance(value, list)
+                    else value
+                )
+                for value in map(document.get, CSV_COLUMNS)
+            ]
+        )
+
+
+def jsonl_lines(documents) -> Iterator[str]:
+    for document in documents:
+        yield json.dumps(document, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", csv_lines),
+    "jsonl": ("application/x-ndjson; charset=utf-8", jsonl_lines),
+}
@@ -0,0 +1,127 @@
+from typing import Optional
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.utils.translation import gettext_lazy as _
+
+from .models import Filmwork
+from .reference import FILTER_COUNTS
+
+NO_DATE = "none"
+
+
+def filter_counts() -> list[tuple[str, Optional[int], int]]:
+    """Число фильмов по парам (тип, год выпуска).
+
+    Одна группировка, которую индекс ``film_work_type_creation_idx``
+    отдаёт сканированием только индекса, кешируется и обслуживает оба
+    фильтра в любых сочетаниях.
+    """
+    return FILTER_COUNTS.get()
+
+
+def year_range(value: str) -> Optional[tuple[int, int]]:
+    """``"2010s"`` -> (2010, 2020), ``"2014"`` -> (2014, 2015),
+    ``"none"`` -> None."""
+    if value == NO_DATE:
+        return None
+    try:
+        if value.endswith("s"):
+            start, end = int(value[:-1]), int(value[:-1]) + 10
+        else:
+            start, end = int(value), int(value) + 1
+    except ValueError:
+        raise IncorrectLookupParameters(value)
+    if value.endswith("s") and start % 10 or not 1 <= start < end <= 9999:
+        raise IncorrectLookupParameters(value)
+    return start, end
+
+
+def year_matches(year: Optional[int], value: Optional[str]) -> bool:
+    if not value:
+        return True
+    bounds = year_range(value)
+    if bounds is None:
+        return year is None
+    return year is not None and bounds[0] <= year < bounds[1]
+
+
+class TypeListFilter(admin.SimpleListFilter):
+    """Фильтр по типу с числом фильмов, учитывающим фильтр по дате."""
+
+    title = _("type")
+    parameter_name = "type"
+
+    def lookups(self, request, model_admin):
+        selected = request.GET.get(CreationDateListFilter.parameter_name)
+        totals = dict.fromkeys(Filmwork.Filmtype.values, 0)
+        for type_, year, count in filter_counts():
+            if type_ in totals and year_matches(year, selected):
+                totals[type_] += count
+        return [
+            (value, f"{label} ({totals[value]})")
+            for value, label in Filmwork.Filmtype.choices
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(type=self.value())
+        return queryset
+
+
+class CreationDateListFilter(admin.SimpleListFilter):
+    """Фильтр по десятилетиям выпуска; внутри выбранного — по годам.
+
+    Условие — диапазон ``creation_date``, поэтому используется индекс
+    ``film_work_creation_date_idx``, а вместе с типом — составной
+    ``film_work_type_creation_idx``.
+    """
+
+    title = _("creation_date")
+    parameter_name = "creation_date"
+
+    def lookups(self, request, model_admin):
+        selected_type = request.GET.get(TypeListFilter.parameter_name)
+        years, no_date = {}, 0
+        for type_, year, count in filter_counts():
+            if selected_type and type_ != selected_type:
+                continue
+            if year is None:
+                no_date += count
+            else:
+                years[year] = years.get(year, 0) + count
+
+        decades = {}
+        for year, count in years.items():
+            decade = year - year % 10
+            decades[decade] = decades.get(decade, 0) + count
+
+        selected = self.value()
+        selected_decade = None
+        if selected and selected != NO_DATE:
+            selected_decade = year_range(selected)[0] // 10 * 10
+
+        choices = []
+        for decade in sorted(decades, reverse=True):
+            label = _("decade_label") % {"decade": decade}
+            choices.append((f"{decade}s", f"{label} ({decades[decade]})"))
+            if decade != selected_decade:
+                continue
+            for year in sorted(years, reverse=True):
+                if decade <= year < decade + 10:
+                    choices.append((str(year), f"— {year} ({years[year]})"))
+        if no_date:
+            choices.append((NO_DATE, f"{_('no_creation_date')} ({no_date})"))
+        return choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        bounds = year_range(self.value())
+        if bounds is None:
+            return queryset.filter(creation_date__isnull=True)
+        start, end = bounds
+        return queryset.filter(
+            creation_date__gte=f"{start:04}-01-01",
+            creation_date__lt=f"{end:04}-01-01",
+        )
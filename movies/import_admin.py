@@ -0,0 +1,104 @@
+from django import forms
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.translation import gettext_lazy as _
+
+from .importer import (
+    FILMWORK_COLUMNS,
+    FORMATS,
+    LIST_COLUMNS,
+    import_film_works,
+)
+from .task_admin import message_task_queued, task_url
+from .taskqueue import enqueue, task_files
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField(label=_("import_file"))
+    dry_run = forms.BooleanField(
+        required=False, initial=True, label=_("dry_run")
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        fmt = file.name.rsplit(".", 1)[-1].lower()
+        if fmt == "ndjson":
+            fmt = "jsonl"
+        if fmt not in FORMATS:
+            raise ValidationError(_("import_unsupported_format"))
+        self.cleaned_data["format"] = fmt
+        return file
+
+
+class ImportMixin:
+    """Страница загрузки фильмов из CSV или JSONL в формате выгрузки.
+
+    Вместо отдельной формы на каждый фильм файл проверяется по колонкам
+    и записывается пачками по ``import_batch_size`` строк.
+    """
+
+    import_batch_size = 500
+    import_max_errors = 100
+    import_task_threshold = 1024 * 1024
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not (
+            self.has_add_permission(request)
+            and self.has_change_permission(request)
+        ):
+            raise PermissionDenied
+        report = None
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            if form.cleaned_data["file"].size > self.import_task_threshold:
+                return self.enqueue_import(request, form.cleaned_data)
+            report = import_film_works(
+                form.cleaned_data["file"],
+                form.cleaned_data["format"],
+                dry_run=form.cleaned_data["dry_run"],
+                batch_size=self.import_batch_size,
+            )
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("import_film_works"),
+            "opts": self.model._meta,
+            "form": form,
+            "report": report,
+            "errors": (
+                report.errors[: self.import_max_errors] if report else []
+            ),
+            "columns": ("id", *FILMWORK_COLUMNS, *LIST_COLUMNS),
+        }
+        return TemplateResponse(
+            request, "admin/movies/filmwork/import.html", context
+        )
+
+    def enqueue_import(self, request, data):
+        """Файл больше ``import_task_threshold`` загружает фоновая задача:
+        он сохраняется в ``task_files``, а страница ведёт на ход задачи."""
+        file = data["file"]
+        name = task_files.save(f"imports/{file.name}", file)
+        task = enqueue(
+            "import_film_works",
+            created_by=request.user.get_username(),
+            file=name,
+            fmt=data["format"],
+            dry_run=data["dry_run"],
+            batch_size=self.import_batch_size,
+            max_errors=self.import_max_errors,
+        )
+        message_task_queued(self, request, task)
+        return HttpResponseRedirect(task_url(task))
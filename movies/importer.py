@@ -0,0 +1,332 @@
+import csv
+import io
+import json
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils.translation import gettext_lazy as _
+
+from .api.v1 import cache as api_cache
+from .cards import refresh_cards
+from .db.replicas import fence_writes
+from .db.utils import table_name
+from .db.uuid7 import UUID7_SQL
+from .etl.documents import ROLES
+from .export import CSV_LIST_SEPARATOR
+from .models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
+from .reference import invalidate_filter_counts
+from .rating_stats import collect_rating_stats, refresh_rating_stats
+from .utils import chunked
+
+# Колонки фильма, которые можно загрузить; совпадают с выгрузкой, кроме
+# ``modified``, который проставляется при записи.
+FILMWORK_COLUMNS = ("title", "description", "creation_date", "rating", "type")
+# Колонки, которые в JSONL могут быть числом, а не строкой.
+NUMBER_COLUMNS = ("rating",)
+LIST_COLUMNS = ("genres", *(f"{role}s_names" for role in ROLES))
+# Поля, в которые записываются имена из списков.
+LIST_FIELDS = {
+    "genres": Genre._meta.get_field("name"),
+    **{
+        f"{role}s_names": Person._meta.get_field("full_name") for role in ROLES
+    },
+}
+
+FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class RowError:
+    line: int
+    column: str
+    message: str
+
+
+@dataclass
+class BatchReport:
+    number: int
+    rows: int = 0
+    invalid: int = 0
+    film_works: int = 0
+    genres: int = 0
+    persons: int = 0
+    links: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool = False
+    batches: list[BatchReport] = field(default_factory=list)
+    errors: list[RowError] = field(default_factory=list)
+
+    def total(self, name: str) -> int:
+        return sum(getattr(batch, name) for batch in self.batches)
+
+    @property
+    def seconds(self) -> float:
+        return sum(batch.seconds for batch in self.batches)
+
+
+def read_rows(file, fmt: str) -> Iterator[tuple[int, dict]]:
+    """Строки файла с номерами строк; списки в CSV разделены ``; ``."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from _parse_rows(text, fmt)
+    finally:
+        # Иначе обёртка при сборке мусора закрыла бы файл вызывающего.
+        text.detach()
+
+
+def _parse_rows(text, fmt: str) -> Iterator[tuple[int, dict]]:
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            for column in LIST_COLUMNS:
+                value = row.get(column) or ""
+                row[column] = [
+                    name.strip()
+                    for name in value.split(CSV_LIST_SEPARATOR.strip())
+                    if name.strip()
+                ]
+            yield reader.line_num, row
+        return
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as error:
+            row = {"__error__": str(error)}
+        if not isinstance(row, dict):
+            row = {"__error__": str(_("import_not_an_object"))}
+        yield line, row
+
+
+def validate(rows: list[tuple[int, dict]]) -> tuple[list, list[RowError]]:
+    """Проверяет пачку по колонкам полями ``Filmwork``.
+
+    Каждая колонка проверяется целиком одним полем (``to_python``,
+    ``choices``, валидаторы рейтинга, длина имён жанров), строки с
+    ошибками отбрасываются.
+    """
+    errors = []
+    for line, row in rows:
+        if "__error__" in row:
+            errors.append(RowError(line, "", row["__error__"]))
+    rows = [(line, row) for line, row in rows if "__error__" not in row]
+    invalid = set()
+
+    cleaned = [{} for _ in rows]
+    for name in ("id", *FILMWORK_COLUMNS):
+        model_field = Filmwork._meta.get_field(name)
+        for index, (line, row) in enumerate(rows):
+            value = row.get(name)
+            if value in (None, ""):
+                if name == "id":
+                    value = model_field.get_default()
+                elif not model_field.blank:
+                    errors.append(
+                        RowError(
+                            line,
+                            name,
+                            str(model_field.error_messages["blank"]),
+                        )
+                    )
+                    invalid.add(index)
+                    continue
+                else:
+                    value = None
+            elif not (
+                isinstance(value, str)
+                or name in NUMBER_COLUMNS
+                and isinstance(value, (int, float))
+                and not isinstance(value, bool)
+            ):
+                # Иначе, например, число из JSON стало бы датой или ``id``.
+                errors.append(
+                    RowError(line, name, str(_("import_not_a_string")))
+                )
+                invalid.add(index)
+                continue
+            else:
+                try:
+                    value = model_field.clean(value, None)
+                except ValidationError as error:
+                    errors.append(
+                        RowError(line, name, "; ".join(error.messages))
+                    )
+                    invalid.add(index)
+                    continue
+            cleaned[index][name] = value
+
+    for column in LIST_COLUMNS:
+        name_field = LIST_FIELDS[column]
+        for index, (line, row) in enumerate(rows):
+            names = row.get(column) or []
+            if not isinstance(names, list) or not all(
+                isinstance(name, str) for name in names
+            ):
+                errors.append(
+                    RowError(line, column, str(_("import_not_a_list")))
+                )
+                invalid.add(index)
+                continue
+            try:
+                for name in names:
+                    name_field.run_validators(name)
+            except ValidationError as error:
+                errors.append(
+                    RowError(line, column, "; ".join(error.messages))
+                )
+                invalid.add(index)
+                continue
+            cleaned[index][column] = list(dict.fromkeys(names))
+
+    # Повтор ``id`` в одном INSERT ... ON CONFLICT недопустим, поэтому
+    # из повторов остаётся последняя строка.
+    valid = {}
+    for index, row in enumerate(cleaned):
+        if index not in invalid:
+            valid.pop(row["id"], None)
+            valid[row["id"]] = row
+    errors.sort(key=lambda error: error.line)
+    return list(valid.values()), errors
+
+
+def _resolve(model, name_field: str, names: set) -> tuple[dict, int]:
+    """``{имя: id}`` одним запросом; недостающие записи создаются.
+
+    Имена не уникальны, поэтому из совпадающих берётся самая ранняя.
+    """
+    ids = {}
+    for name, pk in (
+        model.objects.filter(**{f"{name_field}__in": names})
+        .order_by(name_field, "created")
+        .values_list(name_field, "pk")
+    ):
+        ids.setdefault(name, pk)
+    missing = [model(**{name_field: name}) for name in names - ids.keys()]
+    model.objects.bulk_create(missing)
+    ids.update((getattr(obj, name_field), obj.pk) for obj in missing)
+    return ids, len(missing)
+
+
+def _insert_links(model, columns: dict[str, str], links: list) -> int:
+    """Добавляет связи одним ``INSERT ... SELECT FROM unnest``.
+
+    У связей нечего обновлять, поэтому уже существующие пропускаются
+    ``ON CONFLICT DO NOTHING``. Возвращает число добавленных.
+    """
+    if not links:
+        return 0
+    names = ", ".join(columns)
+    arrays = ", ".join(f"%s::{type_}[]" for type_ in columns.values())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table_name(model)} (id, {names}, created) "
+            f"SELECT {UUID7_SQL}, {names}, now() "
+            f"FROM unnest({arrays}) AS link({names}) "
+            f"ON CONFLICT ({names}) DO NOTHING",
+            [list(values) for values in zip(*links)],
+        )
+        return cursor.rowcount
+
+
+def write_batch(rows: list[dict], report: BatchReport) -> None:
+    """Записывает проверенную пачку: фильмы — upsert по ``id``, жанры и
+    персоны — по имени, связи добавляются к уже существующим."""
+    # Год выхода может измениться: сводки прежних годов тоже пересчитываются.
+    previous_years = set(
+        Filmwork.objects.filter(
+            pk__in=[row["id"] for row in rows], creation_date__isnull=False
+        ).values_list("creation_date__year", flat=True)
+    )
+    film_works = [
+        Filmwork(**{name: row[name] for name in ("id", *FILMWORK_COLUMNS)})
+        for row in rows
+    ]
+    Filmwork.objects.bulk_create(
+        film_works,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[*FILMWORK_COLUMNS, "modified"],
+    )
+    report.film_works += len(film_works)
+
+    genres, report.genres = _resolve(
+        Genre, "name", {name for row in rows for name in row["genres"]}
+    )
+    persons, report.persons = _resolve(
+        Person,
+        "full_name",
+        {
+            name
+            for row in rows
+            for role in ROLES
+            for name in row[f"{role}s_names"]
+        },
+    )
+
+    report.links += _insert_links(
+        GenreFilmwork,
+        {"film_work_id": "uuid", "genre_id": "uuid"},
+        [(row["id"], genres[name]) for row in rows for name in row["genres"]],
+    )
+    report.links += _insert_links(
+        PersonFilmwork,
+        {"film_work_id": "uuid", "person_id": "uuid", "role": "text"},
+        [
+            (row["id"], persons[name], role)
+            for row in rows
+            for role in ROLES
+            for name in row[f"{role}s_names"]
+        ],
+    )
+    refresh_cards([row["id"] for row in rows])
+    refresh_rating_stats([row["id"] for row in rows], years=previous_years)
+
+
+def import_film_works(
+    file,
+    fmt: str,
+    dry_run: bool = False,
+    batch_size: int = 500,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """Загружает фильмы с жанрами и персонами пачками по ``batch_size``.
+
+    Каждая пачка пишется в своей транзакции; с ``dry_run`` запись
+    выполняется и откатывается, так что отчёт совпадает с настоящей
+    загрузкой. Сигналы не срабатывают, поэтому сводки рейтингов
+    пересчитываются, а кеш API и счётчики фильтров сбрасываются в конце.
+    """
+    report = ImportReport(dry_run=dry_run)
+    # С dry_run сводки пересчитываются в каждой откатываемой пачке, иначе —
+    # один раз в конце.
+    with nullcontext() if dry_run else collect_rating_stats():
+        for number, batch in enumerate(
+            chunked(read_rows(file, fmt), batch_size), start=1
+        ):
+            started = time.perf_counter()
+            batch_report = BatchReport(number=number, rows=len(batch))
+            rows, errors = validate(batch)
+            batch_report.invalid = len({error.line for error in errors})
+            report.errors.extend(errors)
+            if rows:
+                with transaction.atomic():
+                    write_batch(rows, batch_report)
+                    transaction.set_rollback(dry_run)
+            batch_report.seconds = time.perf_counter() - started
+            report.batches.append(batch_report)
+            if progress is not None:
+                progress(report)
+    if not dry_run and report.total("film_works"):
+        fence_writes()
+        api_cache.invalidate_all()
+        invalidate_filter_counts()
+    return report
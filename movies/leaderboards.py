@@ -0,0 +1,78 @@
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.translation import gettext as _
+
+from .models import GenreRatingStats
+from .rating_stats import SUMMARIES
+
+LEADERBOARD_ORDERS = ("rating_avg", "film_works")
+
+
+def leaderboard(
+    model, by: str = "rating_avg", min_film_works: int = 1, limit: int = 10
+):
+    """Первые ``limit`` групп по убыванию ``by`` среди групп, где не
+    меньше ``min_film_works`` фильмов с рейтингом."""
+    queryset = model.objects.filter(film_works__gte=min_film_works)
+    if model._meta.pk.is_relation:
+        queryset = queryset.select_related(model._meta.pk.name)
+    return queryset.order_by(f"-{by}", "pk")[:limit]
+
+
+class LeaderboardsMixin:
+    """Лучшие жанры, персоны и годы по сводкам рейтингов: несколько
+    запросов ``LIMIT`` без агрегации по фильмам."""
+
+    leaderboard_size = 10
+    leaderboard_min_film_works = 3
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "leaderboards/",
+                self.admin_site.admin_view(self.leaderboards_view),
+                name=f"{opts.app_label}_{opts.model_name}_leaderboards",
+            ),
+            *super().get_urls(),
+        ]
+
+    def leaderboards_view(self, request):
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        by = request.GET.get("by")
+        if by not in LEADERBOARD_ORDERS:
+            by = LEADERBOARD_ORDERS[0]
+        try:
+            min_film_works = max(int(request.GET["min"]), 1)
+        except (KeyError, ValueError):
+            min_film_works = self.leaderboard_min_film_works
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("leaderboards"),
+            "opts": self.model._meta,
+            "boards": [
+                {
+                    "title": model._meta.verbose_name_plural,
+                    "url_name": (
+                        f"admin:movies_{model._meta.pk.name}_change"
+                        if model._meta.pk.is_relation
+                        else None
+                    ),
+                    "rows": leaderboard(
+                        model, by, min_film_works, self.leaderboard_size
+                    ),
+                }
+                for model in SUMMARIES
+            ],
+            "orders": [
+                (name, GenreRatingStats._meta.get_field(name).verbose_name)
+                for name in LEADERBOARD_ORDERS
+            ],
+            "by": by,
+            "min_film_works": min_film_works,
+        }
+        return TemplateResponse(
+            request, "admin/movies/filmwork/leaderboards.html", context
+        )
@@ -0,0 +1,192 @@
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from movies.db.utils import table_name
+from movies.metrics.benchmark import (
+    ADMIN_SCENARIOS,
+    compare,
+    default_host,
+    run_scenario,
+)
+from movies.models import Filmwork, GenreFilmwork, Person, PersonFilmwork
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет страницы FilmworkAdmin (список, поиск, фильтры, форма "
+        "изменения): время ответа и число SQL-запросов. Результат в JSON "
+        "можно сравнить с замером на другом коммите."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Имя пользователя, по умолчанию первый суперпользователь.",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=[scenario.name for scenario in ADMIN_SCENARIOS],
+            help="Запустить только указанные сценарии.",
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--search", default="star", help="Строка поиска.")
+        parser.add_argument(
+            "--year", type=int, default=2010, help="Год для фильтра по дате."
+        )
+        parser.add_argument(
+            "--film-work-id",
+            help="Фильм для формы изменения, по умолчанию последний "
+            "изменённый.",
+        )
+        parser.add_argument(
+            "--host",
+            help=(
+                "Заголовок Host, по умолчанию первый из ALLOWED_HOSTS "
+                "или localhost."
+            ),
+        )
+        parser.add_argument("--output", help="Записать отчёт в JSON-файл.")
+        parser.add_argument(
+            "--compare", help="JSON-отчёт прошлого замера для сравнения."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Вывести отчёт в JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] <= 0:
+            raise CommandError("--repeat must be positive.")
+        if options["warmup"] < 0:
+            raise CommandError("--warmup must not be negative.")
+
+        client = Client(HTTP_HOST=options["host"] or default_host())
+        client.force_login(self.get_user(options["user"]))
+
+        film_work_id = options["film_work_id"] or (
+            Filmwork.objects.order_by("-modified", "-id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if film_work_id is None:
+            raise CommandError("No film works. Run generate_movies first.")
+        params = {
+            "film_work_id": film_work_id,
+            "search": options["search"],
+            "year": options["year"],
+            "decade": options["year"] // 10 * 10,
+        }
+
+        report = {
+            "commit": self.git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "rows": self.estimated_rows(),
+            "repeat": options["repeat"],
+            "scenarios": {},
+        }
+        for scenario in ADMIN_SCENARIOS:
+            if options["scenarios"] and (
+                scenario.name not in options["scenarios"]
+            ):
+                continue
+            report["scenarios"][scenario.name] = run_scenario(
+                client,
+                scenario,
+                params,
+                options["repeat"],
+                options["warmup"],
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_table(report)
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                self.write_comparison(compare(json.load(file), report))
+
+    def get_user(self, username):
+        user_model = get_user_model()
+        users = user_model._default_manager.filter(is_active=True)
+        if username:
+            users = users.filter(**{user_model.USERNAME_FIELD: username})
+        else:
+            users = users.filter(is_superuser=True)
+        user = users.order_by("pk").first()
+        if user is None:
+            raise CommandError("User not found.")
+        return user
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                check=True,
+                text=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def estimated_rows():
+        models = (Filmwork, Person, GenreFilmwork, PersonFilmwork)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT "
+                + ", ".join(
+                    "(SELECT reltuples::bigint FROM pg_class "
+                    f"WHERE oid = '{table_name(model)}'::regclass)"
+                    for model in models
+                )
+            )
+            row = cursor.fetchone()
+        return {
+            model._meta.model_name: count for model, count in zip(models, row)
+        }
+
+    def write_table(self, report):
+        self.stdout.write(f"commit {report['commit']}, rows {report['rows']}")
+        header = (
+            f"{'scenario':<22} {'status':>7} {'queries':>8} {'median ms':>10} "
+            f"{'p95 ms':>9} {'db ms':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, result in report["scenarios"].items():
+            self.stdout.write(
+                f"{name:<22} {','.join(map(str, result['statuses'])):>7} "
+                f"{result['queries']:>8} {result['median_ms']:>10} "
+                f"{result['p95_ms']:>9} {result['db_median_ms']:>8}"
+            )
+
+    def write_comparison(self, rows):
+        self.stdout.write("")
+        for row in rows:
+            before, after = row["median_ms"]
+            queries_before, queries_after = row["queries"]
+            line = (
+                f"{row['scenario']:<22} {before:>9} -> {after:<9} ms "
+                f"x{row['ratio']}  queries {queries_before} -> {queries_after}"
+            )
+            if (
+                row["ratio"]
+                and row["ratio"] > 1.2
+                or (queries_after > queries_before)
+            ):
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,158 @@
+import json
+import time
+import timeit
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from movies.db.utils import table_name
+from movies.db.uuid7 import uuid7
+from movies.models import PersonFilmwork
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+COLUMNS = ("id", "film_work_id", "person_id", "role", "created")
+PERSONS_PER_FILM_WORK = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает UUIDv4 и UUIDv7 как первичный ключ person_film_work: "
+        "скорость вставки, размер индексов и корреляцию id с порядком "
+        "вставки. Строки пишутся во временные копии таблицы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--database", default="default", help="Алиас базы."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Вывести отчёт в JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0 or options["batch_size"] <= 0:
+            raise CommandError("--rows and --batch-size must be positive.")
+        connection = connections[options["database"]]
+        # Одинаковые для обоих вариантов ссылки, уникальные по
+        # (film_work_id, person_id, role).
+        film_works = [
+            uuid.uuid4()
+            for _ in range(options["rows"] // PERSONS_PER_FILM_WORK + 1)
+        ]
+        persons = [uuid.uuid4() for _ in range(PERSONS_PER_FILM_WORK * 100)]
+        report = {}
+        for name, generator in GENERATORS.items():
+            report[name] = {
+                "generate_us": round(
+                    timeit.timeit(generator, number=100_000) * 10, 3
+                ),
+                **self.measure(
+                    connection,
+                    f"benchmark_uuid_{name}",
+                    generator,
+                    film_works,
+                    persons,
+                    options,
+                ),
+            }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        header = (
+            f"{'':<4} {'gen us':>7} {'rows/s':>9} {'pkey MB':>8} "
+            f"{'other MB':>9} {'table MB':>9} {'leaf density':>13} "
+            f"{'correlation':>12}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, result in report.items():
+            density = result["leaf_density"]
+            self.stdout.write(
+                f"{name:<4} {result['generate_us']:>7} "
+                f"{result['rows_per_second']:>9} {result['pkey_mb']:>8} "
+                f"{result['other_indexes_mb']:>9} {result['table_mb']:>9} "
+                f"{'-' if density is None else density:>13} "
+                f"{result['correlation']:>12}"
+            )
+
+    @staticmethod
+    def measure(connection, table, generator, film_works, persons, options):
+        """Заполняет временную копию ``person_film_work`` с индексами и
+        возвращает скорость вставки и размеры."""
+        source = table_name(PersonFilmwork, connection.alias)
+        columns = ", ".join(COLUMNS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(
+                f"CREATE TEMP TABLE {table} (LIKE {source} "
+                "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES)"
+            )
+        now = timezone.now()
+        started = time.perf_counter()
+        for offset in range(0, options["rows"], options["batch_size"]):
+            end = min(offset + options["batch_size"], options["rows"])
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    with cursor.copy(
+                        f"COPY {table} ({columns}) FROM STDIN"
+                    ) as copy:
+                        for index in range(offset, end):
+                            copy.write_row(
+                                (
+                                    generator(),
+                                    film_works[index // PERSONS_PER_FILM_WORK],
+                                    persons[index % len(persons)],
+                                    "actor",
+                                    now,
+                                )
+                            )
+        seconds = time.perf_counter() - started
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {table}")
+            cursor.execute(
+                "SELECT indisprimary, "
+                "pg_relation_size(indexrelid) FROM pg_index "
+                "WHERE indrelid = %s::regclass",
+                [table],
+            )
+            sizes = {True: 0, False: 0}
+            for primary, size in cursor.fetchall():
+                sizes[primary] += size
+            cursor.execute(
+                "SELECT pg_relation_size(%s::regclass), "
+                "(SELECT correlation FROM pg_stats "
+                "WHERE tablename = %s AND attname = 'id')",
+                [table, table],
+            )
+            table_size, correlation = cursor.fetchone()
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pgstattuple'"
+            )
+            density = None
+            if cursor.fetchone():
+                cursor.execute(
+                    "SELECT avg_leaf_density FROM pgstatindex("
+                    "(SELECT indexrelid FROM pg_index "
+                    "WHERE indrelid = %s::regclass AND indisprimary))",
+                    [table],
+                )
+                density = cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {table}")
+
+        megabyte = 1024 * 1024
+        return {
+            "rows_per_second": round(options["rows"] / seconds),
+            "pkey_mb": round(sizes[True] / megabyte, 1),
+            "other_indexes_mb": round(sizes[False] / megabyte, 1),
+            "table_mb": round(table_size / megabyte, 1),
+            "leaf_density": density,
+            "correlation": (
+                None if correlation is None else round(correlation, 3)
+            ),
+        }
@@ -0,0 +1,84 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.similar_films import build_similar_films
+from movies.similarity import METRICS
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит похожие фильмы (similar_film_work) по общим жанрам и "
+        "персонам. По умолчанию пересчитывает только фильмы, затронутые "
+        "изменениями связей с прошлого запуска."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=20, help="Соседей на фильм."
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=256,
+            help="Фильмов в блоке; блок занимает block-size × число "
+            "фильмов × 4 байта.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Число процессов, по умолчанию по числу ядер.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать все фильмы.",
+        )
+        parser.add_argument("--metric", choices=METRICS, default="cosine")
+        parser.add_argument("--genre-weight", type=float, default=1.0)
+        parser.add_argument("--person-weight", type=float, default=1.0)
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=0.0,
+            help="Соседи с оценкой не выше порога не сохраняются.",
+        )
+        parser.add_argument(
+            "--database", default="default", help="Алиас базы."
+        )
+
+    def handle(self, *args, **options):
+        for name in ("top", "block_size", "workers"):
+            if options[name] <= 0:
+                raise CommandError(
+                    f"--{name.replace('_', '-')} must be positive."
+                )
+        started = time.perf_counter()
+        films = rows = 0
+        for block_films, block_rows in build_similar_films(
+            k=options["top"],
+            block_size=options["block_size"],
+            workers=options["workers"],
+            full=options["full"],
+            metric=options["metric"],
+            genre_weight=options["genre_weight"],
+            person_weight=options["person_weight"],
+            min_score=options["min_score"],
+            using=options["database"],
+        ):
+            films += block_films
+            rows += block_rows
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{films} film works, {films / elapsed:.0f} per second",
+                ending="\r",
+            )
+        self.stdout.write("")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Similar film works for {films} film works ({rows} rows) "
+                f"in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,106 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.dedup import dedupe_persons
+from movies.models import Person
+
+
+class Command(BaseCommand):
+    help = (
+        "Ищет дубликаты персон (блоки по фамилии и триграммное сходство "
+        "внутри блока) и с --merge сливает их, переписывая связи с "
+        "фильмами."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.6,
+            help="Минимальное триграммное сходство имён, от 0 до 1.",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            default=1000,
+            help="Подблоки больше этого сравниваются только на точное "
+            "совпадение.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Число кластеров, сливаемых в одной транзакции.",
+        )
+        parser.add_argument(
+            "--merge",
+            action="store_true",
+            help="Слить найденные дубликаты, без флага — только отчёт.",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=20,
+            help="Сколько найденных кластеров напечатать.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы.",
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options["threshold"] <= 1:
+            raise CommandError("--threshold must be in (0, 1].")
+        if options["max_block_size"] <= 1 or options["batch_size"] <= 0:
+            raise CommandError(
+                "--max-block-size and --batch-size must be positive."
+            )
+
+        shown = 0
+        queryset = Person.objects.using(options["database"])
+
+        def show(clusters):
+            nonlocal shown
+            clusters = clusters[: max(0, options["show"] - shown)]
+            if not clusters:
+                return
+            names = dict(
+                queryset.filter(
+                    pk__in=[pk for cluster in clusters for pk in cluster]
+                ).values_list("pk", "full_name")
+            )
+            for cluster in clusters:
+                counts = Counter(names.get(pk, str(pk)) for pk in cluster)
+                self.stdout.write(
+                    " | ".join(
+                        f"{name} x{count}" if count > 1 else name
+                        for name, count in counts.most_common()
+                    )
+                )
+            shown += len(clusters)
+
+        stats = dedupe_persons(
+            queryset,
+            threshold=options["threshold"],
+            max_block_size=options["max_block_size"],
+            merge=options["merge"],
+            batch_size=options["batch_size"],
+            on_clusters=show if options["show"] else None,
+        )
+        self.stdout.write(
+            f"{stats.persons} persons in {stats.blocks} blocks, "
+            f"{stats.comparisons} comparisons, "
+            f"{stats.oversized_blocks} oversized blocks: "
+            f"{stats.clusters} clusters in {stats.seconds:.1f}s "
+            f"({stats.persons_per_second:.0f} persons/s)"
+        )
+        if options["merge"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Merged {stats.merged} persons: "
+                    f"{stats.links_moved} links moved, "
+                    f"{stats.links_deleted} duplicate links deleted."
+                )
+            )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.etl.search_index import export_changes
+from movies.etl.sinks import BulkSink, JsonLinesSink
+from movies.etl.state import JsonFileStorage, State
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает изменившиеся с прошлого запуска кинопроизведения "
+        "в NDJSON или bulk-файл для поискового индекса."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", help="Файл, в который дописываются документы."
+        )
+        parser.add_argument(
+            "--format",
+            choices=("ndjson", "bulk"),
+            default="ndjson",
+            help="Формат выгрузки.",
+        )
+        parser.add_argument(
+            "--index",
+            default="movies",
+            help="Имя индекса для формата bulk.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Размер пачки документов.",
+        )
+        parser.add_argument(
+            "--state-file",
+            default="search_index.state.json",
+            help="Файл с отметками последней выгрузки.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Сбросить отметки и выгрузить всё заново.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive.")
+
+        state = State(JsonFileStorage(options["state_file"]))
+        if options["reset"]:
+            state.reset()
+
+        if options["format"] == "bulk":
+            sink = BulkSink(options["output"], options["index"])
+        else:
+            sink = JsonLinesSink(options["output"])
+
+        total = 0
+        for producer, exported in export_changes(
+            sink, state, batch_size=options["batch_size"]
+        ):
+            self.stdout.write(f"{producer}: {exported} documents")
+            total += exported
+        self.stdout.write(self.style.SUCCESS(f"Exported {total} documents."))
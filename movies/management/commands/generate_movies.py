@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.etl.synthetic import SyntheticDataGenerator, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет схему content синтетическими фильмами, персонами и "
+        "связями для нагрузочных тестов. Данные детерминированы по --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--film-works",
+            type=int,
+            default=1_000_000,
+            help="Число кинопроизведений.",
+        )
+        parser.add_argument(
+            "--persons",
+            type=int,
+            default=3_000_000,
+            help="Число персон.",
+        )
+        parser.add_argument(
+            "--persons-per-film-work",
+            type=int,
+            default=10,
+            help="Среднее число персон у фильма.",
+        )
+        parser.add_argument(
+            "--genres-per-film-work",
+            type=int,
+            default=2,
+            help="Наибольшее число жанров у фильма.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Число фильмов или персон в одной пачке COPY.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы назначения.",
+        )
+
+    def handle(self, *args, **options):
+        for option in (
+            "film_works",
+            "persons",
+            "persons_per_film_work",
+            "genres_per_film_work",
+            "chunk_size",
+        ):
+            if options[option] <= 0:
+                name = option.replace("_", "-")
+                raise CommandError(f"--{name} must be positive.")
+
+        generator = SyntheticDataGenerator(
+            seed=options["seed"],
+            film_works=options["film_works"],
+            persons=options["persons"],
+            persons_per_film_work=options["persons_per_film_work"],
+            genres_per_film_work=options["genres_per_film_work"],
+        )
+        for stats in generate(
+            generator, options["chunk_size"], options["database"]
+        ):
+            self.stdout.write(
+                f"{stats.table}: {stats.rows} rows in "
+                f"{stats.seconds:.1f}s ({stats.rows_per_second:.0f} rows/s)"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Done. Run refresh_film_cards to build film work cards."
+            )
+        )
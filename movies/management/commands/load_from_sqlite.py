@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.etl.sqlite_to_postgres import TABLES, load_tables
+from movies.etl.state import JsonFileStorage, State
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит данные из SQLite в схему content пачками через COPY "
+        "с возможностью продолжить загрузку после падения."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sqlite_path", help="Путь к файлу SQLite.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Размер пачки строк.",
+        )
+        parser.add_argument(
+            "--state-file",
+            default="sqlite_to_postgres.state.json",
+            help="Файл чекпоинта.",
+        )
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="tables",
+            choices=[spec.source_table for spec in TABLES],
+            help="Загрузить только указанные таблицы.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы назначения.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Сбросить чекпоинт и загрузить всё заново.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+
+        state = State(JsonFileStorage(options["state_file"]))
+        if options["reset"]:
+            state.reset()
+
+        tables = TABLES
+        if options["tables"]:
+            tables = tuple(
+                spec
+                for spec in TABLES
+                if spec.source_table in options["tables"]
+            )
+
+        for stats in load_tables(
+            options["sqlite_path"],
+            state,
+            chunk_size=options["chunk_size"],
+            tables=tables,
+            using=options["database"],
+        ):
+            self.stdout.write(
+                f"{stats.table}: {stats.rows} rows in {stats.seconds:.2f}s "
+                f"({stats.rows_per_second:.0f} rows/s)"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
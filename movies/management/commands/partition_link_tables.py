@@ -0,0 +1,108 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.db.partitioning import LINK_TABLE_PARTITIONS, TableRebuild
+from movies.models import GenreFilmwork, PersonFilmwork
+
+MODELS = {
+    model._meta.model_name: model for model in (PersonFilmwork, GenreFilmwork)
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Секционирует person_film_work и genre_film_work по hash от "
+        "film_work_id без остановки записи: теневая таблица с триггером, "
+        "перенос пачками и короткая подмена. Запускается до миграции "
+        "0008, которая затем ничего не делает."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            choices=list(MODELS),
+            help="Таблица, по умолчанию обе.",
+        )
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            help="Число секций, по умолчанию "
+            + ", ".join(f"{k}={v}" for k, v in LINK_TABLE_PARTITIONS.items())
+            + ".",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Пауза между пачками в секундах, чтобы не мешать реплике "
+            "и автовакууму.",
+        )
+        parser.add_argument(
+            "--undo",
+            action="store_true",
+            help="Вернуть обычную таблицу вместо секционированной.",
+        )
+        parser.add_argument(
+            "--keep-old",
+            action="store_true",
+            help="Оставить прежнюю таблицу как <name>_old.",
+        )
+        parser.add_argument(
+            "--database", default="default", help="Алиас базы."
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+        if options["partitions"] is not None and options["partitions"] < 2:
+            raise CommandError("--partitions must be at least 2.")
+        for name in options["models"] or MODELS:
+            partitions = None
+            if not options["undo"]:
+                partitions = (
+                    options["partitions"] or LINK_TABLE_PARTITIONS[name]
+                )
+            rebuild = TableRebuild(
+                MODELS[name], partitions, "film_work_id", options["database"]
+            )
+            if rebuild.is_partitioned() == bool(partitions):
+                self.stdout.write(f"{rebuild.table}: nothing to do.")
+                continue
+            self.rebuild(rebuild, options)
+
+    def rebuild(self, rebuild, options):
+        try:
+            rebuild.prepare()
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        started = time.perf_counter()
+        rows = 0
+        for chunk in rebuild.backfill(options["chunk_size"]):
+            rows += chunk
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{rebuild.table}: {rows} rows copied, "
+                f"{rows / elapsed:.0f} rows/s",
+                ending="\r",
+            )
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write("")
+        rebuild.swap()
+        if not options["keep_old"]:
+            rebuild.drop_old()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{rebuild.table}: "
+                + (
+                    f"{rebuild.partitions} partitions"
+                    if rebuild.partitions
+                    else "plain table"
+                )
+                + f", {rows} rows in {time.perf_counter() - started:.1f}s."
+            )
+        )
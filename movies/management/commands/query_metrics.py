@@ -0,0 +1,126 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from movies.metrics.benchmark import default_host
+from movies.metrics.registry import REGISTRY
+
+MIDDLEWARE = "movies.metrics.middleware.QueryMetricsMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Запрашивает страницы внутри процесса и печатает по каждому имени "
+        "URL число SQL-запросов, время в БД, время ответа и повторяющиеся "
+        "запросы (признак N+1)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="+", help="Пути, например /admin/movies/filmwork/."
+        )
+        parser.add_argument(
+            "--user",
+            help="Имя пользователя, от которого выполняются запросы.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Сколько раз запросить каждый путь.",
+        )
+        parser.add_argument(
+            "--host",
+            help=(
+                "Заголовок Host, по умолчанию первый из ALLOWED_HOSTS "
+                "или localhost."
+            ),
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Вывести отчёт в JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] <= 0:
+            raise CommandError("--repeat must be positive.")
+
+        middleware = [
+            MIDDLEWARE,
+            *(name for name in settings.MIDDLEWARE if name != MIDDLEWARE),
+        ]
+        host = options["host"] or default_host()
+        REGISTRY.reset()
+        with override_settings(QUERY_METRICS=True, MIDDLEWARE=middleware):
+            client = Client(HTTP_HOST=host)
+            if options["user"]:
+                user_model = get_user_model()
+                try:
+                    user = user_model._default_manager.get_by_natural_key(
+                        options["user"]
+                    )
+                except user_model.DoesNotExist:
+                    raise CommandError(f"User {options['user']!r} not found.")
+                client.force_login(user)
+            for _ in range(options["repeat"]):
+                for path in options["paths"]:
+                    response = client.get(path)
+                    if response.status_code >= 400:
+                        self.stderr.write(
+                            f"{path}: HTTP {response.status_code}"
+                        )
+
+        report = self.build_report()
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.write_table(report)
+
+    def build_report(self):
+        endpoints, _ = REGISTRY.snapshot()
+        return [
+            {
+                "view": view_name,
+                "requests": stats.duration.count,
+                "mean_ms": round(stats.duration.mean * 1000, 2),
+                "p95_ms_le": stats.duration.quantile(0.95) * 1000,
+                "mean_queries": round(stats.queries.mean, 1),
+                "max_queries": int(stats.queries.max),
+                "mean_db_ms": round(stats.db_duration.mean * 1000, 2),
+                "requests_with_duplicates": stats.requests_with_duplicates,
+                "duplicates": [
+                    {"repeats": repeats, "sql": sql}
+                    for sql, repeats in sorted(
+                        stats.duplicates.items(), key=lambda item: -item[1]
+                    )
+                ],
+            }
+            for view_name, stats in endpoints
+        ]
+
+    def write_table(self, report):
+        header = (
+            f"{'view':<45} {'req':>5} {'mean ms':>9} {'p95 ms<=':>9} "
+            f"{'queries':>8} {'max':>5} {'db ms':>8} {'dup':>5}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in report:
+            self.stdout.write(
+                f"{row['view'][:45]:<45} {row['requests']:>5} "
+                f"{row['mean_ms']:>9} {row['p95_ms_le']:>9g} "
+                f"{row['mean_queries']:>8} {row['max_queries']:>5} "
+                f"{row['mean_db_ms']:>8} {row['requests_with_duplicates']:>5}"
+            )
+        for row in report:
+            if not row["duplicates"]:
+                continue
+            self.stdout.write("")
+            self.stdout.write(self.style.WARNING(f"{row['view']}:"))
+            for duplicate in row["duplicates"]:
+                self.stdout.write(
+                    f"  x{duplicate['repeats']} {duplicate['sql'][:200]}"
+                )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from movies.rating_stats import rebuild_rating_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводки рейтингов по жанрам, персонам и годам. Нужен "
+        "после загрузки в обход ORM, например командой load_from_sqlite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы.",
+        )
+
+    def handle(self, *args, **options):
+        for model, refreshed in rebuild_rating_stats(options["database"]):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Refreshed {refreshed} {model.__name__} rows."
+                )
+            )
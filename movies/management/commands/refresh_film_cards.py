@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.cards import refresh_all_cards
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает карточки кинопроизведений в film_work_card пачками, "
+        "не блокируя чтение. Нужен после загрузки в обход ORM, например "
+        "командой load_from_sqlite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Размер пачки фильмов.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be positive.")
+
+        seen = refreshed = 0
+        for chunk_seen, chunk_refreshed in refresh_all_cards(
+            options["chunk_size"], options["database"]
+        ):
+            seen += chunk_seen
+            refreshed += chunk_refreshed
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{seen} film works processed")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed {refreshed} of {seen} film work cards."
+            )
+        )
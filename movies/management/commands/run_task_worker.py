@@ -0,0 +1,114 @@
+import logging
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from movies.taskqueue import work
+
+logger = logging.getLogger(__name__)
+
+
+def stop_on_signals() -> threading.Event:
+    """Событие, которое выставляют SIGTERM и SIGINT: текущая задача
+    доделывается, новые не берутся."""
+    stop = threading.Event()
+
+    def handle(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+    return stop
+
+
+def run_worker(poll_interval: float, burst: bool, using: str) -> None:
+    try:
+        work(stop_on_signals(), poll_interval, burst, using)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из очереди content.task в нескольких "
+        "процессах. Задачи разбираются через SELECT ... FOR UPDATE SKIP "
+        "LOCKED, поэтому воркеров можно запускать сколько угодно и на "
+        "разных машинах."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Число процессов-воркеров.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Выйти, когда очередь опустеет.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас базы.",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] <= 0:
+            raise CommandError("--processes must be positive.")
+        if options["poll_interval"] <= 0:
+            raise CommandError("--poll-interval must be positive.")
+
+        worker_args = (
+            options["poll_interval"],
+            options["burst"],
+            options["database"],
+        )
+        if options["processes"] == 1:
+            run_worker(*worker_args)
+            return
+
+        stop = stop_on_signals()
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+
+        def start():
+            process = multiprocessing.Process(
+                target=run_worker, args=worker_args
+            )
+            process.start()
+            return process
+
+        processes = [start() for _ in range(options["processes"])]
+        while not stop.is_set():
+            if options["burst"] and not any(
+                process.is_alive() for process in processes
+            ):
+                break
+            for index, process in enumerate(processes):
+                if options["burst"] or process.is_alive():
+                    continue
+                # Задачу упавшего процесса вернёт в очередь requeue_stale.
+                logger.warning(
+                    "Worker %d exited with %s, restarting",
+                    process.pid,
+                    process.exitcode,
+                )
+                processes[index] = start()
+            stop.wait(1)
+        for process in processes:
+            # SIGTERM: процесс доделывает текущую задачу и выходит.
+            process.terminate()
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
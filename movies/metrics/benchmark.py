@@ -0,0 +1,99 @@
+import statistics
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+from .middleware import QueryRecorder
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+
+
+def default_host() -> str:
+    """Заголовок Host для тестового клиента: первый из ``ALLOWED_HOSTS``,
+    если это имя, а не шаблон ``*`` или ``.example.com``."""
+    hosts = settings.ALLOWED_HOSTS
+    if not hosts or hosts[0] == "*" or hosts[0].startswith("."):
+        return "localhost"
+    return hosts[0]
+
+
+# Параметры в фигурных скобках подставляются при запуске.
+ADMIN_SCENARIOS = (
+    Scenario("changelist", "/admin/movies/filmwork/"),
+    Scenario("search", "/admin/movies/filmwork/?q={search}"),
+    Scenario("filter_type", "/admin/movies/filmwork/?type=tv_show"),
+    Scenario(
+        "filter_creation_date", "/admin/movies/filmwork/?creation_date={year}"
+    ),
+    Scenario(
+        "filter_type_decade",
+        "/admin/movies/filmwork/?type=tv_show&creation_date={decade}s",
+    ),
+    Scenario("change_form", "/admin/movies/filmwork/{film_work_id}/change/"),
+)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def run_scenario(client, scenario: Scenario, params: dict, repeat, warmup):
+    """Запрашивает страницу ``warmup + repeat`` раз и возвращает
+    статистику последних ``repeat`` запросов."""
+    path = scenario.path.format(**params)
+    timings, db_timings, query_counts, statuses = [], [], [], set()
+    for iteration in range(warmup + repeat):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            started = time.perf_counter()
+            response = client.get(path)
+            elapsed = time.perf_counter() - started
+        if iteration < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        db_timings.append(recorder.duration * 1000)
+        query_counts.append(recorder.count)
+        statuses.add(response.status_code)
+    return {
+        "path": path,
+        "statuses": sorted(statuses),
+        "queries": max(query_counts),
+        "queries_min": min(query_counts),
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "min_ms": round(min(timings), 2),
+        "db_median_ms": round(statistics.median(db_timings), 2),
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """Сравнивает два отчёта по медиане времени и числу запросов."""
+    rows = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        rows.append(
+            {
+                "scenario": name,
+                "median_ms": (before["median_ms"], result["median_ms"]),
+                "ratio": (
+                    round(result["median_ms"] / before["median_ms"], 2)
+                    if before["median_ms"]
+                    else None
+                ),
+                "queries": (before["queries"], result["queries"]),
+            }
+        )
+    return rows
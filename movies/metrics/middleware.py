@@ -0,0 +1,73 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .registry import REGISTRY
+
+UNRESOLVED = "<unresolved>"
+
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def fingerprint(sql: str) -> str:
+    """Текст запроса без значений: списки ``IN (%s, %s, ...)`` любой
+    длины и литералы в сыром SQL дают один отпечаток."""
+    sql = _LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("%s, ...", sql)
+
+
+class QueryRecorder:
+    """Обёртка ``connection.execute_wrapper``: считает запросы и время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+
+class QueryMetricsMiddleware:
+    """Собирает по каждому запросу число SQL-запросов, время в БД,
+    повторяющиеся запросы (признак N+1) и общее время ответа.
+
+    Статистика копится в ``REGISTRY`` по имени URL. Подключается только
+    при ``QUERY_METRICS = True``, иначе Django исключает его из цепочки.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_METRICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        REGISTRY.observe_request(
+            match.view_name if match else UNRESOLVED,
+            duration,
+            recorder.count,
+            recorder.duration,
+            recorder.fingerprints,
+        )
+        return response
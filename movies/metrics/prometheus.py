@@ -0,0 +1,78 @@
+from .registry import Registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HISTOGRAMS = (
+    (
+        "django_request_duration_seconds",
+        "Время ответа по имени URL.",
+        "duration",
+    ),
+    (
+        "django_request_db_duration_seconds",
+        "Время SQL-запросов за один ответ по имени URL.",
+        "db_duration",
+    ),
+    (
+        "django_request_db_queries",
+        "Число SQL-запросов за один ответ по имени URL.",
+        "queries",
+    ),
+)
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def _bound(value) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+def render(registry: Registry) -> str:
+    """Метрики реестра в текстовом формате Prometheus."""
+    endpoints, counters = registry.snapshot()
+    lines = []
+    for name, description, attribute in HISTOGRAMS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for view_name, stats in endpoints:
+            histogram = getattr(stats, attribute)
+            for bound, total in histogram.cumulative():
+                labels = _labels((("view", view_name), ("le", _bound(bound))))
+                lines.append(f"{name}_bucket{labels} {total}")
+            labels = _labels((("view", view_name),))
+            lines.append(f"{name}_sum{labels} {histogram.sum!r}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    name = "django_request_duplicate_queries_total"
+    lines.append(
+        f"# HELP {name} Ответы, в которых один и тот же SQL-запрос "
+        "выполнялся несколько раз."
+    )
+    lines.append(f"# TYPE {name} counter")
+    for view_name, stats in endpoints:
+        labels = _labels((("view", view_name),))
+        lines.append(f"{name}{labels} {stats.requests_with_duplicates}")
+
+    described = set()
+    for (name, labels), value in counters:
+        if name not in described:
+            described.add(name)
+            if name in registry.descriptions:
+                lines.append(f"# HELP {name} {registry.descriptions[name]}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
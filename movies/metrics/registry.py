@@ -0,0 +1,153 @@
+import copy
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable
+
+# Границы корзин гистограмм. Число корзин фиксировано, поэтому память на
+# эндпоинт не растёт с числом запросов.
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Сколько отпечатков повторяющихся запросов хранить на эндпоинт.
+MAX_DUPLICATES = 20
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как в Prometheus."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Пары (верхняя граница, число наблюдений не больше неё)."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, fraction: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class EndpointStats:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.db_duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.requests_with_duplicates = 0
+        # Отпечаток запроса -> наибольшее число повторов за один запрос.
+        self.duplicates = {}
+
+    def record_duplicates(self, fingerprints: Counter) -> None:
+        repeated = {
+            fingerprint: count
+            for fingerprint, count in fingerprints.items()
+            if count > 1
+        }
+        if not repeated:
+            return
+        self.requests_with_duplicates += 1
+        for fingerprint, count in repeated.items():
+            if fingerprint in self.duplicates:
+                self.duplicates[fingerprint] = max(
+                    self.duplicates[fingerprint], count
+                )
+                continue
+            if len(self.duplicates) >= MAX_DUPLICATES:
+                rarest = min(self.duplicates, key=self.duplicates.get)
+                if self.duplicates[rarest] >= count:
+                    continue
+                del self.duplicates[rarest]
+            self.duplicates[fingerprint] = count
+
+
+class Registry:
+    """Метрики процесса: статистика по эндпоинтам и простые счётчики.
+
+    Хранится в памяти, поэтому у каждого воркера gunicorn она своя.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.counters = Counter()
+        self.descriptions = {}
+
+    def observe_request(
+        self,
+        view_name: str,
+        duration: float,
+        queries: int,
+        db_duration: float,
+        fingerprints: Counter,
+    ) -> None:
+        with self._lock:
+            stats = self.endpoints.get(view_name)
+            if stats is None:
+                stats = self.endpoints[view_name] = EndpointStats()
+            stats.duration.observe(duration)
+            stats.db_duration.observe(db_duration)
+            stats.queries.observe(queries)
+            stats.record_duplicates(fingerprints)
+
+    def describe(self, name: str, description: str) -> None:
+        self.descriptions[name] = description
+
+    def inc(self, name: str, value: int = 1, **labels) -> None:
+        """Увеличивает счётчик ``name`` с метками ``labels``."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def snapshot(self) -> tuple[list, list]:
+        """Копия статистики эндпоинтов и счётчиков, отсортированная
+        по именам."""
+        with self._lock:
+            return (
+                sorted(copy.deepcopy(self.endpoints).items()),
+                sorted(self.counters.items()),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+            self.counters.clear()
+
+
+REGISTRY = Registry()
@@ -0,0 +1,8 @@
+from django.http import HttpResponse
+
+from .prometheus import CONTENT_TYPE, render
+from .registry import REGISTRY
+
+
+def metrics(request):
+    return HttpResponse(render(REGISTRY), content_type=CONTENT_TYPE)
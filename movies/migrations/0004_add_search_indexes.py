@@ -0,0 +1,62 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:24
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ("movies", "0003_add_modified_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="filmwork",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "title", "description", config="simple"
+                ),
+                name="film_work_search_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="genre",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="gin_trgm_ops",
+                ),
+                name="genre_name_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="genre",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="genre_description_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="person",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("full_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="person_full_name_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:37
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0004_add_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FilmworkCard",
+            fields=[
+                (
+                    "film_work",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="movies.filmwork",
+                        verbose_name="film_work",
+                    ),
+                ),
+                ("title", models.TextField(verbose_name="title")),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="description"
+                    ),
+                ),
+                (
+                    "creation_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="creation_date"
+                    ),
+                ),
+                (
+                    "rating",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="rating"
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("movie", "movie"), ("tv_show", "tv_show")],
+                        verbose_name="type",
+                    ),
+                ),
+                (
+                    "genres",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        size=None,
+                        verbose_name="genres",
+                    ),
+                ),
+                (
+                    "actors",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        size=None,
+                        verbose_name="actors",
+                    ),
+                ),
+                (
+                    "writers",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        size=None,
+                        verbose_name="writers",
+                    ),
+                ),
+                (
+                    "directors",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        size=None,
+                        verbose_name="directors",
+                    ),
+                ),
+                ("refreshed", models.DateTimeField(verbose_name="refreshed")),
+            ],
+            options={
+                "verbose_name": "film_work_card",
+                "verbose_name_plural": "film_work_cards",
+                "db_table": 'content"."film_work_card',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:43
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ("movies", "0005_add_film_work_card"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="filmwork",
+            index=models.Index(
+                fields=["type", "creation_date"],
+                name="film_work_type_creation_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="filmwork",
+            index=models.Index(
+                fields=["creation_date"], name="film_work_creation_date_idx"
+            ),
+        ),
+        # Удаляется после создания составного индекса, чтобы фильтр по
+        # типу ни в какой момент не остался без индекса.
+        RemoveIndexConcurrently(
+            model_name="filmwork",
+            name="film_work_type_idx",
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.11 on 2026-10-18 06:54
+
+from django.db import migrations, models
+import movies.db.uuid7
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0006_add_creation_date_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="genrefilmwork",
+            name="id",
+            field=models.UUIDField(
+                default=movies.db.uuid7.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                verbose_name="id",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="personfilmwork",
+            name="id",
+            field=models.UUIDField(
+                default=movies.db.uuid7.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                verbose_name="id",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from movies.db.partitioning import PartitionByHash
+
+
+class Migration(migrations.Migration):
+    # Строки переносятся пачками в отдельных транзакциях, запись в
+    # таблицы при этом не останавливается.
+    atomic = False
+
+    dependencies = [
+        ("movies", "0007_time_ordered_link_ids"),
+    ]
+
+    operations = [
+        PartitionByHash(
+            model_name="personfilmwork",
+            column="film_work_id",
+            partitions=16,
+        ),
+        PartitionByHash(
+            model_name="genrefilmwork",
+            column="film_work_id",
+            partitions=4,
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from movies.db.partitioning import AddPartitionedIndexConcurrently
+
+# Индексы внешних ключей, которые заменяют покрывающие индексы.
+FOREIGN_KEYS = (("genrefilmwork", "genre"), ("personfilmwork", "person"))
+
+
+def drop_foreign_key_indexes(apps, schema_editor):
+    # AlterField их не находит: интроспекция Django не понимает db_table
+    # со схемой. DROP INDEX на секционированной таблице не бывает
+    # CONCURRENTLY, но удаление индекса — короткая операция.
+    for model_name, field_name in FOREIGN_KEYS:
+        model = apps.get_model("movies", model_name)
+        field = model._meta.get_field(field_name)
+        name = schema_editor._create_index_name(
+            model._meta.db_table, [field.column]
+        )
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {schema_editor.quote_name(name)}"
+        )
+
+
+def create_foreign_key_indexes(apps, schema_editor):
+    for model_name, field_name in FOREIGN_KEYS:
+        model = apps.get_model("movies", model_name)
+        field = model._meta.get_field(field_name)
+        schema_editor.execute(
+            schema_editor._create_index_sql(model, fields=[field])
+        )
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ("movies", "0008_partition_link_tables"),
+    ]
+
+    operations = [
+        AddPartitionedIndexConcurrently(
+            model_name="genrefilmwork",
+            index=models.Index(
+                fields=["genre", "film_work"], name="genre_film_work_genre_idx"
+            ),
+        ),
+        AddPartitionedIndexConcurrently(
+            model_name="personfilmwork",
+            index=models.Index(
+                fields=["person", "role"],
+                include=("film_work",),
+                name="person_role_film_work_idx",
+            ),
+        ),
+        # Индексы внешних ключей удаляются после создания покрывающих,
+        # чтобы поиск по genre_id и person_id не остался без индекса.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    drop_foreign_key_indexes, create_foreign_key_indexes
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="genrefilmwork",
+                    name="genre",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="movies.genre",
+                        verbose_name="genre",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="personfilmwork",
+                    name="person",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="movies.person",
+                        verbose_name="person",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import movies.db.uuid7
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0009_add_link_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarFilmwork",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=movies.db.uuid7.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="score")),
+                ("computed", models.DateTimeField(verbose_name="computed")),
+                (
+                    "film_work",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_film_works",
+                        to="movies.filmwork",
+                        verbose_name="film_work",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_of",
+                        to="movies.filmwork",
+                        verbose_name="similar_film_work",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "similar_film_work",
+                "verbose_name_plural": "similar_film_works",
+                "db_table": 'content"."similar_film_work',
+                "indexes": [
+                    models.Index(
+                        fields=["computed"],
+                        name="similar_film_work_computed_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="similarfilmwork",
+            constraint=models.UniqueConstraint(
+                fields=("film_work", "similar"), name="similar_film_work_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:34
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0010_add_similar_film_work"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GenreRatingStats",
+            fields=[
+                (
+                    "film_works",
+                    models.PositiveIntegerField(
+                        verbose_name="rated_film_works"
+                    ),
+                ),
+                ("rating_sum", models.FloatField(verbose_name="rating_sum")),
+                ("rating_min", models.FloatField(verbose_name="rating_min")),
+                ("rating_max", models.FloatField(verbose_name="rating_max")),
+                ("rating_avg", models.FloatField(verbose_name="rating_avg")),
+                (
+                    "histogram",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        size=10,
+                        verbose_name="rating_histogram",
+                    ),
+                ),
+                ("refreshed", models.DateTimeField(verbose_name="refreshed")),
+                (
+                    "genre",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_stats",
+                        serialize=False,
+                        to="movies.genre",
+                        verbose_name="genre",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "genre_rating_stats",
+                "verbose_name_plural": "genres_rating_stats",
+                "db_table": 'content"."genre_rating_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name="YearRatingStats",
+            fields=[
+                (
+                    "film_works",
+                    models.PositiveIntegerField(
+                        verbose_name="rated_film_works"
+                    ),
+                ),
+                ("rating_sum", models.FloatField(verbose_name="rating_sum")),
+                ("rating_min", models.FloatField(verbose_name="rating_min")),
+                ("rating_max", models.FloatField(verbose_name="rating_max")),
+                ("rating_avg", models.FloatField(verbose_name="rating_avg")),
+                (
+                    "histogram",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        size=10,
+                        verbose_name="rating_histogram",
+                    ),
+                ),
+                ("refreshed", models.DateTimeField(verbose_name="refreshed")),
+                (
+                    "year",
+                    models.PositiveSmallIntegerField(
+                        primary_key=True, serialize=False, verbose_name="year"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "year_rating_stats",
+                "verbose_name_plural": "years_rating_stats",
+                "db_table": 'content"."year_rating_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name="PersonRatingStats",
+            fields=[
+                (
+                    "film_works",
+                    models.PositiveIntegerField(
+                        verbose_name="rated_film_works"
+                    ),
+                ),
+                ("rating_sum", models.FloatField(verbose_name="rating_sum")),
+                ("rating_min", models.FloatField(verbose_name="rating_min")),
+                ("rating_max", models.FloatField(verbose_name="rating_max")),
+                ("rating_avg", models.FloatField(verbose_name="rating_avg")),
+                (
+                    "histogram",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.PositiveIntegerField(),
+                        size=10,
+                        verbose_name="rating_histogram",
+                    ),
+                ),
+                ("refreshed", models.DateTimeField(verbose_name="refreshed")),
+                (
+                    "person",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_stats",
+                        serialize=False,
+                        to="movies.person",
+                        verbose_name="person",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "person_rating_stats",
+                "verbose_name_plural": "persons_rating_stats",
+                "db_table": 'content"."person_rating_stats',
+                "indexes": [
+                    models.Index(
+                        fields=["-rating_avg", "person"],
+                        name="person_rating_stats_avg_idx",
+                    ),
+                    models.Index(
+                        fields=["-film_works", "person"],
+                        name="person_rating_stats_count_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,163 @@
+# Generated by Django 4.2.11 on 2026-10-18 07:51
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+import movies.db.uuid7
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0011_add_rating_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=movies.db.uuid7.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, verbose_name="task_name"),
+                ),
+                (
+                    "kwargs",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="task_kwargs",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "task_queued"),
+                            ("running", "task_running"),
+                            ("succeeded", "task_succeeded"),
+                            ("failed", "task_failed"),
+                            ("cancelled", "task_cancelled"),
+                        ],
+                        default="queued",
+                        max_length=16,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="attempts"
+                    ),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveSmallIntegerField(
+                        verbose_name="max_attempts"
+                    ),
+                ),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="run_after",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="progress"
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveBigIntegerField(
+                        blank=True, null=True, verbose_name="total"
+                    ),
+                ),
+                (
+                    "message",
+                    models.TextField(blank=True, verbose_name="task_message"),
+                ),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="task_result",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, verbose_name="task_error"),
+                ),
+                (
+                    "worker",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="worker"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="created_by"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "started",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="started"
+                    ),
+                ),
+                (
+                    "finished",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="finished"
+                    ),
+                ),
+                (
+                    "heartbeat",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="heartbeat"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "task",
+                "verbose_name_plural": "tasks",
+                "db_table": 'content"."task',
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "queued")),
+                        fields=["run_after", "id"],
+                        name="task_queued_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("status", "running")),
+                        fields=["name", "heartbeat"],
+                        name="task_running_idx",
+                    ),
+                    models.Index(fields=["-created"], name="task_created_idx"),
+                    models.Index(
+                        fields=["finished"], name="task_finished_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
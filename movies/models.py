@@ -1,9 +1,23 @@
 import uuid
 
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Q
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .db.uuid7 import uuid7
+
+# Выражение полнотекстового поиска по фильмам. Совпадает с выражением
+# индекса film_work_search_idx, иначе индекс не будет использоваться.
+FILMWORK_SEARCH_VECTOR = SearchVector("title", "description", config="simple")
+
 
 class TimeStampedMixin(models.Model):
     created = models.DateTimeField(_("created"), auto_now_add=True)
@@ -22,6 +36,22 @@ class UUIDMixin(models.Model):
         abstract = True
 
 
+class TimeOrderedUUIDMixin(models.Model):
+    """Первичный ключ UUIDv7 для таблиц с частой вставкой.
+
+    Новые ключи возрастают, поэтому вставка идёт в правый край индекса
+    без расщепления страниц, а ``ORDER BY id`` совпадает с порядком
+    создания. Старые строки с UUIDv4 остаются как есть.
+    """
+
+    id = models.UUIDField(
+        _("id"), primary_key=True, default=uuid7, editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+
 class Genre(UUIDMixin, TimeStampedMixin):
     name = models.CharField(_("name_title"), max_length=255)
     description = models.TextField(_("description"), blank=True, null=True)
@@ -37,6 +67,18 @@ class Genre(UUIDMixin, TimeStampedMixin):
                 fields=["name"],
                 name="genre_name_idx",
             ),
+            models.Index(
+                fields=["modified", "id"],
+                name="genre_modified_id_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="genre_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="genre_description_trgm_idx",
+            ),
         ]
 
     def __str__(self):
@@ -57,12 +99,56 @@ class Person(UUIDMixin, TimeStampedMixin):
                 fields=["full_name"],
                 name="person_full_name_idx",
             ),
+            models.Index(
+                fields=["modified", "id"],
+                name="person_modified_id_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("full_name"), name="gin_trgm_ops"),
+                name="person_full_name_trgm_idx",
+            ),
         ]
 
     def __str__(self):
         return self.full_name
 
 
+class FilmworkQuerySet(models.QuerySet):
+    CARD_FIELDS = (
+        "id",
+        "title",
+        "description",
+        "creation_date",
+        "rating",
+        "type",
+    )
+
+    def cards(self):
+        """Фильмы вместе с жанрами и персонами по ролям.
+
+        Жанры и персоны собираются коррелированными подзапросами
+        ``ARRAY(...)`` по индексам таблиц связей: одна строка на фильм
+        без декартова произведения жанров на персон.
+        """
+        return self.values(*self.CARD_FIELDS).annotate(
+            genres=ArraySubquery(
+                GenreFilmwork.objects.filter(film_work=OuterRef("pk"))
+                .order_by("genre__name")
+                .values("genre__name")
+            ),
+            **{
+                f"{role}s": ArraySubquery(
+                    PersonFilmwork.objects.filter(
+                        film_work=OuterRef("pk"), role=role
+                    )
+                    .order_by("person__full_name")
+                    .values("person__full_name")
+                )
+                for role in PersonFilmwork.Role.values
+            },
+        )
+
+
 class Filmwork(UUIDMixin, TimeStampedMixin):
     class Filmtype(models.TextChoices):
         MOVIE = "movie", _("movie")
@@ -89,6 +175,8 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
         Person, through="PersonFilmwork", verbose_name=_("persons")
     )
 
+    objects = FilmworkQuerySet.as_manager()
+
     class Meta:
         db_table = 'content"."film_work'
         verbose_name = _("film_work")
@@ -104,9 +192,22 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
                 fields=["rating"],
                 name="film_work_rating_idx",
             ),
+            # Ведущая колонка type обслуживает и фильтр по одному типу.
+            models.Index(
+                fields=["type", "creation_date"],
+                name="film_work_type_creation_idx",
+            ),
             models.Index(
-                fields=["type"],
-                name="film_work_type_idx",
+                fields=["creation_date"],
+                name="film_work_creation_date_idx",
+            ),
+            models.Index(
+                fields=["modified", "id"],
+                name="film_work_modified_id_idx",
+            ),
+            GinIndex(
+                FILMWORK_SEARCH_VECTOR,
+                name="film_work_search_idx",
             ),
         ]
 
@@ -114,12 +215,16 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
         return self.title
 
 
-class GenreFilmwork(UUIDMixin):
+class GenreFilmwork(TimeOrderedUUIDMixin):
     film_work = models.ForeignKey(
         "Filmwork", on_delete=models.CASCADE, verbose_name=_("film_work")
     )
+    # Поиск по genre_id обслуживает покрывающий индекс из Meta.indexes.
     genre = models.ForeignKey(
-        "Genre", on_delete=models.CASCADE, verbose_name=_("genre")
+        "Genre",
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name=_("genre"),
     )
     created = models.DateTimeField(_("created"), auto_now_add=True)
 
@@ -128,6 +233,13 @@ class GenreFilmwork(UUIDMixin):
         verbose_name = _("genre_film_work")
         verbose_name_plural = _("genres_film_work")
 
+        indexes = [
+            models.Index(
+                fields=["genre", "film_work"],
+                name="genre_film_work_genre_idx",
+            ),
+        ]
+
         constraints = [
             models.UniqueConstraint(
                 fields=["film_work", "genre"],
@@ -139,12 +251,21 @@ class GenreFilmwork(UUIDMixin):
         return ""
 
 
-class PersonFilmwork(UUIDMixin):
+class PersonFilmwork(TimeOrderedUUIDMixin):
+    class Role(models.TextChoices):
+        ACTOR = "actor", _("actor")
+        WRITER = "writer", _("writer")
+        DIRECTOR = "director", _("director")
+
     film_work = models.ForeignKey(
         "Filmwork", on_delete=models.CASCADE, verbose_name=_("film_work")
     )
+    # Поиск по person_id обслуживает покрывающий индекс из Meta.indexes.
     person = models.ForeignKey(
-        "Person", on_delete=models.CASCADE, verbose_name=_("person")
+        "Person",
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name=_("person"),
     )
     role = models.TextField(_("role"))
     created = models.DateTimeField(_("created"), auto_now_add=True)
@@ -154,6 +275,16 @@ class PersonFilmwork(UUIDMixin):
         verbose_name = _("person_film_work")
         verbose_name_plural = _("persons_film_work")
 
+        indexes = [
+            # Фильмография персоны читается только из индекса
+            # (index-only scan), без обращения к таблице.
+            models.Index(
+                fields=["person", "role"],
+                include=["film_work"],
+                name="person_role_film_work_idx",
+            ),
+        ]
+
         constraints = [
             models.UniqueConstraint(
                 fields=["film_work", "person", "role"],
@@ -163,3 +294,241 @@ class PersonFilmwork(UUIDMixin):
 
     def __str__(self):
         return ""
+
+
+class FilmworkCard(models.Model):
+    """Готовая карточка фильма для чтения одним запросом по ключу.
+
+    Обновляется ``movies.cards.refresh_cards`` для затронутых фильмов
+    после каждого изменения фильма, его жанров или персон.
+    """
+
+    film_work = models.OneToOneField(
+        "Filmwork",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="card",
+        verbose_name=_("film_work"),
+    )
+    title = models.TextField(_("title"))
+    description = models.TextField(_("description"), blank=True, null=True)
+    creation_date = models.DateField(_("creation_date"), blank=True, null=True)
+    rating = models.FloatField(_("rating"), blank=True, null=True)
+    type = models.CharField(_("type"), choices=Filmwork.Filmtype.choices)
+    genres = ArrayField(models.TextField(), verbose_name=_("genres"))
+    actors = ArrayField(models.TextField(), verbose_name=_("actors"))
+    writers = ArrayField(models.TextField(), verbose_name=_("writers"))
+    directors = ArrayField(models.TextField(), verbose_name=_("directors"))
+    refreshed = models.DateTimeField(_("refreshed"))
+
+    class Meta:
+        db_table = 'content"."film_work_card'
+        verbose_name = _("film_work_card")
+        verbose_name_plural = _("film_work_cards")
+
+    def __str__(self):
+        return self.title
+
+
+class SimilarFilmwork(TimeOrderedUUIDMixin):
+    """Похожий фильм из top-K, который строит команда
+    ``build_similar_films`` по общим жанрам и персонам."""
+
+    # Поиск по film_work_id обслуживает уникальный индекс.
+    film_work = models.ForeignKey(
+        "Filmwork",
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name="similar_film_works",
+        verbose_name=_("film_work"),
+    )
+    similar = models.ForeignKey(
+        "Filmwork",
+        on_delete=models.CASCADE,
+        related_name="similar_of",
+        verbose_name=_("similar_film_work"),
+    )
+    score = models.FloatField(_("score"))
+    computed = models.DateTimeField(_("computed"))
+
+    class Meta:
+        db_table = 'content"."similar_film_work'
+        verbose_name = _("similar_film_work")
+        verbose_name_plural = _("similar_film_works")
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["film_work", "similar"],
+                name="similar_film_work_idx",
+            ),
+        ]
+        indexes = [
+            # Отметка последнего расчёта — max(computed).
+            models.Index(
+                fields=["computed"],
+                name="similar_film_work_computed_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return ""
+
+
+# Сводки рейтингов делят шкалу 0–10 на корзины по единице; 10 попадает в
+# последнюю.
+RATING_HISTOGRAM_BUCKETS = 10
+
+
+class RatingStatsMixin(models.Model):
+    """Сводка рейтингов фильмов группы (жанра, персоны, года).
+
+    Учитываются только фильмы с рейтингом. Обновляется
+    ``movies.rating_stats.refresh_rating_stats`` для затронутых групп
+    после каждого изменения рейтинга, даты выхода или связей фильма.
+    """
+
+    film_works = models.PositiveIntegerField(_("rated_film_works"))
+    rating_sum = models.FloatField(_("rating_sum"))
+    rating_min = models.FloatField(_("rating_min"))
+    rating_max = models.FloatField(_("rating_max"))
+    rating_avg = models.FloatField(_("rating_avg"))
+    histogram = ArrayField(
+        models.PositiveIntegerField(),
+        size=RATING_HISTOGRAM_BUCKETS,
+        verbose_name=_("rating_histogram"),
+    )
+    refreshed = models.DateTimeField(_("refreshed"))
+
+    class Meta:
+        abstract = True
+
+
+class GenreRatingStats(RatingStatsMixin):
+    genre = models.OneToOneField(
+        "Genre",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="rating_stats",
+        verbose_name=_("genre"),
+    )
+
+    class Meta:
+        db_table = 'content"."genre_rating_stats'
+        verbose_name = _("genre_rating_stats")
+        verbose_name_plural = _("genres_rating_stats")
+
+    def __str__(self):
+        return str(self.genre)
+
+
+class PersonRatingStats(RatingStatsMixin):
+    person = models.OneToOneField(
+        "Person",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="rating_stats",
+        verbose_name=_("person"),
+    )
+
+    class Meta:
+        db_table = 'content"."person_rating_stats'
+        verbose_name = _("person_rating_stats")
+        verbose_name_plural = _("persons_rating_stats")
+
+        indexes = [
+            # Рейтинги лидеров: первые строки индекса, без сортировки.
+            models.Index(
+                fields=["-rating_avg", "person"],
+                name="person_rating_stats_avg_idx",
+            ),
+            models.Index(
+                fields=["-film_works", "person"],
+                name="person_rating_stats_count_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.person)
+
+
+class YearRatingStats(RatingStatsMixin):
+    year = models.PositiveSmallIntegerField(_("year"), primary_key=True)
+
+    class Meta:
+        db_table = 'content"."year_rating_stats'
+        verbose_name = _("year_rating_stats")
+        verbose_name_plural = _("years_rating_stats")
+
+    def __str__(self):
+        return str(self.year)
+
+
+class Task(TimeOrderedUUIDMixin):
+    """Фоновая задача из очереди ``movies.taskqueue``: функция ``name``
+    с аргументами ``kwargs``, которую выполняет команда
+    ``run_task_worker``."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", _("task_queued")
+        RUNNING = "running", _("task_running")
+        SUCCEEDED = "succeeded", _("task_succeeded")
+        FAILED = "failed", _("task_failed")
+        CANCELLED = "cancelled", _("task_cancelled")
+
+    name = models.CharField(_("task_name"), max_length=100)
+    kwargs = models.JSONField(
+        _("task_kwargs"), default=dict, encoder=DjangoJSONEncoder
+    )
+    status = models.CharField(
+        _("status"),
+        max_length=16,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    max_attempts = models.PositiveSmallIntegerField(_("max_attempts"))
+    run_after = models.DateTimeField(_("run_after"), default=timezone.now)
+    progress = models.PositiveBigIntegerField(_("progress"), default=0)
+    total = models.PositiveBigIntegerField(_("total"), blank=True, null=True)
+    message = models.TextField(_("task_message"), blank=True)
+    result = models.JSONField(
+        _("task_result"), blank=True, null=True, encoder=DjangoJSONEncoder
+    )
+    error = models.TextField(_("task_error"), blank=True)
+    worker = models.CharField(_("worker"), max_length=255, blank=True)
+    created_by = models.CharField(_("created_by"), max_length=150, blank=True)
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    started = models.DateTimeField(_("started"), blank=True, null=True)
+    finished = models.DateTimeField(_("finished"), blank=True, null=True)
+    heartbeat = models.DateTimeField(_("heartbeat"), blank=True, null=True)
+
+    class Meta:
+        db_table = 'content"."task'
+        verbose_name = _("task")
+        verbose_name_plural = _("tasks")
+
+        indexes = [
+            # Очередь: готовые задачи в порядке постановки.
+            models.Index(
+                fields=["run_after", "id"],
+                condition=Q(status="queued"),
+                name="task_queued_idx",
+            ),
+            # Число выполняемых задач типа и поиск брошенных.
+            models.Index(
+                fields=["name", "heartbeat"],
+                condition=Q(status="running"),
+                name="task_running_idx",
+            ),
+            models.Index(
+                fields=["-created"],
+                name="task_created_idx",
+            ),
+            models.Index(
+                fields=["finished"],
+                name="task_finished_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,250 @@
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterable, Iterator, Optional
+
+from django.db import connections, transaction
+
+from movies.db.utils import table_name
+from movies.models import (
+    RATING_HISTOGRAM_BUCKETS,
+    Filmwork,
+    GenreFilmwork,
+    GenreRatingStats,
+    PersonFilmwork,
+    PersonRatingStats,
+    YearRatingStats,
+)
+
+SUMMARIES = (GenreRatingStats, PersonRatingStats, YearRatingStats)
+STATS_COLUMNS = (
+    "film_works",
+    "rating_sum",
+    "rating_min",
+    "rating_max",
+    "rating_avg",
+    "histogram",
+)
+
+# Номер корзины гистограммы — целая часть рейтинга, 10 — в последнюю.
+BUCKET_SQL = f"least(floor(rating)::int, {RATING_HISTOGRAM_BUCKETS - 1})"
+
+_pending = threading.local()
+_collected = threading.local()
+
+
+def _source_sql(model, keyed: bool, using: str) -> str:
+    """Пары ``(key, rating)`` фильмов с рейтингом: всех групп или только
+    ``%(keys)s``. Персона в нескольких ролях фильма считается один раз."""
+    film_works = table_name(Filmwork, using)
+    if model is YearRatingStats:
+        if keyed:
+            # Диапазон дат, а не extract(year), — по индексу creation_date.
+            return (
+                "SELECT year.key, film.rating "
+                "FROM unnest(%(keys)s::smallint[]) AS year(key) "
+                f"JOIN {film_works} film "
+                "ON film.creation_date >= make_date(year.key, 1, 1) "
+                "AND film.creation_date < make_date(year.key + 1, 1, 1) "
+                "WHERE film.rating IS NOT NULL"
+            )
+        return (
+            "SELECT extract(year FROM film.creation_date)::int AS key, "
+            f"film.rating FROM {film_works} film "
+            "WHERE film.rating IS NOT NULL "
+            "AND film.creation_date IS NOT NULL"
+        )
+    if model is GenreRatingStats:
+        links, column = table_name(GenreFilmwork, using), "genre_id"
+    else:
+        links, column = table_name(PersonFilmwork, using), "person_id"
+    where = f"{column} = ANY(%(keys)s::uuid[])" if keyed else "TRUE"
+    return (
+        f"SELECT link.{column} AS key, film.rating FROM "
+        f"(SELECT DISTINCT {column}, film_work_id FROM {links} "
+        f"WHERE {where}) link "
+        f"JOIN {film_works} film ON film.id = link.film_work_id "
+        "WHERE film.rating IS NOT NULL"
+    )
+
+
+def _refresh(model, keys: Optional[list], using: str) -> int:
+    """Пересчитывает сводки групп ``keys`` (всех при ``None``) одним
+    запросом и удаляет сводки групп, где не осталось фильмов с рейтингом.
+    Строки, которые не изменились, не перезаписываются."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = table_name(model, using)
+    key = quote(model._meta.pk.column)
+    histogram = ", ".join(
+        f"count(*) FILTER (WHERE {BUCKET_SQL} = {bucket})"
+        for bucket in range(RATING_HISTOGRAM_BUCKETS)
+    )
+    columns = ", ".join(quote(column) for column in STATS_COLUMNS)
+    assignments = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}"
+        for column in (*STATS_COLUMNS, "refreshed")
+    )
+    current = ", ".join(f"summary.{quote(c)}" for c in STATS_COLUMNS)
+    excluded = ", ".join(f"EXCLUDED.{quote(c)}" for c in STATS_COLUMNS)
+    scope = f"summary.{key} = ANY(%(keys)s)" if keys is not None else "TRUE"
+    with connection.cursor() as cursor:
+        # Пересчёты одной таблицы идут по очереди: иначе запрос со старым
+        # снимком мог бы записать сводку поверх более свежей.
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [table])
+        cursor.execute(
+            # Сумма в numeric точна и не зависит от порядка строк, иначе
+            # полный и частичный пересчёт расходились бы в последних знаках.
+            "WITH stats AS (SELECT key, count(*) AS film_works, "
+            "sum(rating::numeric)::float AS rating_sum, "
+            "min(rating) AS rating_min, max(rating) AS rating_max, "
+            "avg(rating::numeric)::float AS rating_avg, "
+            f"ARRAY[{histogram}] AS histogram "
+            f"FROM ({_source_sql(model, keys is not None, using)}) source "
+            "GROUP BY key), "
+            f"removed AS (DELETE FROM {table} summary WHERE {scope} "
+            "AND NOT EXISTS (SELECT 1 FROM stats "
+            f"WHERE stats.key = summary.{key})) "
+            f"INSERT INTO {table} AS summary ({key}, {columns}, refreshed) "
+            f"SELECT key, {columns}, now() FROM stats "
+            f"ON CONFLICT ({key}) DO UPDATE SET {assignments} "
+            f"WHERE ({current}) IS DISTINCT FROM ({excluded})",
+            {"keys": keys},
+        )
+        return cursor.rowcount
+
+
+def film_work_keys(film_work_ids: Iterable, using: str = "default") -> dict:
+    """Жанры, персоны и годы фильмов — группы, чьи сводки они задевают."""
+    film_work_ids = list(film_work_ids)
+    return {
+        "genre_ids": set(
+            GenreFilmwork.objects.using(using)
+            .filter(film_work_id__in=film_work_ids)
+            .values_list("genre_id", flat=True)
+        ),
+        "person_ids": set(
+            PersonFilmwork.objects.using(using)
+            .filter(film_work_id__in=film_work_ids)
+            .values_list("person_id", flat=True)
+        ),
+        "years": set(
+            Filmwork.objects.using(using)
+            .filter(pk__in=film_work_ids, creation_date__isnull=False)
+            .values_list("creation_date__year", flat=True)
+        ),
+    }
+
+
+def refresh_rating_stats(
+    film_work_ids: Iterable = (),
+    genre_ids: Iterable = (),
+    person_ids: Iterable = (),
+    years: Iterable = (),
+    using: str = "default",
+) -> int:
+    """Пересчитывает сводки групп фильмов ``film_work_ids`` и явно
+    переданных групп, например тех, из которых фильм убрали.
+
+    Каждая группа считается заново по своим фильмам, поэтому пересчёт
+    идемпотентен, а минимум и максимум верны и после удаления фильма.
+    Возвращает число вставленных и обновлённых сводок.
+    """
+    keys = {
+        GenreRatingStats: set(genre_ids),
+        PersonRatingStats: set(person_ids),
+        YearRatingStats: set(years),
+    }
+    film_work_ids = list(film_work_ids)
+    if film_work_ids:
+        found = film_work_keys(film_work_ids, using)
+        keys[GenreRatingStats] |= found["genre_ids"]
+        keys[PersonRatingStats] |= found["person_ids"]
+        keys[YearRatingStats] |= found["years"]
+    collected = getattr(_collected, "keys", {}).get(using)
+    if collected is not None:
+        for model, values in keys.items():
+            collected[model] |= values
+        return 0
+    refreshed = 0
+    with transaction.atomic(using=using):
+        for model, values in keys.items():
+            if values:
+                refreshed += _refresh(model, list(values), using)
+    return refreshed
+
+
+@contextmanager
+def collect_rating_stats(using: str = "default") -> Iterator[None]:
+    """Откладывает ``refresh_rating_stats`` до выхода из блока.
+
+    Группы всех вызовов объединяются, и каждая пересчитывается один раз,
+    а не после каждой пачки массовой операции. Пересчёт выполняется и
+    при исключении: пачки, записанные до него, уже зафиксированы.
+    """
+    if not hasattr(_collected, "keys"):
+        _collected.keys = {}
+    if using in _collected.keys:
+        yield
+        return
+    keys = _collected.keys[using] = {model: set() for model in SUMMARIES}
+    try:
+        yield
+    finally:
+        del _collected.keys[using]
+        refresh_rating_stats(
+            genre_ids=keys[GenreRatingStats],
+            person_ids=keys[PersonRatingStats],
+            years=keys[YearRatingStats],
+            using=using,
+        )
+
+
+def rebuild_rating_stats(
+    using: str = "default",
+) -> Iterator[tuple[type, int]]:
+    """Пересчитывает все сводки, по транзакции на таблицу, и отдаёт число
+    обновлённых строк каждой."""
+    for model in SUMMARIES:
+        with transaction.atomic(using=using):
+            yield model, _refresh(model, None, using)
+
+
+def schedule_rating_stats(
+    film_work_ids: Iterable = (),
+    genre_ids: Iterable = (),
+    person_ids: Iterable = (),
+    years: Iterable = (),
+    using: str = "default",
+) -> None:
+    """Пересчитывает сводки после фиксации текущей транзакции, как
+    ``movies.cards.schedule_refresh`` — карточки."""
+    pending = _pending_keys(using)
+    pending["film_work_ids"].update(film_work_ids)
+    pending["genre_ids"].update(genre_ids)
+    pending["person_ids"].update(person_ids)
+    pending["years"].update(years)
+    transaction.on_commit(partial(_flush, using), using=using)
+
+
+def _pending_keys(using: str) -> dict:
+    if not hasattr(_pending, "keys"):
+        _pending.keys = {}
+    return _pending.keys.setdefault(
+        using,
+        {
+            "film_work_ids": set(),
+            "genre_ids": set(),
+            "person_ids": set(),
+            "years": set(),
+        },
+    )
+
+
+def _flush(using: str) -> None:
+    pending = _pending_keys(using)
+    if any(pending.values()):
+        keys = {name: list(values) for name, values in pending.items()}
+        for values in pending.values():
+            values.clear()
+        refresh_rating_stats(**keys, using=using)
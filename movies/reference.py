@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+from .metrics.registry import REGISTRY
+from .models import Filmwork, Genre
+
+PREFIX = "reference"
+REQUESTS_METRIC = "reference_cache_requests_total"
+
+# Страховка на случай записи в обход ORM (COPY, сырой SQL): сигналы
+# сбрасывают кеш сразу, а без них числа устареют не больше чем на TTL.
+FILTER_COUNTS_TIMEOUT = 60 * 10
+
+REGISTRY.describe(
+    REQUESTS_METRIC,
+    "Reference cache lookups by level: local, shared or miss (database).",
+)
+
+
+class LocalLRU:
+    """Словарь процесса с ограничением размера и временем жизни записей."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """``(версия, истекла ли запись, значение)`` или ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        version, expires, value = entry
+        return version, expires <= time.monotonic(), value
+
+    def set(self, key, version, value, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+LOCAL = LocalLRU(getattr(settings, "REFERENCE_CACHE_LOCAL_MAXSIZE", 128))
+
+
+class ReferenceCache:
+    """Двухуровневый кеш небольшого справочника.
+
+    Первый уровень — память процесса (``LOCAL``), второй — общий кеш
+    Django. Значение в общем кеше хранится под ключом с версией;
+    ``invalidate()`` увеличивает версию, и старые записи больше не
+    читаются. Пока локальная запись не старше ``local_ttl``, запросов к
+    общему кешу нет вовсе; после этого сверяется только версия, поэтому
+    другие процессы видят изменения не позже чем через ``local_ttl``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        timeout: int = 60 * 60,
+    ):
+        self.name = name
+        self.loader = loader
+        self.timeout = timeout
+        self.version_key = f"{PREFIX}:{name}:version"
+
+    @property
+    def local_ttl(self) -> float:
+        return getattr(settings, "REFERENCE_CACHE_LOCAL_TTL", 30)
+
+    def _count(self, level: str) -> None:
+        REGISTRY.inc(REQUESTS_METRIC, cache=self.name, level=level)
+
+    def get(self):
+        entry = LOCAL.get(self.name)
+        if entry is not None and not entry[1]:
+            self._count("local")
+            return entry[2]
+
+        version = cache.get_or_set(self.version_key, 1, None)
+        if entry is not None and entry[0] == version:
+            LOCAL.set(self.name, version, entry[2], self.local_ttl)
+            self._count("local")
+            return entry[2]
+
+        key = f"{PREFIX}:{self.name}:{version}"
+        value = cache.get(key)
+        if value is None:
+            value = self.loader()
+            cache.set(key, value, self.timeout)
+            self._count("miss")
+        else:
+            self._count("shared")
+        LOCAL.set(self.name, version, value, self.local_ttl)
+        return value
+
+    def invalidate(self) -> None:
+        LOCAL.delete(self.name)
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 2, None)
+
+
+GENRES = ReferenceCache(
+    "genres",
+    lambda: list(Genre.objects.order_by("name").values_list("pk", "name")),
+)
+
+
+def genre_choices() -> list[tuple]:
+    """Жанры для ``<select>`` без запроса к базе на прогретом кеше."""
+    return [(str(pk), name) for pk, name in GENRES.get()]
+
+
+def _load_filter_counts() -> list[tuple[str, Optional[int], int]]:
+    return list(
+        Filmwork.objects.order_by()
+        .values_list("type", ExtractYear("creation_date"))
+        .annotate(count=Count("*"))
+    )
+
+
+# Счётчики фильтров списка фильмов (movies.filters). Живут здесь, а не в
+# модуле фильтров, чтобы сигналы и команды не импортировали admin.
+FILTER_COUNTS = ReferenceCache(
+    "filmwork_filter_counts", _load_filter_counts, FILTER_COUNTS_TIMEOUT
+)
+
+
+def invalidate_filter_counts() -> None:
+    FILTER_COUNTS.invalidate()
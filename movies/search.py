@@ -0,0 +1,45 @@
+import uuid
+
+from django.contrib.postgres.search import SearchQuery
+
+
+class IndexedSearchMixin:
+    """Поиск в админке, который обслуживают индексы, а не перебор таблицы.
+
+    ``search_mode = "trigram"`` — стандартный поиск по ``search_fields``
+    (``UPPER(col) LIKE UPPER('%...%')``), под который построены GIN-индексы
+    ``gin_trgm_ops`` по ``UPPER(col)``.
+
+    ``search_mode = "fulltext"`` — сопоставление ``search_vector`` с
+    запросом пользователя; выражение совпадает с функциональным
+    GIN-индексом, поэтому отдельная колонка и триггер не нужны.
+
+    Строка, которая является UUID, ищется по первичному ключу.
+    """
+
+    search_mode = "trigram"
+    search_vector = None
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        try:
+            pk = uuid.UUID(term)
+        except ValueError:
+            pass
+        else:
+            return queryset.filter(pk=pk), False
+
+        if self.search_mode == "fulltext":
+            query = SearchQuery(
+                term,
+                config=self.search_vector.config,
+                search_type="websearch",
+            )
+            return (
+                queryset.alias(search=self.search_vector).filter(search=query),
+                False,
+            )
+        return super().get_search_results(request, queryset, search_term)
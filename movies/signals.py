@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .api.v1 import cache as api_cache
+from .cards import schedule_refresh
+from .models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
+from .rating_stats import schedule_rating_stats
+from .reference import GENRES, invalidate_filter_counts
+
+# Карточки обновляются раньше сброса кеша API: обработчики ниже
+# регистрируют свои on_commit позже, и кеш не успеет заполниться
+# устаревшей карточкой.
+
+
+@receiver(post_save, sender=Filmwork)
+def refresh_film_work_card(sender, instance, using, **kwargs):
+    schedule_refresh([instance.pk], using)
+
+
+@receiver(post_save, sender=GenreFilmwork)
+@receiver(post_delete, sender=GenreFilmwork)
+@receiver(post_save, sender=PersonFilmwork)
+@receiver(post_delete, sender=PersonFilmwork)
+def refresh_film_work_links_card(sender, instance, using, **kwargs):
+    schedule_refresh([instance.film_work_id], using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Person)
+def refresh_names_cards(sender, instance, using, created, **kwargs):
+    # У нового объекта ещё нет связей, а при удалении карточки обновят
+    # обработчики удаляемых каскадом связей.
+    if created:
+        return
+    link_model = GenreFilmwork if sender is Genre else PersonFilmwork
+    field = "genre" if sender is Genre else "person"
+    schedule_refresh(
+        link_model.objects.using(using)
+        .filter(**{field: instance})
+        .values_list("film_work_id", flat=True)
+        .distinct(),
+        using,
+    )
+
+
+@receiver(pre_save, sender=Filmwork)
+def compare_film_work_rating_stats(sender, instance, using, **kwargs):
+    # Сводки зависят только от рейтинга и года выхода. Если год изменился,
+    # пересчитывается и сводка прежнего года. Пересчёт планирует post_save:
+    # вне транзакции on_commit выполнился бы сразу, до записи фильма.
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            Filmwork.objects.using(using)
+            .filter(pk=instance.pk)
+            .values("rating", "creation_date")
+            .first()
+        )
+    if previous == {
+        "rating": instance.rating,
+        "creation_date": instance.creation_date,
+    }:
+        return
+    years = []
+    if previous is not None and previous["creation_date"] is not None:
+        years.append(previous["creation_date"].year)
+    instance._rating_stats_years = years
+
+
+@receiver(post_save, sender=Filmwork)
+def schedule_film_work_rating_stats(sender, instance, using, **kwargs):
+    years = instance.__dict__.pop("_rating_stats_years", None)
+    if years is not None:
+        schedule_rating_stats([instance.pk], years=years, using=using)
+
+
+@receiver(post_delete, sender=Filmwork)
+def schedule_deleted_film_work_rating_stats(sender, instance, using, **kwargs):
+    # Жанры и персоны пересчитают обработчики удаляемых каскадом связей.
+    if instance.creation_date:
+        schedule_rating_stats(years=[instance.creation_date.year], using=using)
+
+
+@receiver(pre_save, sender=GenreFilmwork)
+@receiver(pre_save, sender=PersonFilmwork)
+def compare_link_rating_stats(sender, instance, using, **kwargs):
+    # В инлайне у связи можно сменить жанр или персону: сводка прежней
+    # группы тоже пересчитывается.
+    column = "genre_id" if sender is GenreFilmwork else "person_id"
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            sender.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list(column, flat=True)
+            .first()
+        )
+    if previous is not None and previous != getattr(instance, column):
+        instance._rating_stats_keys = [previous]
+
+
+@receiver(post_save, sender=GenreFilmwork)
+@receiver(post_delete, sender=GenreFilmwork)
+def schedule_genre_rating_stats(sender, instance, using, **kwargs):
+    previous = instance.__dict__.pop("_rating_stats_keys", [])
+    schedule_rating_stats(
+        genre_ids=[instance.genre_id, *previous], using=using
+    )
+
+
+@receiver(post_save, sender=PersonFilmwork)
+@receiver(post_delete, sender=PersonFilmwork)
+def schedule_person_rating_stats(sender, instance, using, **kwargs):
+    previous = instance.__dict__.pop("_rating_stats_keys", [])
+    schedule_rating_stats(
+        person_ids=[instance.person_id, *previous], using=using
+    )
+
+
+@receiver(post_save, sender=Filmwork)
+@receiver(post_delete, sender=Filmwork)
+def invalidate_film_work_cache(sender, instance, **kwargs):
+    # pk запоминается сразу: после удаления Django обнуляет его у объекта.
+    pk = instance.pk
+    transaction.on_commit(lambda: api_cache.invalidate_film_work(pk))
+    transaction.on_commit(invalidate_filter_counts)
+
+
+@receiver(post_save, sender=GenreFilmwork)
+@receiver(post_delete, sender=GenreFilmwork)
+@receiver(post_save, sender=PersonFilmwork)
+@receiver(post_delete, sender=PersonFilmwork)
+def invalidate_film_work_links_cache(sender, instance, **kwargs):
+    film_work_id = instance.film_work_id
+    transaction.on_commit(lambda: api_cache.invalidate_film_work(film_work_id))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+def invalidate_names_cache(sender, instance, **kwargs):
+    transaction.on_commit(api_cache.invalidate_all)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres_reference(sender, **kwargs):
+    transaction.on_commit(GENRES.invalidate)
@@ -0,0 +1,241 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, Optional
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min
+
+from movies.db.utils import table_name
+from movies.db.uuid7 import uuid7
+from movies.models import (
+    Filmwork,
+    FilmworkCard,
+    GenreFilmwork,
+    PersonFilmwork,
+    SimilarFilmwork,
+)
+from movies.similarity import (
+    SimilarityMatrix,
+    incidence,
+    init_worker,
+    top_k_block,
+)
+from movies.utils import chunked
+
+COLUMNS = ("id", "film_work_id", "similar_id", "score", "computed")
+ITERATOR_CHUNK_SIZE = 10_000
+
+# Отметка расчёта — начало самой старой открытой транзакции: изменения,
+# которые к началу расчёта ещё не закоммичены, получат refreshed не
+# раньше неё и попадут в следующий запуск. Без прав pg_read_all_stats
+# чужие транзакции не видны, и отметкой становится now().
+MARK_SQL = (
+    "SELECT coalesce(min(xact_start), now()) FROM pg_stat_activity "
+    "WHERE xact_start IS NOT NULL"
+)
+
+
+def blocks(rows: np.ndarray, size: int) -> list[np.ndarray]:
+    return np.split(rows, np.arange(size, len(rows), size))
+
+
+def load_matrix(
+    metric: str = "cosine",
+    genre_weight: float = 1.0,
+    person_weight: float = 1.0,
+    using: str = "default",
+) -> tuple[list, SimilarityMatrix]:
+    """Идентификаторы фильмов и матрица признаков, строка i которой —
+    фильм ``film_work_ids[i]``. Порядок по ключу делает выбор среди
+    соседей с равной оценкой одинаковым от запуска к запуску."""
+    film_work_ids = list(
+        Filmwork.objects.using(using)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+    index = {pk: row for row, pk in enumerate(film_work_ids)}
+
+    def links(model, field_name):
+        rows, columns, column_index = [], [], {}
+        for film_work_id, value in (
+            model.objects.using(using)
+            .order_by()
+            .values_list("film_work_id", field_name)
+            .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        ):
+            row = index.get(film_work_id)
+            # Фильм добавлен уже после чтения списка фильмов.
+            if row is None:
+                continue
+            rows.append(row)
+            columns.append(column_index.setdefault(value, len(column_index)))
+        return incidence(rows, columns, (len(index), len(column_index)))
+
+    matrix = SimilarityMatrix(
+        links(GenreFilmwork, "genre_id"),
+        links(PersonFilmwork, "person_id"),
+        metric,
+        genre_weight,
+        person_weight,
+    )
+    return film_work_ids, matrix
+
+
+def affected_rows(
+    film_work_ids: list,
+    matrix: SimilarityMatrix,
+    since: datetime,
+    k: int,
+    min_score: float,
+    block_size: int,
+    using: str,
+) -> np.ndarray:
+    """Строки, чей top-K мог измениться после ``since``.
+
+    Близость меняется только у пар с фильмом, чьи связи изменились.
+    Поэтому пересчитываются сами изменённые фильмы, фильмы, в чьём
+    top-K они были, и фильмы, для которых изменённый фильм теперь
+    ближе последнего места их top-K.
+    """
+    index = {pk: row for row, pk in enumerate(film_work_ids)}
+    changed = [
+        index[pk]
+        for pk in FilmworkCard.objects.using(using)
+        .filter(refreshed__gte=since)
+        .values_list("film_work_id", flat=True)
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        if pk in index
+    ]
+    affected = np.zeros(len(film_work_ids), dtype=bool)
+    if not changed:
+        return np.flatnonzero(affected)
+    affected[changed] = True
+
+    stored = SimilarFilmwork.objects.using(using).order_by()
+    for chunk in chunked((film_work_ids[row] for row in changed), 10_000):
+        for pk in (
+            stored.filter(similar_id__in=chunk)
+            .values_list("film_work_id", flat=True)
+            .distinct()
+        ):
+            if pk in index:
+                affected[index[pk]] = True
+
+    thresholds = np.full(len(film_work_ids), min_score, dtype=np.float32)
+    for pk, count, lowest in (
+        stored.values("film_work_id")
+        .annotate(count=Count("*"), lowest=Min("score"))
+        .values_list("film_work_id", "count", "lowest")
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    ):
+        if count >= k and pk in index and lowest > min_score:
+            # Сосед с оценкой, равной последнему месту, тоже может его
+            # занять: из равных выбирается фильм с меньшим ключом.
+            thresholds[index[pk]] = np.nextafter(
+                np.float32(lowest), np.float32(-np.inf)
+            )
+    for block in blocks(np.array(changed), block_size):
+        affected |= matrix.exceeds(block, thresholds)
+    return np.flatnonzero(affected)
+
+
+def save_block(
+    film_work_ids: list, result: list, computed: datetime, using: str
+) -> int:
+    """Заменяет похожие фильмы для строк блока одной транзакцией."""
+    connection = connections[using]
+    written = 0
+    with transaction.atomic(using=using):
+        SimilarFilmwork.objects.using(using).filter(
+            film_work_id__in=[film_work_ids[row] for row, _, _ in result]
+        ).delete()
+        with connection.cursor() as cursor:
+            with cursor.copy(
+                f"COPY {table_name(SimilarFilmwork, using)} "
+                f"({', '.join(COLUMNS)}) FROM STDIN"
+            ) as copy:
+                for row, neighbors, scores in result:
+                    for neighbor, score in zip(neighbors, scores):
+                        copy.write_row(
+                            (
+                                uuid7(),
+                                film_work_ids[row],
+                                film_work_ids[neighbor],
+                                float(score),
+                                computed,
+                            )
+                        )
+                        written += 1
+    return written
+
+
+def build_similar_films(
+    k: int = 20,
+    block_size: int = 256,
+    workers: int = 1,
+    full: bool = False,
+    metric: str = "cosine",
+    genre_weight: float = 1.0,
+    person_weight: float = 1.0,
+    min_score: float = 0.0,
+    using: str = "default",
+) -> Iterator[tuple[int, int]]:
+    """Пересчитывает ``similar_film_work`` и отдаёт по каждому блоку
+    число фильмов и записанных строк.
+
+    Без ``full`` пересчитываются только фильмы, затронутые изменениями
+    с прошлого запуска. Блоки по ``block_size`` фильмов считаются в
+    ``workers`` процессах, а пишутся в базу из текущего.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(MARK_SQL)
+        computed = cursor.fetchone()[0]
+    since: Optional[datetime] = None
+    if not full:
+        since = (
+            SimilarFilmwork.objects.using(using)
+            .aggregate(Max("computed"))
+            .get("computed__max")
+        )
+        if (
+            since is not None
+            and not FilmworkCard.objects.using(using)
+            .filter(refreshed__gte=since)
+            .exists()
+        ):
+            return
+
+    film_work_ids, matrix = load_matrix(
+        metric, genre_weight, person_weight, using
+    )
+    if since is None:
+        rows = np.arange(len(film_work_ids))
+    else:
+        rows = affected_rows(
+            film_work_ids, matrix, since, k, min_score, block_size, using
+        )
+    if not len(rows):
+        return
+    tasks = [(block, k, min_score) for block in blocks(rows, block_size)]
+
+    if workers > 1:
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=(matrix,)
+        )
+        results = executor.map(top_k_block, tasks)
+    else:
+        executor = None
+        init_worker(matrix)
+        results = map(top_k_block, tasks)
+    try:
+        for result in results:
+            yield len(result), save_block(
+                film_work_ids, result, computed, using
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,131 @@
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+
+METRICS = ("cosine", "jaccard")
+
+
+def incidence(
+    rows: Iterable[int], columns: Iterable[int], shape: tuple[int, int]
+) -> sparse.csr_matrix:
+    """Бинарная матрица фильм × жанр (персона): повторные пары, например
+    персона в нескольких ролях, дают одну единицу."""
+    rows = np.fromiter(rows, dtype=np.int32)
+    columns = np.fromiter(columns, dtype=np.int32)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=shape
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def idf(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Вес колонки ``log(N / df)``: общий для тысяч фильмов жанр значит
+    меньше, чем общий режиссёр."""
+    frequency = np.maximum(matrix.getnnz(axis=0), 1)
+    return np.log(matrix.shape[0] / frequency).astype(np.float32)
+
+
+class SimilarityMatrix:
+    """Признаки фильмов, из которых блоками считается близость.
+
+    ``cosine`` — косинус между строками с весами IDF, ``jaccard`` —
+    доля общих жанров и персон среди всех их жанров и персон.
+    """
+
+    def __init__(
+        self,
+        genres: sparse.csr_matrix,
+        persons: sparse.csr_matrix,
+        metric: str = "cosine",
+        genre_weight: float = 1.0,
+        person_weight: float = 1.0,
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}.")
+        self.metric = metric
+        if metric == "cosine":
+            features = sparse.hstack(
+                [
+                    genres @ sparse.diags(idf(genres) * genre_weight),
+                    persons @ sparse.diags(idf(persons) * person_weight),
+                ],
+                format="csr",
+            )
+            norms = np.sqrt(
+                np.asarray(features.multiply(features).sum(axis=1)).ravel()
+            )
+            norms[norms == 0] = 1
+            self.features = sparse.diags(1 / norms) @ features
+            self.sizes = None
+        else:
+            self.features = sparse.hstack([genres, persons], format="csr")
+            self.sizes = self.features.getnnz(axis=1).astype(np.float32)
+        self.features = self.features.astype(np.float32).tocsr()
+        self.transposed = self.features.T.tocsr()
+
+    def __len__(self) -> int:
+        return self.features.shape[0]
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """Плотный блок ``len(rows) × N`` близостей; память ограничена
+        размером блока, а не числом фильмов в квадрате."""
+        product = (self.features[rows] @ self.transposed).tocsr()
+        if self.metric == "jaccard":
+            # Делятся только ненулевые пересечения, до перехода к плотной
+            # матрице.
+            own = np.repeat(self.sizes[rows], np.diff(product.indptr))
+            product.data /= own + self.sizes[product.indices] - product.data
+        block = product.toarray()
+        block[np.arange(len(rows)), rows] = 0
+        return block
+
+    def top_k(
+        self, rows: np.ndarray, k: int, min_score: float = 0.0
+    ) -> list[tuple[int, np.ndarray, np.ndarray]]:
+        """``(строка, соседи, оценки)`` для каждой строки блока: не больше
+        ``k`` соседей с оценкой выше ``min_score`` по убыванию оценки."""
+        block = self.scores(rows)
+        k = min(k, block.shape[1] - 1)
+        if k <= 0:
+            return [(row, np.empty(0, np.int64), np.empty(0)) for row in rows]
+        # k-е по величине значение строки. Соседи выше него входят все, а
+        # из равных ему — первые по порядку строк, чтобы результат не
+        # зависел от argpartition.
+        kth = -np.partition(-block, k - 1, axis=1)[:, k - 1]
+        selected = block > np.maximum(kth, min_score)[:, None]
+        missing = k - selected.sum(axis=1)
+        for i in np.flatnonzero(kth > min_score):
+            ties = np.flatnonzero(block[i] == kth[i])[: missing[i]]
+            selected[i, ties] = True
+        result = []
+        for i, row in enumerate(rows):
+            neighbors = np.flatnonzero(selected[i])
+            scores = block[i, neighbors]
+            order = np.argsort(-scores, kind="stable")
+            result.append((row, neighbors[order], scores[order]))
+        return result
+
+    def exceeds(self, rows: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+        """Маска фильмов, у которых близость хотя бы к одной из ``rows``
+        выше их порога (последнего места в текущем top-K)."""
+        return self.scores(rows).max(axis=0) > thresholds
+
+
+# Матрица воркера пула. Модуль не зависит от Django, поэтому воркеры не
+# загружают настройки и не открывают соединений с базой.
+_matrix: Optional[SimilarityMatrix] = None
+
+
+def init_worker(matrix: SimilarityMatrix) -> None:
+    """``initializer`` пула процессов: матрица передаётся воркеру один
+    раз, а не с каждым блоком."""
+    global _matrix
+    _matrix = matrix
+
+
+def top_k_block(arguments: tuple[np.ndarray, int, float]) -> list:
+    rows, k, min_score = arguments
+    return _matrix.top_k(rows, k, min_score)
@@ -0,0 +1,246 @@
+import json
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Now
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from .models import Task
+from .taskqueue import enqueue, get_task_type, task_files
+
+ACTIVE = (Task.Status.QUEUED, Task.Status.RUNNING)
+
+
+def task_title(task: Task) -> str:
+    task_type = get_task_type(task.name)
+    return str(task_type.verbose_name) if task_type else task.name
+
+
+def task_url(task: Task) -> str:
+    return reverse("admin:movies_task_change", args=[task.pk])
+
+
+def message_task_queued(modeladmin, request, task: Task) -> None:
+    """Сообщение о постановке задачи со ссылкой на её ход."""
+    modeladmin.message_user(
+        request,
+        format_html(
+            '{} <a href="{}">{}</a>',
+            _("task_queued_message") % {"task": task_title(task)},
+            task_url(task),
+            _("task_progress_link"),
+        ),
+        messages.SUCCESS,
+    )
+
+
+class EnqueueForm(forms.Form):
+    name = forms.ChoiceField(label=_("task_name"))
+
+    def __init__(self, names, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["name"].choices = [
+            (name, get_task_type(name).verbose_name) for name in names
+        ]
+
+
+@admin.action(permissions=["cancel"], description=_("cancel_tasks"))
+def cancel_tasks(modeladmin, request, queryset):
+    """Отменяет задачи в очереди; выполняемые останавливаются на
+    следующем шаге, уже записанные шаги остаются."""
+    cancelled = queryset.filter(status__in=ACTIVE).update(
+        status=Task.Status.CANCELLED, finished=Now()
+    )
+    modeladmin.message_user(
+        request, _("tasks_cancelled") % {"count": cancelled}, messages.SUCCESS
+    )
+
+
+@admin.action(permissions=["cancel"], description=_("retry_tasks"))
+def retry_tasks(modeladmin, request, queryset):
+    """Ставит завершившиеся ошибкой или отменённые задачи в очередь
+    заново с полным числом попыток."""
+    retried = queryset.filter(
+        status__in=(Task.Status.FAILED, Task.Status.CANCELLED)
+    ).update(
+        status=Task.Status.QUEUED,
+        attempts=0,
+        run_after=Now(),
+        worker="",
+        finished=None,
+    )
+    modeladmin.message_user(
+        request, _("tasks_retried") % {"count": retried}, messages.SUCCESS
+    )
+
+
+class TaskChangeList(ChangeList):
+    def get_queryset(self, request):
+        # Аргументы массовых задач — списки в тысячи id, списку не нужны.
+        return super().get_queryset(request).defer("kwargs", "result", "error")
+
+
+def _json(value) -> str:
+    return format_html(
+        "<pre>{}</pre>",
+        json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2),
+    )
+
+
+class TaskAdminMixin:
+    """Очередь фоновых задач в админке: ход выполнения, отмена и повтор,
+    скачивание выгруженных файлов и постановка задач обслуживания
+    (``maintenance_tasks``) со страницы ``enqueue/``.
+
+    Задачи ставятся только кодом, поэтому форма добавления и
+    редактирование отключены.
+    """
+
+    maintenance_tasks = ()
+    actions = (cancel_tasks, retry_tasks)
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "enqueue/",
+                self.admin_site.admin_view(self.enqueue_view),
+                name=f"{opts.app_label}_{opts.model_name}_enqueue",
+            ),
+            path(
+                "<path:object_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name=f"{opts.app_label}_{opts.model_name}_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def get_changelist(self, request, **kwargs):
+        return TaskChangeList
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_cancel_permission(self, request):
+        opts = self.model._meta
+        return request.user.has_perm(f"{opts.app_label}.change_task")
+
+    def has_enqueue_permission(self, request):
+        opts = self.model._meta
+        return request.user.has_perm(f"{opts.app_label}.add_task")
+
+    @admin.display(description=_("task_name"))
+    def title(self, obj):
+        return task_title(obj)
+
+    @admin.display(description=_("progress"))
+    def progress_bar(self, obj):
+        if obj.total:
+            percent = min(obj.progress * 100 // obj.total, 100)
+            return format_html(
+                '<progress value="{}" max="100"></progress> {}% {}',
+                percent,
+                percent,
+                obj.message,
+            )
+        if obj.progress:
+            return f"{obj.progress} {obj.message}".strip()
+        return "-"
+
+    @admin.display(description=_("task_kwargs"))
+    def arguments(self, obj):
+        return _json(
+            {
+                name: (
+                    _("task_kwargs_list") % {"count": len(value)}
+                    if isinstance(value, list) and len(value) > 10
+                    else value
+                )
+                for name, value in obj.kwargs.items()
+            }
+        )
+
+    @admin.display(description=_("task_result"))
+    def result_data(self, obj):
+        return "-" if obj.result is None else _json(obj.result)
+
+    @admin.display(description=_("task_error"))
+    def error_text(self, obj):
+        return format_html("<pre>{}</pre>", obj.error) if obj.error else "-"
+
+    @admin.display(description=_("task_file"))
+    def result_file(self, obj):
+        name = (obj.result or {}).get("file")
+        if obj.status != Task.Status.SUCCEEDED or not name:
+            return "-"
+        opts = self.model._meta
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse(
+                f"admin:{opts.app_label}_{opts.model_name}_download",
+                args=[obj.pk],
+            ),
+            name,
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            "has_enqueue_permission": self.has_enqueue_permission(request),
+            "has_active_tasks": self.model.objects.filter(
+                status__in=ACTIVE
+            ).exists(),
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+    def enqueue_view(self, request):
+        if not self.has_enqueue_permission(request):
+            raise PermissionDenied
+        form = EnqueueForm(self.maintenance_tasks, request.POST or None)
+        if request.method == "POST" and form.is_valid():
+            task = enqueue(
+                form.cleaned_data["name"],
+                created_by=request.user.get_username(),
+            )
+            message_task_queued(self, request, task)
+            return HttpResponseRedirect(task_url(task))
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("enqueue_task"),
+            "opts": self.model._meta,
+            "form": form,
+        }
+        return TemplateResponse(
+            request, "admin/movies/task/enqueue.html", context
+        )
+
+    def download_view(self, request, object_id):
+        task = self.get_object(request, unquote(object_id))
+        if task is None:
+            raise Http404
+        if not self.has_view_permission(request, task):
+            raise PermissionDenied
+        # Отдаётся только выгрузка задачи, а не загруженный для неё файл.
+        name = (task.result or {}).get("file")
+        if (
+            task.status != Task.Status.SUCCEEDED
+            or not name
+            or not task_files.exists(name)
+        ):
+            raise Http404
+        return FileResponse(
+            task_files.open(name, "rb"),
+            as_attachment=True,
+            filename=name.rsplit("/", 1)[-1],
+        )
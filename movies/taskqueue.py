@@ -0,0 +1,397 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count, F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Now
+from django.utils import timezone
+from django.utils.functional import LazyObject
+from django.utils.module_loading import autodiscover_modules
+
+from .db.utils import table_name
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+Status = Task.Status
+
+
+@dataclass(frozen=True)
+class TaskType:
+    name: str
+    function: Callable
+    verbose_name: str
+    max_attempts: int = 3
+    retry_delay: int = 60
+    concurrency: Optional[int] = None
+
+
+REGISTRY: dict[str, TaskType] = {}
+
+
+def task(
+    name: Optional[str] = None,
+    verbose_name: str = "",
+    max_attempts: int = 3,
+    retry_delay: int = 60,
+    concurrency: Optional[int] = None,
+):
+    """Регистрирует ``function(progress, **kwargs)`` как тип задачи.
+
+    Задача, завершившаяся исключением, повторяется через ``retry_delay``
+    секунд, каждый раз вдвое позже, всего не больше ``max_attempts``
+    раз, поэтому должна быть идемпотентной. ``concurrency`` — сколько
+    задач типа выполняются одновременно на всех воркерах.
+    """
+
+    def register(function):
+        task_type = TaskType(
+            name or function.__name__,
+            function,
+            verbose_name or name or function.__name__,
+            max_attempts,
+            retry_delay,
+            concurrency,
+        )
+        REGISTRY[task_type.name] = task_type
+        return function
+
+    return register
+
+
+def get_task_type(name: str) -> Optional[TaskType]:
+    """Тип задачи ``name``; модули ``tasks`` приложений, где они
+    регистрируются, импортируются при первом обращении."""
+    if name not in REGISTRY:
+        autodiscover_modules("tasks")
+    return REGISTRY.get(name)
+
+
+class _TaskFiles(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(location=settings.TASK_FILES_ROOT)
+
+
+# Загруженные для задач и выгруженные ими файлы.
+task_files = _TaskFiles()
+
+
+def enqueue(
+    name: str, created_by: str = "", using: str = "default", **kwargs
+) -> Task:
+    """Ставит задачу в очередь. Аргументы хранятся в JSON, поэтому
+    ``UUID``, даты и ``Decimal`` приходят в функцию строками."""
+    task_type = get_task_type(name)
+    if task_type is None:
+        raise ValueError(f"Unknown task {name!r}.")
+    return Task.objects.using(using).create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=task_type.max_attempts,
+        created_by=created_by,
+    )
+
+
+def selection(queryset) -> dict:
+    """Выборка для аргументов задачи: SQL запроса ``id`` с параметрами
+    вместо списка ``id``, который в больших выборках занял бы десятки
+    мегабайт в памяти запроса и в строке задачи."""
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    return {"sql": sql, "params": list(params)}
+
+
+def selected(model, selection: dict, using: str = "default"):
+    """Выборка ``model``, сохранённая ``selection``; запрос выполняется
+    заново, поэтому удалённые до запуска задачи объекты в неё не входят."""
+    return model.objects.using(using).filter(
+        pk__in=RawSQL(selection["sql"], selection["params"])
+    )
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Progress:
+    """Ход выполнения задачи, который передаётся её функции.
+
+    Вызов только запоминает значения, а в базу их вместе с отметкой
+    ``heartbeat`` раз в ``interval`` секунд пишет отдельный поток со своим
+    соединением: запись не попадает в транзакции задачи и не замедляет
+    её. Если задачу отменили, следующий вызов бросает ``TaskCancelled``.
+    """
+
+    def __init__(
+        self, task_id, worker: str, interval: float, using: str = "default"
+    ):
+        self.task_id = task_id
+        self.worker = worker
+        self.interval = interval
+        self.using = using
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message = ""
+        self.cancelled = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def __call__(
+        self,
+        done: int,
+        total: Optional[int] = None,
+        message: Optional[str] = None,
+    ) -> None:
+        if self.cancelled:
+            raise TaskCancelled
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    self.cancelled = not self.save()
+                except DatabaseError:
+                    logger.exception("Task %s heartbeat failed", self.task_id)
+                    connections[self.using].close()
+        finally:
+            connections[self.using].close()
+
+    def save(self) -> bool:
+        """Пишет ход задачи; ``False``, если она уже не выполняется этим
+        воркером, например отменена."""
+        return bool(
+            _own(self.task_id, self.worker, self.using).update(
+                progress=self.done,
+                total=self.total,
+                message=self.message,
+                heartbeat=Now(),
+            )
+        )
+
+
+def _own(task_id, worker: str, using: str):
+    return Task.objects.using(using).filter(
+        pk=task_id, status=Status.RUNNING, worker=worker
+    )
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker: str, using: str = "default") -> Optional[Task]:
+    """Берёт первую готовую задачу и отмечает её выполняемой.
+
+    Строка блокируется ``FOR UPDATE SKIP LOCKED``, поэтому воркеры не
+    ждут друг друга и не берут одну задачу дважды. Типы, у которых
+    выполняется ``concurrency`` задач, пропускаются.
+    """
+    limits = {
+        name: task_type.concurrency
+        for name, task_type in REGISTRY.items()
+        if task_type.concurrency
+    }
+    tasks = Task.objects.using(using)
+    with transaction.atomic(using=using):
+        running = dict(
+            tasks.filter(status=Status.RUNNING, name__in=limits)
+            .values("name")
+            .annotate(count=Count("*"))
+            .values_list("name", "count")
+        )
+        full = {
+            name
+            for name, limit in limits.items()
+            if running.get(name, 0) >= limit
+        }
+        while True:
+            task = (
+                tasks.select_for_update(skip_locked=True)
+                .filter(status=Status.QUEUED, run_after__lte=Now())
+                .exclude(name__in=full)
+                .order_by("run_after", "id")
+                .first()
+            )
+            if task is None:
+                return None
+            if task.name in limits:
+                # Задачи одного типа берутся по очереди, иначе два воркера
+                # одновременно увидели бы одно свободное место.
+                with connections[using].cursor() as cursor:
+                    cursor.execute(
+                        "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                        [f"{table_name(Task, using)}:{task.name}"],
+                    )
+                if (
+                    tasks.filter(status=Status.RUNNING, name=task.name).count()
+                    >= limits[task.name]
+                ):
+                    full.add(task.name)
+                    continue
+            task.status = Status.RUNNING
+            task.attempts += 1
+            task.worker = worker
+            task.started = task.heartbeat = timezone.now()
+            task.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "worker",
+                    "started",
+                    "heartbeat",
+                ]
+            )
+            return task
+
+
+def execute(task: Task, using: str = "default") -> str:
+    """Выполняет взятую задачу и записывает результат, ошибку или
+    следующую попытку. Возвращает итоговый статус."""
+    task_type = get_task_type(task.name)
+    progress = Progress(
+        task.pk, task.worker, settings.TASK_HEARTBEAT_INTERVAL, using
+    )
+    started = time.perf_counter()
+    try:
+        if task_type is None:
+            raise LookupError(f"Unknown task {task.name!r}.")
+        with progress:
+            result = task_type.function(progress, **task.kwargs)
+    except TaskCancelled:
+        # Задачу отменили или сочли брошенной, пока она выполнялась.
+        logger.info("Task %s %s stopped", task.name, task.pk)
+        return Task.objects.using(using).get(pk=task.pk).status
+    except Exception:
+        logger.exception("Task %s %s failed", task.name, task.pk)
+        retry = task_type is not None and task.attempts < task.max_attempts
+        if retry:
+            delay = task_type.retry_delay * 2 ** (task.attempts - 1)
+            status, fields = Status.QUEUED, {
+                "run_after": timezone.now() + timedelta(seconds=delay),
+                "worker": "",
+            }
+        else:
+            status, fields = Status.FAILED, {"finished": Now()}
+        updated = _own(task.pk, task.worker, using).update(
+            status=status,
+            error=traceback.format_exc(),
+            progress=progress.done,
+            total=progress.total,
+            message=progress.message,
+            **fields,
+        )
+    else:
+        status = Status.SUCCEEDED
+        updated = _own(task.pk, task.worker, using).update(
+            status=status,
+            result=result,
+            error="",
+            progress=progress.done,
+            total=progress.total,
+            message=progress.message,
+            finished=Now(),
+        )
+    if not updated:
+        return Task.objects.using(using).get(pk=task.pk).status
+    logger.info(
+        "Task %s %s %s in %.1fs",
+        task.name,
+        task.pk,
+        status,
+        time.perf_counter() - started,
+    )
+    return status
+
+
+def requeue_stale(stale_after: int, using: str = "default") -> int:
+    """Возвращает в очередь задачи, воркер которых дольше ``stale_after``
+    секунд не отмечался (упал или потерял соединение); задачи без
+    оставшихся попыток завершаются ошибкой."""
+    stale = Task.objects.using(using).filter(
+        status=Status.RUNNING,
+        heartbeat__lt=timezone.now() - timedelta(seconds=stale_after),
+    )
+    error = f"Worker stopped sending heartbeats for {stale_after}s."
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=Status.QUEUED, worker="", error=error, run_after=Now()
+    )
+    failed = stale.update(status=Status.FAILED, error=error, finished=Now())
+    if requeued or failed:
+        logger.warning("Stale tasks: %d requeued, %d failed", requeued, failed)
+    return requeued + failed
+
+
+def task_file_names(task: Task) -> list[str]:
+    """Файлы задачи в ``task_files``: загруженный и выгруженный."""
+    return [
+        values["file"]
+        for values in (task.kwargs, task.result)
+        if isinstance(values, dict) and values.get("file")
+    ]
+
+
+def purge_finished(days: int, using: str = "default") -> int:
+    """Удаляет задачи, завершившиеся больше ``days`` дней назад, вместе
+    с их файлами."""
+    finished = Task.objects.using(using).filter(
+        finished__lt=timezone.now() - timedelta(days=days)
+    )
+    for task in finished.filter(
+        Q(kwargs__has_key="file") | Q(result__has_key="file")
+    ).only("kwargs", "result"):
+        for name in task_file_names(task):
+            task_files.delete(name)
+    deleted, _ = finished.delete()
+    return deleted
+
+
+def work(
+    stop: threading.Event,
+    poll_interval: float = 1.0,
+    burst: bool = False,
+    using: str = "default",
+) -> int:
+    """Цикл воркера: берёт и выполняет задачи, пока не выставлен ``stop``,
+    а с ``burst`` — пока очередь не опустеет. Между задачами, когда очередь
+    пуста, возвращает в очередь брошенные задачи и удаляет старые.
+    Возвращает число выполненных задач."""
+    autodiscover_modules("tasks")
+    worker = worker_name()
+    executed = 0
+    purged_at = None
+    while not stop.is_set():
+        task = claim(worker, using)
+        if task is not None:
+            execute(task, using)
+            executed += 1
+            continue
+        requeue_stale(settings.TASK_STALE_AFTER, using)
+        if purged_at is None or time.monotonic() - purged_at > 3600:
+            purge_finished(settings.TASK_KEEP_DAYS, using)
+            purged_at = time.monotonic()
+        if burst:
+            break
+        stop.wait(poll_interval)
+    return executed
@@ -0,0 +1,232 @@
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from . import bulk, cards, importer, rating_stats, similar_films
+from .etl.search_index import export_changes
+from .etl.sinks import BulkSink, JsonLinesSink
+from .etl.state import JsonFileStorage, State
+from .export import FORMATS, iter_documents
+from .models import Filmwork
+from .taskqueue import selected, task, task_files
+
+
+def _run_bulk(progress, operation, selection: dict, chunk_size: int):
+    queryset = selected(Filmwork, selection)
+    total = queryset.count()
+    result = bulk.run_in_chunks(
+        queryset,
+        operation,
+        chunk_size,
+        progress=lambda result: progress(result.film_works, total),
+    )
+    return asdict(result)
+
+
+@task(verbose_name=_("bulk_delete"), concurrency=2)
+def delete_film_works(progress, selection: dict, chunk_size: int = 1000):
+    return _run_bulk(progress, bulk.delete_film_works, selection, chunk_size)
+
+
+@task(verbose_name=_("bulk_set_genre"), concurrency=2)
+def set_genre(
+    progress,
+    selection: dict,
+    genre_id: str,
+    replace: bool = False,
+    chunk_size: int = 1000,
+):
+    return _run_bulk(
+        progress,
+        bulk.set_genre(uuid.UUID(genre_id), replace),
+        selection,
+        chunk_size,
+    )
+
+
+@task(verbose_name=_("bulk_reassign_person_role"), concurrency=2)
+def reassign_person_role(
+    progress,
+    selection: dict,
+    person_id: str,
+    role: str,
+    chunk_size: int = 1000,
+):
+    return _run_bulk(
+        progress,
+        bulk.reassign_person_role(uuid.UUID(person_id), role),
+        selection,
+        chunk_size,
+    )
+
+
+@task(verbose_name=_("bulk_set_rating"), concurrency=2)
+def set_rating(
+    progress,
+    selection: dict,
+    rating: Optional[float],
+    chunk_size: int = 1000,
+):
+    return _run_bulk(progress, bulk.set_rating(rating), selection, chunk_size)
+
+
+@task(verbose_name=_("import_film_works"), concurrency=1)
+def import_film_works(
+    progress,
+    file: str,
+    fmt: str,
+    dry_run: bool = False,
+    batch_size: int = 500,
+    max_errors: int = 100,
+):
+    """Загрузка файла из ``task_files``; ход — в байтах файла. Фильмы
+    пишутся upsert по ``id``, поэтому повтор после сбоя безопасен."""
+    size = task_files.size(file)
+    with task_files.open(file, "rb") as stream:
+        report = importer.import_film_works(
+            stream,
+            fmt,
+            dry_run=dry_run,
+            batch_size=batch_size,
+            progress=lambda report: progress(
+                stream.tell(), size, f"{report.total('rows')} rows"
+            ),
+        )
+    return {
+        "dry_run": dry_run,
+        **{
+            name: report.total(name)
+            for name in (
+                "rows",
+                "invalid",
+                "film_works",
+                "genres",
+                "persons",
+                "links",
+            )
+        },
+        "seconds": round(report.seconds, 1),
+        "errors": [asdict(error) for error in report.errors[:max_errors]],
+    }
+
+
+@task(verbose_name=_("export_film_works"), concurrency=2)
+def export_film_works(
+    progress,
+    fmt: str,
+    selection: Optional[dict] = None,
+    chunk_size: int = 2000,
+):
+    """Выгрузка фильмов ``selection`` (без неё — всех) в файл
+    ``task_files``, имя которого возвращается в ``file``."""
+    _, lines = FORMATS[fmt]
+    queryset = Filmwork.objects.all()
+    if selection is not None:
+        queryset = selected(Filmwork, selection)
+    queryset = queryset.order_by("pk")
+    total = queryset.count()
+    documents = iter_documents(queryset, chunk_size)
+    name = task_files.get_available_name(
+        f"exports/film_works_{timezone.now():%Y%m%d_%H%M%S}.{fmt}"
+    )
+    path = Path(task_files.path(name))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    exported = 0
+
+    def counted():
+        nonlocal exported
+        for exported, document in enumerate(documents, start=1):
+            progress(exported, total)
+            yield document
+
+    try:
+        with path.open("w", encoding="utf-8", newline="") as output:
+            output.writelines(lines(counted()))
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return {"file": name, "film_works": exported}
+
+
+@task(verbose_name=_("export_search_index"), concurrency=1)
+def export_search_index(
+    progress, fmt: str = "ndjson", index: str = "movies", batch_size: int = 500
+):
+    """Выгрузка изменившихся фильмов для поискового индекса в файл
+    ``task_files``, как ``manage.py export_search_index``. Отметки
+    хранятся в ``search_index/state.json``; при ошибке они и файл
+    возвращаются как были, чтобы повтор выгрузил те же документы."""
+    state_path = Path(task_files.path("search_index/state.json"))
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    storage = JsonFileStorage(str(state_path))
+    saved = storage.retrieve_state()
+    name = task_files.get_available_name(
+        f"search_index/film_works_{timezone.now():%Y%m%d_%H%M%S}.{fmt}"
+    )
+    path = Path(task_files.path(name))
+    if fmt == "bulk":
+        sink = BulkSink(str(path), index)
+    else:
+        sink = JsonLinesSink(str(path))
+    exported = {}
+
+    def report(producer: str, documents: int) -> None:
+        exported[producer] = documents
+        progress(sum(exported.values()), message=producer)
+
+    try:
+        for producer, documents in export_changes(
+            sink, State(storage), batch_size=batch_size, progress=report
+        ):
+            exported[producer] = documents
+    except BaseException:
+        storage.save_state(saved)
+        path.unlink(missing_ok=True)
+        raise
+    return {
+        # Без изменений файл не создаётся.
+        "file": name if path.exists() else None,
+        "documents": exported,
+    }
+
+
+@task(verbose_name=_("refresh_film_cards"), concurrency=1)
+def refresh_film_cards(progress, chunk_size: int = 1000):
+    total = Filmwork.objects.count()
+    seen = refreshed = 0
+    for chunk_seen, chunk_refreshed in cards.refresh_all_cards(chunk_size):
+        seen += chunk_seen
+        refreshed += chunk_refreshed
+        progress(seen, total)
+    return {"film_works": seen, "refreshed": refreshed}
+
+
+@task(verbose_name=_("rebuild_rating_stats"), concurrency=1)
+def rebuild_rating_stats(progress):
+    refreshed = {}
+    for done, (model, rows) in enumerate(
+        rating_stats.rebuild_rating_stats(), start=1
+    ):
+        refreshed[model.__name__] = rows
+        progress(done, len(rating_stats.SUMMARIES))
+    return refreshed
+
+
+@task(verbose_name=_("build_similar_films"), concurrency=1)
+def build_similar_films(
+    progress, full: bool = False, k: int = 20, block_size: int = 256
+):
+    """Пересчёт похожих фильмов в процессе воркера: без пула процессов,
+    который закрыл бы соединения воркера."""
+    film_works = rows = 0
+    for block_film_works, block_rows in similar_films.build_similar_films(
+        k=k, block_size=block_size, full=full
+    ):
+        film_works += block_film_works
+        rows += block_rows
+        progress(film_works, message=f"{rows} rows")
+    return {"film_works": film_works, "rows": rows}
@@ -0,0 +1,53 @@
+from django import forms
+from django.contrib.admin.widgets import AutocompleteSelect
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete-виджет без отдельного запроса на каждую строку.
+
+    Стандартный ``AutocompleteSelect`` загружает подпись выбранного
+    значения запросом к связанной таблице. Здесь подпись берётся из
+    ``preloaded``, который заполняет ``PreloadedRelatedForm`` из объекта,
+    уже загруженного через ``select_related``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.preloaded = {}
+
+    def optgroups(self, name, value, attr=None):
+        selected = [
+            str(item)
+            for item in value
+            if str(item) not in self.choices.field.empty_values
+        ]
+        if not selected or not set(selected) <= self.preloaded.keys():
+            return super().optgroups(name, value, attr)
+
+        default = (None, [], 0)
+        if not self.is_required and not self.allow_multiple_selected:
+            default[1].append(self.create_option(name, "", "", False, 0))
+        for key in selected:
+            default[1].append(
+                self.create_option(
+                    name, key, self.preloaded[key], True, len(default[1])
+                )
+            )
+        return [default]
+
+
+class PreloadedRelatedForm(forms.ModelForm):
+    """Передаёт виджетам подписи уже загруженных связанных объектов."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance._state.adding:
+            return
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, "widget", field.widget)
+            if not isinstance(widget, PreloadedAutocompleteSelect):
+                continue
+            model_field = self.instance._meta.get_field(name)
+            if model_field.is_cached(self.instance):
+                related = model_field.get_cached_value(self.instance)
+                widget.preloaded = {str(related.pk): str(related)}